@@ -1,5 +1,9 @@
+import os
+import uuid
+
+import click
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, Response, request
+from flask import Flask, jsonify, make_response, Response, request, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 # from flask_cors import CORS
 
@@ -7,11 +11,37 @@ from config import ProductionConfig
 
 from models.user_model import Users
 from models.pokemon_model import Pokemons
-from models.pokemon_battle_model import BattleModel
 from db import db
 from models.logger import configure_logger
+from models.api_utils import stream_pokemon_stats
+from models.arena_manager import configure_arena_manager
+from models.battlefield_store import configure_battlefield_store, get_battlefield_store
+from models.battle_engine import simulate_matchups
+from models.battle_history import configure_battle_recorder, get_battle_recorder
+from models.battle_odds import configure_odds_pool, estimate_odds, get_odds_pool
+from models.battle_royale import battle_royale
+from models.broadcaster import TooManySubscriptionsError, configure_broadcaster, get_broadcaster
+from models.circuit_breaker import CircuitOpenError
+from models.pokeapi_client import configure_client, get_client, set_deadline
+from models.http_cache import add_cache_headers, conditional_response, make_etag
+from models.leaderboard import configure_leaderboard, get_leaderboard
+from models.matchmaking import MATCHED, configure_matchmaking, get_matchmaking_queue
+from models.pokedex_import import import_pokedex
+from models.pokemon_battle_model import BattleModel, BattleResult, Combatant
+from models.randomness import BufferedRandomness, SeededRandomness
+from models.replay_log import configure_replay_log, get_replay_log, list_segments, read_segment, replay_winners
+from models.single_flight import SingleFlight
+from models.negative_cache import configure_negative_cache, get_negative_cache
+from models.stat_cache import configure_stat_cache, get_stat_cache
+from models.sse import SSE_HEADERS, format_sse
+from models.stats_snapshot import configure_snapshot, lookup_snapshot, write_snapshot
+from models.tournament import run_tournament
+from models.win_matrix import configure_win_matrix, get_win_matrix
 
+import numpy as np
 import requests
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy.exc import IntegrityError
 
 load_dotenv()
 
@@ -21,8 +51,24 @@ def create_app(config_class=ProductionConfig):
     app.config.from_object(config_class)
 
     db.init_app(app)
+    configure_client(app.config)
+    configure_negative_cache(app.config)
+    configure_stat_cache(app.config)
+    configure_snapshot(app.config)
+    configure_win_matrix(Pokemons.all_stats)
+    configure_arena_manager(app.config)
+    configure_battlefield_store(app.config)
+    configure_odds_pool(app.config)
+    leaderboard = configure_leaderboard(app.config)
+    configure_battle_recorder(app, leaderboard)
+    configure_matchmaking(app.config)
+    configure_replay_log(app.config)
+    configure_broadcaster(app.config)
     with app.app_context():
         db.create_all()
+        leaderboard.load()
+        if app.config.get("STAT_CACHE_WARM"):
+            Pokemons.warm_stat_cache()
 
     login_manager = LoginManager()
     login_manager.init_app(app)
@@ -40,7 +86,29 @@ def create_app(config_class=ProductionConfig):
         }), 401)
 
     pokemon_model = Pokemons()
-    battle_model = BattleModel()
+    pokemon_flight = SingleFlight()
+
+    @app.before_request
+    def start_upstream_deadline():
+        # Every PokéAPI call made while serving this request shares one time budget
+        set_deadline(app.config.get("UPSTREAM_DEADLINE_SECONDS", 5.0))
+
+    @app.teardown_request
+    def clear_upstream_deadline(exc=None):
+        set_deadline(None)
+
+    @app.teardown_request
+    def release_battlefield_store(exc=None):
+        get_battlefield_store().release()
+
+    def upstream_unavailable(e: requests.exceptions.RequestException) -> Response:
+        response = make_response(jsonify({
+            "status": "error",
+            "message": "PokéAPI is currently unavailable."
+        }), 503)
+        if isinstance(e, CircuitOpenError):
+            response.headers["Retry-After"] = str(max(1, round(e.retry_after)))
+        return response
 
     ####################################################
     #
@@ -56,6 +124,27 @@ def create_app(config_class=ProductionConfig):
             'message': 'Service is running'
         }), 200)
 
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics() -> Response:
+        return make_response(jsonify({
+            "status": "success",
+            "negative_cache": get_negative_cache().stats(),
+            "stat_cache": get_stat_cache().stats(),
+            "win_matrix": get_win_matrix().stats(),
+            "arenas": get_battlefield_store().stats(),
+            "battle_history": get_battle_recorder().stats(),
+            "leaderboard": get_leaderboard().stats(),
+            "matchmaking": get_matchmaking_queue().stats(),
+            "replay_log": get_replay_log().stats() if get_replay_log() else None,
+            "battle_stream": get_broadcaster().stats(),
+            "upstream": get_client().breaker.stats() if get_client().breaker else None,
+            "single_flight": {
+                "in_flight": pokemon_flight.in_flight(),
+                "leaders": pokemon_flight.leaders,
+                "coalesced": pokemon_flight.coalesced
+            }
+        }), 200)
+
     ##########################################################
     #
     # User Management
@@ -204,9 +293,17 @@ def create_app(config_class=ProductionConfig):
 
     @app.route('/api/fetch-pokemon/<string:name>', methods=['GET'])
     def fetch_pokemon(name):
-        existing_pokemon = Pokemons.query.filter_by(name=name.lower()).first()
+        name = name.strip().lower()
+        try:
+            existing_pokemon = Pokemons.get_stats_by_name(name)
+        except ValueError:
+            existing_pokemon = None
+        max_age = app.config.get("POKEMON_CACHE_MAX_AGE", 300)
         if existing_pokemon:
-            return jsonify({
+            # Stats only change through update_stats, which refreshes the cache, so
+            # they identify the representation and a revalidation never renders it
+            etag = make_etag(existing_pokemon.name, existing_pokemon.attack, existing_pokemon.defense, "local database")
+            return conditional_response(etag, lambda: jsonify({
                 "status": "success",
                 "pokemon": {
                     "name": existing_pokemon.name,
@@ -214,35 +311,233 @@ def create_app(config_class=ProductionConfig):
                     "defense": existing_pokemon.defense
                 },
                 "source": "local database"
-            }), 200
+            }), max_age)
 
-        url = f'https://pokeapi.co/api/v2/pokemon/{name.lower()}'
-        response = requests.get(url)
+        try:
+            # Concurrent misses for the same name share one upstream fetch and one insert
+            result = pokemon_flight.do(name, lambda: fetch_and_save_pokemon(name))
+        except requests.exceptions.RequestException as e:
+            app.logger.error(f"PokéAPI request for '{name}' failed: {e}")
+            return upstream_unavailable(e)
 
-        if response.status_code != 200:
+        if result is None:
             return jsonify({
                 "status": "error",
                 "message": f"Pokémon '{name}' not found in PokéAPI."
             }), 404
 
-        data = response.json()
-        stats = {stat['stat']['name']: stat['base_stat'] for stat in data['stats']}
-        attack = stats.get('attack')
-        defense = stats.get('defense')
+        pokemon, source = result
+        response = make_response(jsonify({
+            "status": "success",
+            "pokemon": pokemon,
+            "source": source
+        }), 201 if source != "local database" else 200)
+        if source != "local database":
+            # This request stored the pokemon; only later reads of the row are cacheable
+            return response
+        etag = make_etag(pokemon["name"], pokemon["attack"], pokemon["defense"], source)
+        return add_cache_headers(response, etag, max_age)
 
-        new_pokemon = Pokemons(name=name.lower(), attack=attack, defense=defense)
-        db.session.add(new_pokemon)
-        db.session.commit()
+    def fetch_and_save_pokemon(name):
+        """Fetch a pokemon from the stats snapshot or PokéAPI and store it, returning (stats, source) or None if unknown."""
+        snapshot_stats = lookup_snapshot(name)
+        if snapshot_stats is not None:
+            attack, defense = snapshot_stats.attack, snapshot_stats.defense
+            source = "stats snapshot and saved to DB"
+        else:
+            stats = stream_pokemon_stats(name)
+            if stats is None:
+                return None
+            attack = stats.get('attack')
+            defense = stats.get('defense')
+            source = "external API and saved to DB"
 
-        return jsonify({
+        try:
+            new_pokemon = Pokemons(name=name, attack=attack, defense=defense)
+            db.session.add(new_pokemon)
+            db.session.commit()
+            get_stat_cache().put(new_pokemon.to_stats())
+            get_win_matrix().upsert(new_pokemon.to_stats())
+        except IntegrityError:
+            # Another worker process stored it first; serve its row instead
+            db.session.rollback()
+            existing_pokemon = Pokemons.query.filter_by(name=name).first()
+            return {
+                "name": existing_pokemon.name,
+                "attack": existing_pokemon.attack,
+                "defense": existing_pokemon.defense
+            }, "local database"
+
+        return {
+            "name": name,
+            "attack": attack,
+            "defense": defense
+        }, source
+
+    @app.route('/api/fetch-pokemon', methods=['GET', 'POST'])
+    def fetch_pokemons() -> Response:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            names = data.get("names")
+        else:
+            names = [name for name in request.args.get("names", "").split(",") if name.strip()]
+
+        if not names or not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            return make_response(jsonify({
+                "status": "error",
+                "message": "A non-empty list of Pokémon names is required"
+            }), 400)
+
+        max_names = app.config.get("FETCH_BATCH_MAX_NAMES", 50)
+        if len(names) > max_names:
+            return make_response(jsonify({
+                "status": "error",
+                "message": f"At most {max_names} Pokémon can be fetched at once"
+            }), 400)
+
+        max_age = app.config.get("POKEMON_CACHE_MAX_AGE", 300)
+        try:
+            if request.method == 'GET':
+                # Only a batch served entirely from stored rows is cacheable; its ETag is known before
+                # anything is fetched, so a revalidation never reaches PokéAPI or writes a row
+                stored = Pokemons.stored_results(names)
+                if stored is not None:
+                    etag = make_etag(*[(result["name"], result["source"], result["pokemon"]) for result in stored])
+                    return conditional_response(etag, lambda: jsonify({
+                        "status": "success",
+                        "results": stored
+                    }), max_age)
+
+            results = Pokemons.fetch_many(names, max_workers=app.config.get("FETCH_BATCH_MAX_WORKERS", 8))
+        except requests.exceptions.RequestException as e:
+            app.logger.error(f"Batch fetch failed upstream: {e}")
+            return upstream_unavailable(e)
+        except Exception as e:
+            app.logger.error(f"Batch fetch failed: {e}")
+            return make_response(jsonify({
+                "status": "error",
+                "message": "An internal error occurred while fetching Pokémon",
+                "details": str(e)
+            }), 500)
+
+        return make_response(jsonify({
             "status": "success",
-            "pokemon": {
-                "name": name.lower(),
-                "attack": attack,
-                "defense": defense
-            },
-            "source": "external API and saved to DB"
-        }), 201
+            "results": results
+        }), 200)
+
+    @app.route('/api/import-pokedex', methods=['POST'])
+    @login_required
+    def import_pokedex_route() -> Response:
+        data = request.get_json(silent=True) or {}
+        limit = data.get("limit")
+        max_workers_cap = app.config.get("IMPORT_MAX_WORKERS", 8)
+        batch_size_cap = app.config.get("IMPORT_BATCH_SIZE", 500)
+        max_workers = data.get("max_workers", max_workers_cap)
+        batch_size = data.get("batch_size", batch_size_cap)
+
+        if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+            return make_response(jsonify({
+                "status": "error",
+                "message": "limit must be a positive integer"
+            }), 400)
+
+        for field, value, cap in (("max_workers", max_workers, max_workers_cap),
+                                  ("batch_size", batch_size, batch_size_cap)):
+            if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= cap:
+                return make_response(jsonify({
+                    "status": "error",
+                    "message": f"{field} must be an integer between 1 and {cap}"
+                }), 400)
+
+        try:
+            app.logger.info(f"Received request to import the Pokédex ({limit=})")
+            # A bulk import is expected to take far longer than one request's budget
+            set_deadline(None)
+            summary = import_pokedex(limit=limit, max_workers=max_workers, batch_size=batch_size)
+            return make_response(jsonify({
+                "status": "success",
+                "message": f"Imported {summary['imported']} Pokémon",
+                "summary": summary
+            }), 200)
+
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400)
+        except requests.exceptions.RequestException as e:
+            app.logger.error(f"Pokédex import failed: {e}")
+            return upstream_unavailable(e)
+        except Exception as e:
+            app.logger.error(f"Pokédex import failed: {e}")
+            return make_response(jsonify({
+                "status": "error",
+                "message": "An internal error occurred while importing the Pokédex",
+                "details": str(e)
+            }), 500)
+
+    def record_battle(result: BattleResult):
+        """Hand a fought battle to the recorder, which also rates it, and announce it to the live feed."""
+        get_battle_recorder().record(result, username=current_user.get_id())
+        replay_log = get_replay_log()
+        if replay_log is not None:
+            replay_log.append(result)
+        get_broadcaster().publish({
+            "pokemon_1": result.pokemon_1_name,
+            "pokemon_2": result.pokemon_2_name,
+            "skill_1": result.skill_1,
+            "skill_2": result.skill_2,
+            "winner": result.winner_name,
+            "fought_at": result.fought_at
+        })
+
+    # Arena IDs are signed lists of members, so any worker can check membership without shared state
+    arena_ids = URLSafeSerializer(app.config["SECRET_KEY"], salt="arena")
+
+    def arena_key() -> str:
+        """
+        The arena a battle request acts on: an explicit 'arena' ID if given, otherwise the user's own.
+
+        Raises:
+            PermissionError: If the arena ID wasn't issued by /api/arenas or the user isn't one of its members.
+        """
+        data = request.get_json(silent=True) or {}
+        arena_id = request.args.get("arena") or data.get("arena")
+        if not arena_id:
+            return f"user:{current_user.get_id()}"
+        try:
+            arena = arena_ids.loads(arena_id)
+        except BadSignature:
+            raise PermissionError("Unknown arena")
+        if current_user.get_id() not in arena["members"]:
+            raise PermissionError("You are not a member of this arena")
+        return f"arena:{arena['id']}"
+
+    @app.route('/api/arenas', methods=['POST'])
+    @login_required
+    def create_arena() -> Response:
+        data = request.get_json(silent=True) or {}
+        members = data.get("members")
+        max_members = app.config.get("ARENA_MAX_MEMBERS", 16)
+
+        if not isinstance(members, list) or not all(isinstance(member, str) and member for member in members):
+            return make_response(jsonify({
+                "status": "error",
+                "message": "members must be a list of usernames"
+            }), 400)
+
+        members = sorted({current_user.get_id(), *members})
+        if len(members) > max_members:
+            return make_response(jsonify({
+                "status": "error",
+                "message": f"An arena has at most {max_members} members"
+            }), 400)
+
+        return make_response(jsonify({
+            "status": "success",
+            "arena": arena_ids.dumps({"id": uuid.uuid4().hex, "members": members}),
+            "members": members
+        }), 201)
 
     @app.route('/api/enter-ring', methods=['POST'])
     @login_required
@@ -256,15 +551,21 @@ def create_app(config_class=ProductionConfig):
                 "message": "Missing Pokémon name"
             }), 400)
 
-        pokemon = Pokemons.query.filter_by(name=name.lower()).first()
-        if not pokemon:
+        try:
+            pokemon = Pokemons.get_stats_by_name(name.lower())
+        except ValueError:
             return make_response(jsonify({
                 "status": "error",
                 "message": f"Pokémon '{name}' not found"
             }), 404)
 
         try:
-            battle_model.enter_battlefield(pokemon.id)
+            get_battlefield_store().enter(arena_key(), pokemon.id, entrant=current_user.get_id())
+        except PermissionError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 403)
         except ValueError as e:
             return make_response(jsonify({
                 "status": "error",
@@ -280,17 +581,580 @@ def create_app(config_class=ProductionConfig):
     @login_required
     def battle():
         try:
-            winner = battle_model.battle()
+            seed = request.args.get("seed", type=int)
+            randomness = SeededRandomness(seed) if seed is not None else None
+            result = get_battlefield_store().battle(arena_key(), randomness)
+            # A seed lets the caller choose the outcome, so replays never reach the history or the ratings
+            if seed is None:
+                record_battle(result)
             return jsonify({
                 "status": "success",
-                "winner": winner
+                "winner": result.winner_name,
+                "recorded": seed is None
             }), 200
+        except PermissionError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 403)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400)
+
+    @app.route('/api/quick-battle', methods=['POST'])
+    @login_required
+    def quick_battle() -> Response:
+        data = request.get_json(silent=True) or {}
+        names = [str(data.get(key, "")).strip().lower() for key in ("pokemon_1", "pokemon_2")]
+        seed = data.get("seed")
+        if not all(names):
+            return make_response(jsonify({
+                "status": "error",
+                "message": "Both pokemon_1 and pokemon_2 are required"
+            }), 400)
+        if names[0] == names[1]:
+            return make_response(jsonify({
+                "status": "error",
+                "message": "A pokemon can't fight itself"
+            }), 400)
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+            return make_response(jsonify({
+                "status": "error",
+                "message": "seed must be an integer"
+            }), 400)
+
+        try:
+            stats = Pokemons.get_stats_by_names(names)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 404)
+
+        battle_model = BattleModel(SeededRandomness(seed) if seed is not None else None)
+        battle_model.battlefield.extend(Combatant.from_stats(stats[name]) for name in names)
+        battle_model.entrants.extend([current_user.get_id()] * 2)
+        result = battle_model.fight()
+        # As with /api/battle, a seeded fight is a replay and never reaches the history or the ratings
+        if seed is None:
+            record_battle(result)
+
+        return make_response(jsonify({
+            "status": "success",
+            "pokemon_1": result.pokemon_1_name,
+            "pokemon_2": result.pokemon_2_name,
+            "skill_1": result.skill_1,
+            "skill_2": result.skill_2,
+            "winner": result.winner_name,
+            "recorded": seed is None
+        }), 200)
+
+    @app.route('/api/battle-royale', methods=['POST'])
+    @login_required
+    def battle_royale_route() -> Response:
+        data = request.get_json(silent=True) or {}
+        names = data.get("pokemons")
+        seed = data.get("seed")
+        max_entrants = app.config.get("BATTLE_ROYALE_MAX_ENTRANTS", 10_000)
+
+        if not isinstance(names, list) or not 2 <= len(names) <= max_entrants:
+            return make_response(jsonify({
+                "status": "error",
+                "message": f"pokemons must be a list of 2 to {max_entrants} names"
+            }), 400)
+        names = [str(name).strip().lower() for name in names]
+        if len(set(names)) != len(names):
+            return make_response(jsonify({
+                "status": "error",
+                "message": "Each pokemon can only enter once"
+            }), 400)
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+            return make_response(jsonify({
+                "status": "error",
+                "message": "seed must be an integer"
+            }), 400)
+
+        try:
+            stats = Pokemons.get_stats_by_names(names)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 404)
+
+        # One block holds every draw of the event; seeded, it is the same stream as SeededRandomness(seed)
+        result = battle_royale([Combatant.from_stats(stats[name]) for name in names],
+                               BufferedRandomness(seed, block_size=len(names) - 1) if seed is not None else None)
+
+        return make_response(jsonify({
+            "status": "success",
+            "winner": result.winner.name,
+            "rounds": result.rounds,
+            "eliminations": [
+                {"round": e.round, "name": e.name, "eliminated_by": e.eliminated_by}
+                for e in result.eliminations
+            ]
+        }), 200)
+
+    @app.route('/api/tournament', methods=['GET', 'POST'])
+    @login_required
+    def tournament() -> Response:
+        # EventSource clients can only GET, so the bracket can also come as ?pokemons=a,b,c,d&seed=1
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            names, seed = data.get("pokemons"), data.get("seed")
+        else:
+            names = [name for name in request.args.get("pokemons", "").split(",") if name.strip()]
+            seed = request.args.get("seed", type=int)
+
+        max_entrants = app.config.get("TOURNAMENT_MAX_ENTRANTS", 4096)
+        if not isinstance(names, list) or len(names) > max_entrants:
+            return make_response(jsonify({
+                "status": "error",
+                "message": f"pokemons must be a list of at most {max_entrants} names"
+            }), 400)
+        names = [str(name).strip().lower() for name in names]
+        if len(set(names)) != len(names):
+            return make_response(jsonify({
+                "status": "error",
+                "message": "Each pokemon can only enter once"
+            }), 400)
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+            return make_response(jsonify({
+                "status": "error",
+                "message": "seed must be an integer"
+            }), 400)
+
+        try:
+            stats = Pokemons.get_stats_by_names(names)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 404)
+
+        parallel_threshold = app.config.get("TOURNAMENT_PARALLEL_THRESHOLD", 65536)
+        # The first round is the largest; a bracket none of whose rounds is worth the pool never starts it
+        pool = get_odds_pool()[0] if len(names) // 2 >= parallel_threshold else None
+        try:
+            rounds = run_tournament([Combatant.from_stats(stats[name]) for name in names], seed=seed,
+                                    chunk_size=app.config.get("TOURNAMENT_CHUNK_SIZE", 1024), executor=pool,
+                                    parallel_threshold=parallel_threshold)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400)
+
+        def events():
+            try:
+                for bracket_round in rounds:
+                    yield format_sse({
+                        "round": bracket_round.round,
+                        "matches": [
+                            {"pokemon_1": m.pokemon_1.name, "pokemon_2": m.pokemon_2.name, "winner": m.winner.name}
+                            for m in bracket_round.matches
+                        ]
+                    }, event="round", event_id=str(bracket_round.round))
+                final = bracket_round.matches[0]
+                yield format_sse({"winner": final.winner.name, "rounds": bracket_round.round}, event="champion")
+            except Exception as e:
+                app.logger.error(f"Tournament failed: {e}")
+                yield format_sse({"message": "An internal error occurred while running the tournament",
+                                  "details": str(e)}, event="error")
+
+        return Response(stream_with_context(events()), mimetype="text/event-stream", headers=SSE_HEADERS)
+
+    @app.route('/api/battles/stream', methods=['GET'])
+    @login_required
+    def battle_stream() -> Response:
+        broadcaster = get_broadcaster()
+        try:
+            subscription = broadcaster.subscribe(owner=current_user.get_id())
+        except TooManySubscriptionsError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 429)
         except ValueError as e:
             return make_response(jsonify({
                 "status": "error",
                 "message": str(e)
+            }), 503)
+        keepalive = app.config.get("BATTLE_STREAM_KEEPALIVE", 15.0)
+
+        def events():
+            try:
+                yield ": connected\n\n"
+                while not subscription.closed:
+                    battles, dropped = subscription.get(timeout=keepalive)
+                    if dropped:
+                        yield format_sse({"dropped": dropped}, event="dropped")
+                    for sequence, battle in battles:
+                        yield format_sse(battle, event="battle", event_id=str(sequence))
+                    if not battles and not dropped:
+                        # A comment line keeps proxies from closing an idle connection
+                        yield ": keepalive\n\n"
+            finally:
+                broadcaster.unsubscribe(subscription)
+
+        response = Response(events(), mimetype="text/event-stream", headers=SSE_HEADERS)
+        # The generator's finally only runs if streaming started; this covers clients that never read
+        response.call_on_close(lambda: broadcaster.unsubscribe(subscription))
+        return response
+
+    @app.route('/api/battle/simulate', methods=['POST'])
+    @login_required
+    def simulate_battles() -> Response:
+        data = request.get_json(silent=True) or {}
+        matchups = data.get("matchups")
+        fights = data.get("fights", 1000)
+        seed = data.get("seed")
+
+        if (not matchups or not isinstance(matchups, list)
+                or not all(isinstance(pair, list) and len(pair) == 2 and all(isinstance(name, str) for name in pair)
+                           for pair in matchups)):
+            return make_response(jsonify({
+                "status": "error",
+                "message": "A non-empty list of [name, name] matchups is required"
+            }), 400)
+
+        if not isinstance(fights, int) or isinstance(fights, bool) or fights < 1:
+            return make_response(jsonify({
+                "status": "error",
+                "message": "fights must be a positive integer"
+            }), 400)
+
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+            return make_response(jsonify({
+                "status": "error",
+                "message": "seed must be a non-negative integer"
+            }), 400)
+
+        max_fights = app.config.get("SIMULATE_MAX_FIGHTS", 1_000_000)
+        if len(matchups) * fights > max_fights:
+            return make_response(jsonify({
+                "status": "error",
+                "message": f"At most {max_fights} fights can be simulated at once"
+            }), 400)
+
+        pairs = []
+        for first, second in matchups:
+            try:
+                pairs.append((Pokemons.get_stats_by_name(first.strip().lower()),
+                              Pokemons.get_stats_by_name(second.strip().lower())))
+            except ValueError as e:
+                return make_response(jsonify({
+                    "status": "error",
+                    "message": str(e)
+                }), 404)
+
+        wins = simulate_matchups(pairs, fights, rng=np.random.default_rng(seed))
+        return make_response(jsonify({
+            "status": "success",
+            "fights": fights,
+            "results": [
+                {
+                    "pokemon_1": first.name,
+                    "pokemon_2": second.name,
+                    "wins_1": int(first_wins),
+                    "wins_2": fights - int(first_wins),
+                    "win_rate_1": int(first_wins) / fights
+                }
+                for (first, second), first_wins in zip(pairs, wins)
+            ]
+        }), 200)
+
+    @app.route('/api/battle/odds', methods=['GET'])
+    @login_required
+    def battle_odds() -> Response:
+        first_name = request.args.get("p1", "").strip().lower()
+        second_name = request.args.get("p2", "").strip().lower()
+        trials = request.args.get("n", 100_000, type=int)
+        seed = request.args.get("seed", type=int)
+        tolerance = request.args.get("tolerance", app.config.get("ODDS_TOLERANCE", 0.001), type=float)
+
+        if not first_name or not second_name:
+            return make_response(jsonify({
+                "status": "error",
+                "message": "Both p1 and p2 are required"
+            }), 400)
+
+        max_trials = app.config.get("ODDS_MAX_TRIALS", 10_000_000)
+        if trials is None or not 0 < trials <= max_trials:
+            return make_response(jsonify({
+                "status": "error",
+                "message": f"n must be between 1 and {max_trials}"
             }), 400)
 
+        try:
+            first = Pokemons.get_stats_by_name(first_name)
+            second = Pokemons.get_stats_by_name(second_name)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 404)
+
+        pool, workers = get_odds_pool()
+        try:
+            odds = estimate_odds(first, second, trials, tolerance=tolerance, seed=seed,
+                                 chunk_size=app.config.get("ODDS_CHUNK_SIZE", 100_000),
+                                 executor=pool, workers=workers)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400)
+        except Exception as e:
+            app.logger.error(f"Odds estimation failed: {e}")
+            return make_response(jsonify({
+                "status": "error",
+                "message": "An internal error occurred while estimating odds",
+                "details": str(e)
+            }), 500)
+
+        return make_response(jsonify({
+            "status": "success",
+            "pokemon_1": first.name,
+            "pokemon_2": second.name,
+            **odds
+        }), 200)
+
+    @app.route('/api/battle/win-matrix', methods=['GET'])
+    def win_matrix() -> Response:
+        matrix = get_win_matrix()
+        try:
+            etag = make_etag(*matrix.etag_parts())
+        except Exception as e:
+            app.logger.error(f"Building the win matrix failed: {e}")
+            return make_response(jsonify({
+                "status": "error",
+                "message": "An internal error occurred while building the win matrix",
+                "details": str(e)
+            }), 500)
+
+        def render():
+            ids, names, probabilities = matrix.snapshot()
+            return jsonify({
+                "status": "success",
+                "ids": ids,
+                "pokemons": names,
+                "matrix": np.round(probabilities, 6).tolist()
+            })
+
+        return conditional_response(etag, render, app.config.get("POKEMON_CACHE_MAX_AGE", 300))
+
+    ##########################################################
+    #
+    # Matchmaking
+    #
+    ##########################################################
+
+    def matchmaking_response(ticket) -> Response:
+        """Fight a freshly matched pair if nobody has yet, then report the ticket."""
+        queue = get_matchmaking_queue()
+        if queue.claim(ticket):
+            first, second = (ticket, ticket.opponent) if ticket.first else (ticket.opponent, ticket)
+            battle_model = BattleModel()
+            battle_model.battlefield.extend(Combatant.from_stats(t.pokemon) for t in (first, second))
+            battle_model.entrants.extend([first.username, second.username])
+            try:
+                result = battle_model.fight()
+                record_battle(result)
+            except Exception as e:
+                queue.release(ticket)
+                app.logger.error(f"Matchmaking fight failed: {e}")
+                return make_response(jsonify({
+                    "status": "error",
+                    "message": "An internal error occurred while fighting the match",
+                    "details": str(e)
+                }), 500)
+            queue.complete(ticket, result)
+
+        return make_response(jsonify({
+            "status": "success",
+            **ticket.to_dict()
+        }), 200 if ticket.status == MATCHED else 202)
+
+    @app.route('/api/matchmaking', methods=['POST'])
+    @login_required
+    def join_matchmaking() -> Response:
+        data = request.get_json(silent=True) or {}
+        name = str(data.get("name", "")).strip().lower()
+        if not name:
+            return make_response(jsonify({
+                "status": "error",
+                "message": "Missing Pokémon name"
+            }), 400)
+
+        try:
+            pokemon = Pokemons.get_stats_by_name(name)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 404)
+
+        try:
+            ticket = get_matchmaking_queue().enqueue(current_user.get_id(), pokemon)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400)
+        return matchmaking_response(ticket)
+
+    @app.route('/api/matchmaking/<string:ticket_id>', methods=['GET'])
+    @login_required
+    def poll_matchmaking(ticket_id: str) -> Response:
+        try:
+            ticket = get_matchmaking_queue().poll(ticket_id, current_user.get_id())
+        except KeyError:
+            return make_response(jsonify({
+                "status": "error",
+                "message": f"Ticket '{ticket_id}' not found"
+            }), 404)
+        return matchmaking_response(ticket)
+
+    @app.route('/api/matchmaking/<string:ticket_id>', methods=['DELETE'])
+    @login_required
+    def cancel_matchmaking(ticket_id: str) -> Response:
+        try:
+            ticket = get_matchmaking_queue().cancel(ticket_id, current_user.get_id())
+        except KeyError:
+            return make_response(jsonify({
+                "status": "error",
+                "message": f"Ticket '{ticket_id}' not found"
+            }), 404)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400)
+        return make_response(jsonify({
+            "status": "success",
+            "message": f"Ticket '{ticket.id}' cancelled"
+        }), 200)
+
+    ##########################################################
+    #
+    # Leaderboard
+    #
+    ##########################################################
+
+    @app.route('/api/leaderboard', methods=['GET'])
+    def leaderboard_top() -> Response:
+        kind = request.args.get("kind", "pokemon").strip().lower()
+        top = request.args.get("top", 10, type=int)
+        max_top = app.config.get("LEADERBOARD_MAX_TOP", 100)
+        if top is None or not 0 < top <= max_top:
+            return make_response(jsonify({
+                "status": "error",
+                "message": f"top must be between 1 and {max_top}"
+            }), 400)
+
+        try:
+            entries = get_leaderboard().top(kind, top)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400)
+
+        return make_response(jsonify({
+            "status": "success",
+            "kind": kind,
+            "leaderboard": entries
+        }), 200)
+
+    @app.route('/api/leaderboard/rank', methods=['GET'])
+    def leaderboard_rank() -> Response:
+        kind = request.args.get("kind", "pokemon").strip().lower()
+        name = request.args.get("name", "").strip()
+        if kind == "pokemon":
+            name = name.lower()
+        if not name:
+            return make_response(jsonify({
+                "status": "error",
+                "message": "name is required"
+            }), 400)
+
+        try:
+            entry = get_leaderboard().rank_of(kind, name)
+        except ValueError as e:
+            return make_response(jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400)
+
+        if entry is None:
+            return make_response(jsonify({
+                "status": "error",
+                "message": f"'{name}' has no rating yet"
+            }), 404)
+
+        return make_response(jsonify({
+            "status": "success",
+            "kind": kind,
+            **entry
+        }), 200)
+
+    ##########################################################
+    #
+    # CLI
+    #
+    ##########################################################
+
+    @app.cli.command("import-pokedex")
+    @click.option("--limit", type=int, default=None, help="Only import the first N species.")
+    @click.option("--workers", type=int, default=None, help="Size of the fetch thread pool.")
+    @click.option("--batch-size", type=int, default=None, help="Rows written per transaction.")
+    @click.option("--snapshot", type=click.Path(dir_okay=False), default=None,
+                  help="Also write a stats snapshot of the table to this file.")
+    def import_pokedex_command(limit, workers, batch_size, snapshot):
+        """Pre-warm the pokemons table from the PokéAPI species listing."""
+        summary = import_pokedex(
+            limit=limit,
+            max_workers=workers or app.config.get("IMPORT_MAX_WORKERS", 8),
+            batch_size=batch_size or app.config.get("IMPORT_BATCH_SIZE", 500),
+        )
+        click.echo(f"Imported {summary['imported']} of {summary['listed']} species "
+                   f"in {summary['seconds']}s ({summary['failed']} failed)")
+        for name in summary["failed_names"]:
+            click.echo(f"  failed: {name}")
+        if snapshot:
+            count = write_snapshot(snapshot, Pokemons.all_stats())
+            click.echo(f"Wrote {count} Pokémon to snapshot {snapshot}")
+
+    @app.cli.command("export-snapshot")
+    @click.argument("path", type=click.Path(dir_okay=False))
+    def export_snapshot_command(path):
+        """Write the pokemons table to a memory-mappable stats snapshot."""
+        count = write_snapshot(path, Pokemons.all_stats())
+        click.echo(f"Wrote {count} Pokémon to snapshot {path}")
+
+    @app.cli.command("verify-replay-log")
+    @click.argument("directory", type=click.Path(file_okay=False), required=False)
+    def verify_replay_log_command(directory):
+        """Replay every logged battle and check that the same pokemon wins."""
+        directory = directory or app.config.get("REPLAY_LOG_DIR")
+        if not directory:
+            raise click.UsageError("Pass a directory or set REPLAY_LOG_DIR")
+
+        total = mismatched = 0
+        for path in list_segments(directory):
+            records = read_segment(path)
+            mismatches = int(np.count_nonzero(replay_winners(records) != records["winner_id"]))
+            click.echo(f"{os.path.basename(path)}: {len(records)} battles, {mismatches} mismatched")
+            total += len(records)
+            mismatched += mismatches
+        click.echo(f"Replayed {total} battles, {mismatched} mismatched")
+        if mismatched:
+            raise SystemExit(1)
+
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,61 @@
+"""Fights per second: looping BattleModel.battle() vs the vectorized batch engine.
+
+Usage:
+    python -m benchmarks.bench_battle_engine [--fights 1000000] [--loop-fights 20000]
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from models.battle_engine import simulate_battles
+from models.pokemon_battle_model import BattleModel, Combatant
+from models.stat_cache import PokemonStats
+
+
+def random_stats(count, rng):
+    return rng.uniform(5, 190, size=(4, count))
+
+
+def loop_battles(stats):
+    battle_model = BattleModel()
+    attack_1, defense_1, attack_2, defense_2 = stats
+    start = time.perf_counter()
+    for i in range(stats.shape[1]):
+        # battle() clears the ring, so both combatants re-enter before every fight
+        battle_model.battlefield = [
+            Combatant.from_stats(PokemonStats(id=1, name="first", attack=attack_1[i], defense=defense_1[i])),
+            Combatant.from_stats(PokemonStats(id=2, name="second", attack=attack_2[i], defense=defense_2[i])),
+        ]
+        battle_model.battle()
+    return time.perf_counter() - start
+
+
+def vectorized_battles(stats, rng):
+    start = time.perf_counter()
+    simulate_battles(*stats, rng=rng)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fights", type=int, default=1_000_000)
+    parser.add_argument("--loop-fights", type=int, default=20_000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    rng = np.random.default_rng(0)
+    loop_seconds = loop_battles(random_stats(args.loop_fights, rng))
+    vector_seconds = vectorized_battles(random_stats(args.fights, rng), rng)
+
+    loop_rate = args.loop_fights / loop_seconds
+    vector_rate = args.fights / vector_seconds
+    print(f"battle() loop : {args.loop_fights:>9} fights in {loop_seconds:7.3f}s, {loop_rate:14,.0f} fights/s")
+    print(f"batch engine  : {args.fights:>9} fights in {vector_seconds:7.3f}s, {vector_rate:14,.0f} fights/s")
+    print(f"speedup       : {vector_rate / loop_rate:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Battle royale latency by field size.
+
+Usage:
+    python -m benchmarks.bench_battle_royale [--entrants 10000] [--repeat 5]
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from models.battle_royale import battle_royale
+from models.pokemon_battle_model import Combatant
+from models.randomness import SeededRandomness
+from models.stat_cache import PokemonStats
+
+
+def random_field(count, rng):
+    attack, defense = rng.uniform(5, 190, size=(2, count))
+    return [Combatant.from_stats(PokemonStats(id=i, name=f"p{i}", attack=float(attack[i]), defense=float(defense[i])))
+            for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entrants", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    rng = np.random.default_rng(0)
+    for size in sorted({args.entrants // 100, args.entrants // 10, args.entrants} - {0, 1}):
+        field = random_field(size, rng)
+        timings = []
+        for seed in range(args.repeat):
+            start = time.perf_counter()
+            battle_royale(field, SeededRandomness(seed))
+            timings.append(time.perf_counter() - start)
+        print(f"{size:>9} entrants: best {min(timings) * 1000:8.2f} ms, "
+              f"median {sorted(timings)[len(timings) // 2] * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
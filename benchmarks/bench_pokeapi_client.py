@@ -0,0 +1,79 @@
+"""Cache-miss throughput against a local PokéAPI stub: bare requests.get vs the pooled client.
+
+The stub runs in its own process so it does not share a GIL with the client.
+
+Usage:
+    python -m benchmarks.bench_pokeapi_client [--requests 1000] [--threads 8] [--connect-delay 0.005]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from models.pokeapi_client import PokeAPIClient
+from tests.pokeapi_stub import DEFAULT_POKEMONS, PokeAPIStub
+
+
+def serve(conn, moves, connect_delay):
+    stub = PokeAPIStub(moves=moves, connect_delay=connect_delay).start()
+    conn.send(stub.base_url)
+    while conn.recv() == "connections":
+        conn.send(stub.connections)
+    stub.stop()
+
+
+def run(fetch, names, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for status in pool.map(fetch, names):
+            assert status == 200
+    return len(names) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--connect-delay", type=float, default=0.005,
+                        help="seconds the stub sleeps per new connection (handshake stand-in)")
+    parser.add_argument("--moves", type=int, default=80, help="filler moves per payload")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    conn, child_conn = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(child_conn, args.moves, args.connect_delay), daemon=True)
+    server.start()
+    base_url = conn.recv()
+
+    def connections():
+        conn.send("connections")
+        return conn.recv()
+
+    names = [list(DEFAULT_POKEMONS)[i % len(DEFAULT_POKEMONS)] for i in range(args.requests)]
+    try:
+        before = connections()
+        bare = run(lambda name: requests.get(f"{base_url}/pokemon/{name}").status_code,
+                   names, args.threads)
+        bare_connections = connections() - before
+
+        client = PokeAPIClient(base_url=base_url, pool_size=args.threads)
+        before = connections()
+        pooled = run(lambda name: client.get(f"pokemon/{name}").status_code, names, args.threads)
+        pooled_connections = connections() - before
+        client.close()
+    finally:
+        conn.send("stop")
+        server.join()
+
+    print(f"{args.requests} misses, {args.threads} threads, connect delay {args.connect_delay * 1000:.1f} ms")
+    print(f"bare requests.get : {bare:8.1f} misses/sec  ({bare_connections} connections)")
+    print(f"pooled client     : {pooled:8.1f} misses/sec  ({pooled_connections} connections)")
+    print(f"speedup           : {pooled / bare:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
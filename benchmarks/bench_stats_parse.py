@@ -0,0 +1,98 @@
+"""Full json.loads vs streaming stats extraction on /pokemon payloads.
+
+Pass a directory of recorded PokéAPI /pokemon/{name} responses with --payload-dir;
+without one, synthetic payloads shaped and sized like real ones are used.
+
+Usage:
+    python -m benchmarks.bench_stats_parse [--payload-dir DIR] [--rounds 200]
+"""
+
+import argparse
+import json
+import logging
+import pathlib
+import time
+import tracemalloc
+
+from models.api_utils import STREAM_CHUNK_SIZE
+from models.stats_parser import extract_stats
+from tests.pokeapi_stub import make_pokemon_payload
+
+
+def synthetic_payloads(count=5):
+    payloads = []
+    for i in range(count):
+        document = make_pokemon_payload(i + 1, f"species-{i}", 50 + i, 40 + i, moves=90)
+        for move in document["moves"]:
+            move["version_group_details"] = move["version_group_details"] * 15
+        document["game_indices"] = [
+            {"game_index": i, "version": {"name": f"version-{v}", "url": f"https://pokeapi.co/api/v2/version/{v}/"}}
+            for v in range(20)
+        ]
+        document["sprites"] = {
+            "versions": {
+                f"generation-{g}": {
+                    f"game-{v}": {f"front_{k}": f"https://raw.githubusercontent.com/PokeAPI/sprites/master/{g}/{v}/{k}.png"
+                                  for k in ("default", "shiny", "female", "shiny_female")}
+                    for v in range(4)
+                }
+                for g in range(8)
+            }
+        }
+        document["past_stats"] = [{"generation": {"name": "generation-v"}, "stats": document["stats"][:2]}]
+        payloads.append(json.dumps(document).encode())
+    return payloads
+
+
+def full_parse(body):
+    data = json.loads(body)
+    return {stat["stat"]["name"]: stat["base_stat"] for stat in data["stats"]}
+
+
+def streaming_parse(body):
+    chunks = (body[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(body), STREAM_CHUNK_SIZE))
+    return extract_stats(chunks)
+
+
+def measure(parse, payloads, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for body in payloads:
+            parse(body)
+    per_call = (time.perf_counter() - start) / (rounds * len(payloads))
+
+    peak = 0
+    for body in payloads:
+        tracemalloc.start()
+        parse(body)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return per_call, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payload-dir", type=pathlib.Path)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    if args.payload_dir:
+        payloads = [path.read_bytes() for path in sorted(args.payload_dir.glob("*.json"))]
+        source = str(args.payload_dir)
+    else:
+        payloads = synthetic_payloads()
+        source = "synthetic"
+
+    for body in payloads:
+        assert full_parse(body) == streaming_parse(body)
+
+    average_kb = sum(len(body) for body in payloads) / len(payloads) / 1024
+    print(f"{len(payloads)} {source} payloads, {average_kb:.0f} KB average, {args.rounds} rounds")
+    for label, parse in (("json.loads  ", full_parse), ("streaming   ", streaming_parse)):
+        per_call, peak = measure(parse, payloads, args.rounds)
+        print(f"{label}: {per_call * 1e6:8.1f} us/payload, peak {peak / 1024:8.1f} KB allocated")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,8 +13,68 @@ class ProductionConfig():
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', "sqlite:///app.db")  # Local DB file
+    POKEAPI_BASE_URL = os.getenv("POKEAPI_BASE_URL", "https://pokeapi.co/api/v2")
+    POKEAPI_POOL_SIZE = int(os.getenv("POKEAPI_POOL_SIZE", 10))
+    POKEAPI_CONNECT_TIMEOUT = float(os.getenv("POKEAPI_CONNECT_TIMEOUT", 3.05))
+    POKEAPI_READ_TIMEOUT = float(os.getenv("POKEAPI_READ_TIMEOUT", 10.0))
+    POKEAPI_MAX_RETRIES = int(os.getenv("POKEAPI_MAX_RETRIES", 2))
+    POKEAPI_BACKOFF_FACTOR = float(os.getenv("POKEAPI_BACKOFF_FACTOR", 0.3))
+    POKEAPI_BREAKER_FAILURE_RATE = float(os.getenv("POKEAPI_BREAKER_FAILURE_RATE", 0.5))
+    POKEAPI_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("POKEAPI_BREAKER_SLOW_CALL_SECONDS", 2.0))
+    POKEAPI_BREAKER_SLOW_CALL_RATE = float(os.getenv("POKEAPI_BREAKER_SLOW_CALL_RATE", 0.5))
+    POKEAPI_BREAKER_WINDOW = int(os.getenv("POKEAPI_BREAKER_WINDOW", 20))
+    POKEAPI_BREAKER_MIN_CALLS = int(os.getenv("POKEAPI_BREAKER_MIN_CALLS", 5))
+    POKEAPI_BREAKER_OPEN_SECONDS = float(os.getenv("POKEAPI_BREAKER_OPEN_SECONDS", 30))
+    UPSTREAM_DEADLINE_SECONDS = float(os.getenv("UPSTREAM_DEADLINE_SECONDS", 5))
+    IMPORT_MAX_WORKERS = int(os.getenv("IMPORT_MAX_WORKERS", 8))
+    IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 500))
+    FETCH_BATCH_MAX_NAMES = int(os.getenv("FETCH_BATCH_MAX_NAMES", 50))
+    FETCH_BATCH_MAX_WORKERS = int(os.getenv("FETCH_BATCH_MAX_WORKERS", 8))
+    NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", 3600))
+    NEGATIVE_CACHE_MAXSIZE = int(os.getenv("NEGATIVE_CACHE_MAXSIZE", 10000))
+    NEGATIVE_CACHE_PERSIST = os.getenv("NEGATIVE_CACHE_PERSIST", "false").lower() == "true"
+    STAT_CACHE_MAXSIZE = int(os.getenv("STAT_CACHE_MAXSIZE", 4096))
+    STAT_CACHE_TTL = float(os.getenv("STAT_CACHE_TTL", 600))
+    STAT_CACHE_WARM = os.getenv("STAT_CACHE_WARM", "false").lower() == "true"
+    STATS_SNAPSHOT_PATH = os.getenv("STATS_SNAPSHOT_PATH")
+    POKEMON_CACHE_MAX_AGE = int(os.getenv("POKEMON_CACHE_MAX_AGE", 300))
+    SIMULATE_MAX_FIGHTS = int(os.getenv("SIMULATE_MAX_FIGHTS", 1_000_000))
+    ARENA_LOCK_STRIPES = int(os.getenv("ARENA_LOCK_STRIPES", 16))
+    ARENA_TTL = float(os.getenv("ARENA_TTL", 1800))
+    ARENA_MAXSIZE = int(os.getenv("ARENA_MAXSIZE", 10000))
+    ARENA_MAX_MEMBERS = int(os.getenv("ARENA_MAX_MEMBERS", 16))
+    BATTLEFIELD_STORE = os.getenv("BATTLEFIELD_STORE", "memory")
+    BATTLEFIELD_SQLITE_PATH = os.getenv("BATTLEFIELD_SQLITE_PATH", "battlefields.db")
+    ODDS_WORKERS = int(os.getenv("ODDS_WORKERS", 2))
+    ODDS_CHUNK_SIZE = int(os.getenv("ODDS_CHUNK_SIZE", 100_000))
+    ODDS_MAX_TRIALS = int(os.getenv("ODDS_MAX_TRIALS", 10_000_000))
+    ODDS_TOLERANCE = float(os.getenv("ODDS_TOLERANCE", 0.001))
+    BATTLE_HISTORY_QUEUE_SIZE = int(os.getenv("BATTLE_HISTORY_QUEUE_SIZE", 10000))
+    BATTLE_HISTORY_BATCH_SIZE = int(os.getenv("BATTLE_HISTORY_BATCH_SIZE", 500))
+    BATTLE_HISTORY_FLUSH_INTERVAL = float(os.getenv("BATTLE_HISTORY_FLUSH_INTERVAL", 1.0))
+    BATTLE_HISTORY_BLOCK_TIMEOUT = float(os.getenv("BATTLE_HISTORY_BLOCK_TIMEOUT", 0.0))
+    BATTLE_HISTORY_SYNC = os.getenv("BATTLE_HISTORY_SYNC", "false").lower() == "true"
+    LEADERBOARD_K_FACTOR = float(os.getenv("LEADERBOARD_K_FACTOR", 32.0))
+    LEADERBOARD_INITIAL_RATING = float(os.getenv("LEADERBOARD_INITIAL_RATING", 1500.0))
+    LEADERBOARD_MAX_TOP = int(os.getenv("LEADERBOARD_MAX_TOP", 100))
+    MATCHMAKING_BASE_TOLERANCE = float(os.getenv("MATCHMAKING_BASE_TOLERANCE", 10.0))
+    MATCHMAKING_WIDEN_PER_SECOND = float(os.getenv("MATCHMAKING_WIDEN_PER_SECOND", 5.0))
+    MATCHMAKING_TIMEOUT = float(os.getenv("MATCHMAKING_TIMEOUT", 60.0))
+    REPLAY_LOG_DIR = os.getenv("REPLAY_LOG_DIR")
+    REPLAY_SEGMENT_RECORDS = int(os.getenv("REPLAY_SEGMENT_RECORDS", 1_000_000))
+    BATTLE_ROYALE_MAX_ENTRANTS = int(os.getenv("BATTLE_ROYALE_MAX_ENTRANTS", 10_000))
+    TOURNAMENT_MAX_ENTRANTS = int(os.getenv("TOURNAMENT_MAX_ENTRANTS", 4096))
+    TOURNAMENT_CHUNK_SIZE = int(os.getenv("TOURNAMENT_CHUNK_SIZE", 1024))
+    TOURNAMENT_PARALLEL_THRESHOLD = int(os.getenv("TOURNAMENT_PARALLEL_THRESHOLD", 65536))
+    BATTLE_STREAM_BUFFER_SIZE = int(os.getenv("BATTLE_STREAM_BUFFER_SIZE", 256))
+    BATTLE_STREAM_MAX_SUBSCRIBERS = int(os.getenv("BATTLE_STREAM_MAX_SUBSCRIBERS", 1000))
+    BATTLE_STREAM_MAX_PER_USER = int(os.getenv("BATTLE_STREAM_MAX_PER_USER", 3))
+    BATTLE_STREAM_KEEPALIVE = float(os.getenv("BATTLE_STREAM_KEEPALIVE", 15.0))
 
 class TestConfig():
     """Testing configuration."""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
\ No newline at end of file
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SECRET_KEY = "test-secret-key"
+    ODDS_WORKERS = 0
+    BATTLE_HISTORY_SYNC = True
\ No newline at end of file
@@ -1,31 +1,55 @@
 import logging
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
 
 from models.logger import configure_logger
+from models.negative_cache import get_negative_cache
+from models.pokeapi_client import get_client, get_deadline, run_with_deadline
+from models.stats_parser import extract_stats
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
-def fetch_pokemon_data(pokemon_name):
-    """Use the API to fetch a pokemon's data
+STREAM_CHUNK_SIZE = 16 * 1024
+
+def stream_pokemon_stats(pokemon_name):
+    """Fetch a pokemon's base stats, parsing only the stats out of the response
+
+    The response body is read in chunks and scanned for the stats array, so the
+    rest of the document is never decoded into Python objects.
 
     Args:
-        pokemon_name (str): Pokemon's name
+        pokemon_name (str): Pokemon's name or ID
+
+    Raises:
+        requests.exceptions.RequestException: If PokéAPI can't be reached or answers with an error other than 404
 
     Returns:
-        json: The pokemon's data
+        Optional[Dict[str, int]]: stat name -> base stat, or None if PokéAPI doesn't know the pokemon
     """
-    url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name}/"
-    try:
-        logger.info(f"Fetching stats for {pokemon_name} from {url}")
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Couldn't fetch stats for {pokemon_name}")
+    negative_cache = get_negative_cache()
+    if negative_cache.contains(pokemon_name):
+        logger.info(f"Skipping PokéAPI for {pokemon_name}: known to be missing")
         return None
 
+    client = get_client()
+    path = f"pokemon/{pokemon_name}/"
+    logger.info(f"Streaming stats for {pokemon_name} from {client.url_for(path)}")
+    with client.get(path, stream=True) as response:
+        if response.status_code == 404:
+            negative_cache.add(pokemon_name)
+            return None
+        response.raise_for_status()
+
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        stats = extract_stats(chunks)
+        # Drain what's left so the connection goes back to the pool
+        for _ in chunks:
+            pass
+
+    return stats
+
 def get_attack_and_defense(pokemon_name):
     """Extract a pokemon's attack and defense stats
 
@@ -34,16 +58,19 @@ def get_attack_and_defense(pokemon_name):
 
     Raises:
         ValueError: If stats can't be found
+        requests.exceptions.RequestException: If PokéAPI can't be reached, answers with an error or the breaker is open
 
     Returns:
-        List[int]: List of pokemon stats
+        Optional[List[int]]: List of pokemon stats, or None if PokéAPI doesn't know the pokemon
     """
-    data = fetch_pokemon_data(pokemon_name)
-    if data is None:
+    try:
+        stats = stream_pokemon_stats(pokemon_name)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Couldn't fetch stats for {pokemon_name}: {e}")
+        raise
+    if stats is None:
         return
 
-    stats = {stat['stat']['name']: stat['base_stat'] for stat in data['stats']}
-
     attack = stats.get("attack", "Not found")
     defense = stats.get("defense", "Not found")
     
@@ -55,4 +82,71 @@ def get_attack_and_defense(pokemon_name):
 
     return [attack, defense]
 
+def get_attack_and_defense_many(pokemon_names, max_workers=8):
+    """Fetch several pokemons' attack and defense stats concurrently
+
+    Args:
+        pokemon_names (List[str]): Pokemons' names
+        max_workers (int): Size of the fetch thread pool
+
+    Raises:
+        requests.exceptions.RequestException: If any fetch fails upstream; fetches not started yet are cancelled
+
+    Returns:
+        Dict[str, Optional[List[int]]]: name -> [attack, defense], or None if PokéAPI doesn't know it or has no such stats
+    """
+    def fetch(pokemon_name):
+        try:
+            return get_attack_and_defense(pokemon_name)
+        except ValueError:
+            return None
+
+    if not pokemon_names:
+        return {}
+
+    workers = max(1, min(max_workers, len(pokemon_names)))
+    deadline = get_deadline()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Workers keep the request's deadline but not its app context, so they never touch its session
+        futures = [pool.submit(run_with_deadline, deadline, fetch, name) for name in pokemon_names]
+        try:
+            return {name: future.result() for name, future in zip(pokemon_names, futures)}
+        except requests.exceptions.RequestException:
+            # PokéAPI is failing or the breaker is open: fail the whole batch fast
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            get_negative_cache().persist_pending()
+
+def list_pokemon_species(page_size=200):
+    """Walk the PokéAPI species listing
+
+    Args:
+        page_size (int): How many entries to request per page
+
+    Raises:
+        requests.exceptions.RequestException: If a page can't be fetched
+
+    Returns:
+        List[Tuple[int, str]]: (species id, species name) pairs in listing order
+    """
+    client = get_client()
+    species = []
+    offset = 0
+    while True:
+        logger.info(f"Fetching species listing (offset {offset}, limit {page_size})")
+        response = client.get(f"pokemon-species/?offset={offset}&limit={page_size}")
+        response.raise_for_status()
+        page = response.json()
+
+        for entry in page["results"]:
+            species_id = int(entry["url"].rstrip("/").rsplit("/", 1)[-1])
+            species.append((species_id, entry["name"]))
+
+        offset += page_size
+        if not page.get("next") or offset >= page["count"]:
+            break
 
+    logger.info(f"Found {len(species)} species in PokéAPI")
+    return species
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+from models.logger import configure_logger
+from models.pokemon_battle_model import BattleModel
+from models.settings import setting
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class _Stripe:
+    """One lock and the arenas whose keys hash to it."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.arenas: "OrderedDict[str, Tuple[BattleModel, float]]" = OrderedDict()
+
+
+class ArenaManager:
+    """
+        Keeps one BattleModel per arena key (a user or an explicit arena ID).
+
+        Arenas are spread over a fixed number of lock stripes, so requests for
+        different arenas rarely wait on each other, while everything done to one
+        arena happens under its stripe's lock. Arenas that go unused for `ttl`
+        seconds are evicted.
+    """
+
+    def __init__(self, stripes: int = 16, ttl: float = 1800.0, maxsize: int = 10000):
+        """
+            Initializes a manager with no arenas.
+
+            Args:
+                stripes (int): Number of lock stripes.
+                ttl (float): Seconds an idle arena is kept.
+                maxsize (int): Maximum number of arenas kept; least recently used ones are evicted first.
+
+            Attributes:
+                created (int): Number of arenas created.
+                evicted (int): Number of arenas evicted for being idle or over maxsize.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.created = 0
+        self.evicted = 0
+        self._stripes: List[_Stripe] = [_Stripe() for _ in range(max(1, stripes))]
+        self._per_stripe = max(1, maxsize // len(self._stripes))
+        self._counter_lock = threading.Lock()
+
+    def _stripe(self, key: str) -> _Stripe:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    @contextmanager
+    def arena(self, key: str) -> Iterator[BattleModel]:
+        """
+            Locks an arena, creating it if needed, for the duration of the block.
+
+            Args:
+                key (str): The arena key, e.g. 'user:ash' or 'arena:finals'.
+
+            Yields:
+                BattleModel: The arena's battle model.
+        """
+        stripe = self._stripe(key)
+        with stripe.lock:
+            now = time.monotonic()
+            evicted = self._evict_idle(stripe, now)
+
+            entry = stripe.arenas.get(key)
+            created = entry is None
+            battle_model = BattleModel() if created else entry[0]
+            stripe.arenas[key] = (battle_model, now)
+            stripe.arenas.move_to_end(key)
+            while len(stripe.arenas) > self._per_stripe:
+                stripe.arenas.popitem(last=False)
+                evicted += 1
+
+            if created or evicted:
+                with self._counter_lock:
+                    self.created += created
+                    self.evicted += evicted
+            if created:
+                logger.info(f"Created arena '{key}'")
+
+            yield battle_model
+
+    def _evict_idle(self, stripe: _Stripe, now: float) -> int:
+        # Caller holds the stripe lock; arenas are ordered by last use
+        evicted = 0
+        while stripe.arenas:
+            key, (_, last_used) = next(iter(stripe.arenas.items()))
+            if now - last_used < self.ttl:
+                break
+            stripe.arenas.popitem(last=False)
+            logger.info(f"Evicted idle arena '{key}'")
+            evicted += 1
+        return evicted
+
+    def sweep(self) -> int:
+        """
+            Evicts idle arenas from every stripe.
+
+            Returns:
+                int: The number of arenas evicted.
+        """
+        now = time.monotonic()
+        evicted = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                evicted += self._evict_idle(stripe, now)
+        with self._counter_lock:
+            self.evicted += evicted
+        return evicted
+
+    def __len__(self) -> int:
+        return sum(len(stripe.arenas) for stripe in self._stripes)
+
+    def stats(self) -> dict:
+        """Returns the number of arenas and the lifecycle counters."""
+        with self._counter_lock:
+            return {
+                "arenas": len(self),
+                "stripes": len(self._stripes),
+                "ttl": self.ttl,
+                "created": self.created,
+                "evicted": self.evicted,
+            }
+
+
+_arena_manager = ArenaManager()
+
+
+def configure_arena_manager(config=None) -> ArenaManager:
+    """
+    Replace the shared arena manager with one built from a config mapping.
+
+    Args:
+        config (Mapping): Usually the Flask app.config. Missing keys fall back to
+            the ARENA_* environment variables and then to the defaults.
+
+    Returns:
+        ArenaManager: The new shared manager.
+    """
+    global _arena_manager
+    _arena_manager = ArenaManager(
+        stripes=setting(config, "ARENA_LOCK_STRIPES", 16, int),
+        ttl=setting(config, "ARENA_TTL", 1800.0, float),
+        maxsize=setting(config, "ARENA_MAXSIZE", 10000, int),
+    )
+    return _arena_manager
+
+
+def get_arena_manager() -> ArenaManager:
+    """Return the shared arena manager."""
+    return _arena_manager
@@ -0,0 +1,98 @@
+import logging
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+from models.logger import configure_logger
+from models.randomness import RandomnessProvider
+from models.stat_cache import PokemonStats
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+def get_pokemon_skills(attack, defense) -> np.ndarray:
+    """Vectorized BattleModel.get_pokemon_skills: skill = attack + defense.
+
+    Args:
+        attack (ArrayLike): Attack stats.
+        defense (ArrayLike): Defense stats, broadcastable against attack.
+
+    Returns:
+        np.ndarray: The skills, as float64.
+    """
+    return np.add(attack, defense, dtype=np.float64)
+
+
+def win_probabilities(skill_1, skill_2) -> np.ndarray:
+    """Vectorized normalized_delta from BattleModel.battle: 1 / (1 + e^-|skill_1 - skill_2|).
+
+    This is the probability that the first combatant wins.
+
+    Args:
+        skill_1 (ArrayLike): Skills of the first combatants.
+        skill_2 (ArrayLike): Skills of the second combatants.
+
+    Returns:
+        np.ndarray: The win probabilities of the first combatants.
+    """
+    # Work in one buffer instead of allocating a temporary per operation
+    probabilities = np.subtract(skill_1, skill_2, dtype=np.float64)
+    np.abs(probabilities, out=probabilities)
+    np.negative(probabilities, out=probabilities)
+    np.exp(probabilities, out=probabilities)
+    probabilities += 1.0
+    np.reciprocal(probabilities, out=probabilities)
+    return probabilities
+
+
+def simulate_battles(attack_1, defense_1, attack_2, defense_2,
+                     rng: Union[np.random.Generator, RandomnessProvider, None] = None) -> np.ndarray:
+    """Resolve many independent fights at once with the rules of BattleModel.battle.
+
+    Fight i pits (attack_1[i], defense_1[i]) against (attack_2[i], defense_2[i]);
+    the first combatant wins when its random draw falls below the normalized delta.
+
+    Args:
+        attack_1, defense_1 (ArrayLike): Stats of the first combatants.
+        attack_2, defense_2 (ArrayLike): Stats of the second combatants. All four must broadcast together.
+        rng (np.random.Generator or RandomnessProvider): Source of the draws. Defaults to a freshly seeded generator.
+
+    Returns:
+        np.ndarray: A boolean vector, True where the first combatant won.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    probabilities = win_probabilities(get_pokemon_skills(attack_1, defense_1),
+                                      get_pokemon_skills(attack_2, defense_2))
+    return rng.random(probabilities.shape) < probabilities
+
+
+def simulate_matchups(matchups: Sequence[Tuple[PokemonStats, PokemonStats]], fights: int,
+                      rng: Union[np.random.Generator, RandomnessProvider, None] = None) -> np.ndarray:
+    """Fight every matchup `fights` times and count the first combatant's wins.
+
+    Args:
+        matchups (Sequence[Tuple[PokemonStats, PokemonStats]]): The pairs to simulate.
+        fights (int): Fights per matchup.
+        rng (np.random.Generator or RandomnessProvider): Source of the draws. Defaults to a freshly seeded generator.
+
+    Returns:
+        np.ndarray: Wins of the first combatant, one count per matchup.
+
+    Raises:
+        ValueError: If fights is not positive.
+    """
+    if fights < 1:
+        raise ValueError("fights must be a positive integer")
+
+    stats = np.array([(first.attack, first.defense, second.attack, second.defense)
+                      for first, second in matchups], dtype=np.float64).reshape(-1, 4)
+    rng = rng if rng is not None else np.random.default_rng()
+    probabilities = win_probabilities(get_pokemon_skills(stats[:, 0], stats[:, 1]),
+                                      get_pokemon_skills(stats[:, 2], stats[:, 3]))
+    # One row of draws per matchup, compared against that matchup's probability
+    wins = rng.random((len(stats), fights)) < probabilities[:, None]
+    counts = np.count_nonzero(wins, axis=1)
+
+    logger.info(f"Simulated {len(stats) * fights} fights across {len(stats)} matchups")
+    return counts
@@ -0,0 +1,266 @@
+import atexit
+import logging
+import queue
+import threading
+from contextlib import nullcontext
+from typing import List, Optional, Tuple
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from db import db
+from models.leaderboard import Leaderboard
+from models.logger import configure_logger
+from models.pokemon_battle_model import BattleResult
+from models.settings import flag, setting
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class Battles(db.Model):
+    """One fought battle, kept for win rates and replays."""
+
+    __tablename__ = 'battles'
+
+    id = db.Column(db.Integer, primary_key=True)
+    pokemon_1_id = db.Column(db.Integer, nullable=False, index=True)
+    pokemon_1_name = db.Column(db.String, nullable=False)
+    pokemon_2_id = db.Column(db.Integer, nullable=False, index=True)
+    pokemon_2_name = db.Column(db.String, nullable=False)
+    skill_1 = db.Column(db.Float, nullable=False)
+    skill_2 = db.Column(db.Float, nullable=False)
+    draw = db.Column(db.Float, nullable=False)
+    winner_id = db.Column(db.Integer, nullable=False, index=True)
+    winner_name = db.Column(db.String, nullable=False)
+    username = db.Column(db.String, nullable=True, index=True)
+    entrant_1 = db.Column(db.String, nullable=True)
+    entrant_2 = db.Column(db.String, nullable=True)
+    fought_at = db.Column(db.Float, nullable=False, index=True)
+
+
+class BattleRecorder:
+    """
+        Write-behind persistence for battle results.
+
+        record() only puts the result on a bounded queue; a background thread
+        drains it and inserts the rows in batched transactions, so battle latency
+        doesn't include the database write. When the queue is full the result is
+        dropped (or, with block_timeout, the caller waits that long first) and
+        counted. In synchronous mode every result is written before record()
+        returns, which is what the tests use.
+
+        With a leaderboard, each batch's rating changes are made in the same
+        transaction as its rows, so the battle route never waits on the ratings
+        either.
+    """
+
+    def __init__(self, app: Flask, maxsize: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 1.0, block_timeout: float = 0.0, synchronous: bool = False,
+                 leaderboard: Optional[Leaderboard] = None):
+        """
+            Initializes a recorder; its writer thread starts with the first result.
+
+            Args:
+                app (Flask): The app whose database receives the rows.
+                maxsize (int): Maximum number of results waiting to be written.
+                batch_size (int): Maximum rows per transaction.
+                flush_interval (float): Longest a result waits before its batch is written.
+                block_timeout (float): Seconds record() waits for room in a full queue before dropping; 0 drops at once.
+                synchronous (bool): Write every result inline instead of queueing it.
+                leaderboard (Leaderboard): Rates every written fight, if given.
+
+            Attributes:
+                recorded (int): Results accepted.
+                dropped (int): Results lost because the queue stayed full.
+                blocked (int): Calls to record() that had to wait for room.
+                written (int): Rows committed.
+                batches (int): Transactions committed.
+                failed (int): Rows lost to database errors.
+                high_water (int): Largest queue depth seen.
+        """
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.synchronous = synchronous
+        self.leaderboard = leaderboard
+        self.recorded = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.high_water = 0
+        self._queue: "queue.Queue[Tuple[BattleResult, Optional[str]]]" = queue.Queue(maxsize=maxsize)
+        self._counter_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def record(self, result: BattleResult, username: Optional[str] = None) -> bool:
+        """
+            Hands a battle result over for persistence.
+
+            Args:
+                result (BattleResult): The fight.
+                username (str): Who started it, if anyone.
+
+            Returns:
+                bool: False if the result was dropped because the queue was full.
+        """
+        item = (result, username)
+        if self.synchronous:
+            with self._counter_lock:
+                self.recorded += 1
+            self._write([item])
+            return True
+
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self.block_timeout <= 0:
+                return self._drop()
+            with self._counter_lock:
+                self.blocked += 1
+            try:
+                self._queue.put(item, timeout=self.block_timeout)
+            except queue.Full:
+                return self._drop()
+
+        depth = self._queue.qsize()
+        with self._counter_lock:
+            self.recorded += 1
+            self.high_water = max(self.high_water, depth)
+        self._ensure_writer()
+        return True
+
+    def _drop(self) -> bool:
+        with self._counter_lock:
+            self.dropped += 1
+        logger.warning("Battle history queue is full, dropping a result")
+        return False
+
+    def _ensure_writer(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._counter_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="battle-history-writer", daemon=True)
+                self._thread.start()
+
+    def _take_batch(self, timeout: Optional[float]) -> List[Tuple[BattleResult, Optional[str]]]:
+        try:
+            batch = [self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait()]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._take_batch(self.flush_interval)
+            if batch:
+                self._write(batch)
+
+    def _write(self, items: List[Tuple[BattleResult, Optional[str]]]):
+        rows = [{**result._asdict(), "username": username} for result, username in items]
+        updates = []
+        # The writer thread needs its own app context; synchronous writes reuse the caller's
+        in_app = has_app_context() and current_app._get_current_object() is self.app
+        with self._write_lock, (nullcontext() if in_app else self.app.app_context()):
+            try:
+                db.session.execute(insert(Battles), rows)
+                if self.leaderboard is not None:
+                    updates = self.leaderboard.rate([result for result, _ in items])
+                db.session.commit()
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                with self._counter_lock:
+                    self.failed += len(rows)
+                logger.error(f"Couldn't write {len(rows)} battle results: {e}")
+                return
+        if self.leaderboard is not None:
+            self.leaderboard.apply(updates)
+        with self._counter_lock:
+            self.written += len(rows)
+            self.batches += 1
+
+    def flush(self):
+        """Writes every queued result now, in the calling thread."""
+        while True:
+            batch = self._take_batch(None)
+            if not batch:
+                return
+            self._write(batch)
+
+    def close(self):
+        """Stops the writer thread and writes what is still queued."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+    def stats(self) -> dict:
+        """Returns the queue depth and the write-behind counters."""
+        with self._counter_lock:
+            return {
+                "synchronous": self.synchronous,
+                "queued": self._queue.qsize(),
+                "maxsize": self._queue.maxsize,
+                "high_water": self.high_water,
+                "recorded": self.recorded,
+                "dropped": self.dropped,
+                "blocked": self.blocked,
+                "written": self.written,
+                "batches": self.batches,
+                "failed": self.failed,
+            }
+
+
+_recorder: Optional[BattleRecorder] = None
+
+
+def configure_battle_recorder(app: Flask, leaderboard: Optional[Leaderboard] = None) -> BattleRecorder:
+    """
+    Replace the shared battle recorder with one writing to `app`'s database.
+
+    Args:
+        app (Flask): The app. BATTLE_HISTORY_* keys in its config fall back to the
+            environment variables and then to the defaults.
+        leaderboard (Leaderboard): Rates every written fight, if given.
+
+    Returns:
+        BattleRecorder: The new shared recorder.
+    """
+    global _recorder
+    config = app.config
+
+    if _recorder is not None:
+        _recorder.close()
+    _recorder = BattleRecorder(
+        app,
+        maxsize=setting(config, "BATTLE_HISTORY_QUEUE_SIZE", 10000, int),
+        batch_size=setting(config, "BATTLE_HISTORY_BATCH_SIZE", 500, int),
+        flush_interval=setting(config, "BATTLE_HISTORY_FLUSH_INTERVAL", 1.0, float),
+        block_timeout=setting(config, "BATTLE_HISTORY_BLOCK_TIMEOUT", 0.0, float),
+        synchronous=setting(config, "BATTLE_HISTORY_SYNC", False, flag),
+        leaderboard=leaderboard,
+    )
+    return _recorder
+
+
+def get_battle_recorder() -> Optional[BattleRecorder]:
+    """Return the shared battle recorder, or None before configure_battle_recorder is called."""
+    return _recorder
+
+
+@atexit.register
+def _close_recorder():
+    if _recorder is not None:
+        _recorder.close()
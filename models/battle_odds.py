@@ -0,0 +1,155 @@
+import atexit
+import logging
+import math
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Optional, Tuple
+
+import numpy as np
+
+from models.battle_engine import simulate_battles
+from models.logger import configure_logger
+from models.settings import setting
+from models.stat_cache import PokemonStats
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+def _run_trials(stats: Tuple[float, float, float, float], trials: int, seed: np.random.SeedSequence) -> int:
+    """Run one chunk of trials on its own stream and count the first combatant's wins."""
+    attack_1, defense_1, attack_2, defense_2 = stats
+    shape = (trials,)
+    wins = simulate_battles(np.full(shape, attack_1), np.full(shape, defense_1),
+                            np.full(shape, attack_2), np.full(shape, defense_2),
+                            rng=np.random.default_rng(seed))
+    return int(np.count_nonzero(wins))
+
+
+def wilson_interval(wins: int, trials: int, confidence: float) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion.
+
+    Args:
+        wins (int): Successes.
+        trials (int): Trials.
+        confidence (float): Confidence level, e.g. 0.95.
+
+    Returns:
+        Tuple[float, float]: The lower and upper bounds.
+    """
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    p = wins / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def estimate_odds(first: PokemonStats, second: PokemonStats, trials: int, confidence: float = 0.95,
+                  tolerance: float = 0.0, chunk_size: int = 100_000, seed: Optional[int] = None,
+                  executor: Optional[Executor] = None, workers: int = 1) -> dict:
+    """Estimate the chance that `first` beats `second` by Monte Carlo over the BattleModel rules.
+
+    Trials are split into chunks, each with its own stream spawned from one
+    SeedSequence so chunks are independent and the whole run is reproducible
+    from `seed`. Chunks run on `executor` a round at a time; after each round the
+    Wilson interval is checked and the run stops once its half-width is at most
+    `tolerance`.
+
+    Args:
+        first (PokemonStats): The pokemon entering the ring first.
+        second (PokemonStats): Its opponent.
+        trials (int): Maximum number of trials.
+        confidence (float): Confidence level of the interval.
+        tolerance (float): Stop early once the interval's half-width is at most this; 0 runs every trial.
+        chunk_size (int): Trials per task.
+        seed (int): Seed for a reproducible estimate.
+        executor (Executor): Where chunks run, e.g. the shared process pool. None runs them inline.
+        workers (int): Chunks submitted per round, usually the executor's worker count.
+
+    Returns:
+        dict: trials run, wins, the estimated win probability, the interval and whether the run stopped early.
+
+    Raises:
+        ValueError: If trials is not positive or confidence is not in (0, 1).
+    """
+    if trials < 1:
+        raise ValueError("trials must be a positive integer")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+
+    stats = (first.attack, first.defense, second.attack, second.defense)
+    chunks = [chunk_size] * (trials // chunk_size) + ([trials % chunk_size] if trials % chunk_size else [])
+    streams = np.random.SeedSequence(seed).spawn(len(chunks))
+    round_size = max(1, workers) if executor is not None else 1
+
+    wins = 0
+    done = 0
+    stopped_early = False
+    for start in range(0, len(chunks), round_size):
+        round_chunks = list(zip(chunks[start:start + round_size], streams[start:start + round_size]))
+        if executor is None:
+            wins += sum(_run_trials(stats, size, stream) for size, stream in round_chunks)
+        else:
+            futures = [executor.submit(_run_trials, stats, size, stream) for size, stream in round_chunks]
+            wins += sum(future.result() for future in futures)
+        done += sum(size for size, _ in round_chunks)
+
+        low, high = wilson_interval(wins, done, confidence)
+        if tolerance > 0 and (high - low) / 2 <= tolerance and done < trials:
+            stopped_early = True
+            break
+
+    logger.info(f"Estimated {first.name} vs {second.name} over {done} trials: {wins / done:.4f}")
+    return {
+        "trials": done,
+        "wins_1": wins,
+        "win_probability": wins / done,
+        "confidence": confidence,
+        "ci_low": low,
+        "ci_high": high,
+        "stopped_early": stopped_early,
+    }
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def configure_odds_pool(config=None):
+    """
+    Set the size of the shared odds process pool, shutting down any previous pool.
+
+    Args:
+        config (Mapping): Usually the Flask app.config. ODDS_WORKERS falls back to the
+            environment variable and then to 2; 0 runs trials inline. Every app process
+            starts its own pool, so the total is ODDS_WORKERS per worker process.
+    """
+    global _pool, _pool_workers
+    workers = setting(config, "ODDS_WORKERS", 2, int)
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        _pool_workers = workers
+
+
+def get_odds_pool() -> Tuple[Optional[ProcessPoolExecutor], int]:
+    """Return the shared process pool, starting it on first use, and its size. The pool is None if trials run inline."""
+    global _pool
+    with _pool_lock:
+        if _pool is None and _pool_workers > 0:
+            # Forking a threaded server process can copy held locks into the children
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool, _pool_workers
+
+
+@atexit.register
+def _shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,90 @@
+import heapq
+import logging
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from models.battle_engine import win_probabilities
+from models.logger import configure_logger
+from models.pokemon_battle_model import Combatant
+from models.randomness import BufferedRandomness, RandomnessProvider
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class Elimination(NamedTuple):
+    """One combatant knocked out of a battle royale."""
+
+    round: int
+    pokemon_id: int
+    name: str
+    eliminated_by_id: int
+    eliminated_by: str
+    draw: float
+
+
+class RoyaleResult(NamedTuple):
+    """How a battle royale ended."""
+
+    winner: Combatant
+    rounds: int
+    eliminations: List[Elimination]
+
+
+def battle_royale(combatants: Sequence[Combatant], randomness: RandomnessProvider = None) -> RoyaleResult:
+    """Knock combatants out in rounds of pairwise fights until one is left.
+
+    Each round the surviving combatants sit in a min-heap keyed on skill and are
+    popped two at a time, so every fight is between neighbours in skill and
+    nobody is paired far out of their league while closer opponents remain.
+    With an odd number left, the strongest sits the round out. Every fight uses
+    the BattleModel rules, with the earlier entrant entering the ring first, and
+    a round's draws are taken in one batch. Rounds halve the field, so the whole
+    event is O(N log N). An event has exactly N - 1 fights, so by default all of
+    its draws are generated up front as one block.
+
+    Args:
+        combatants (Sequence[Combatant]): The entrants, in the order they entered.
+        randomness (RandomnessProvider): Source of the draws. Defaults to one fresh block for the whole event.
+
+    Returns:
+        RoyaleResult: The winner, the number of rounds and every elimination in order.
+
+    Raises:
+        ValueError: If there are fewer than two combatants.
+    """
+    if len(combatants) < 2:
+        raise ValueError("A battle royale needs at least two combatants")
+    if randomness is None:
+        randomness = BufferedRandomness(block_size=len(combatants) - 1)
+
+    # (skill, entry order, combatant); entry order is unique, so combatants are never compared
+    field: List[Tuple[float, int, Combatant]] = [(c.skill, entry, c) for entry, c in enumerate(combatants)]
+    heapq.heapify(field)
+    eliminations: List[Elimination] = []
+    rounds = 0
+
+    while len(field) > 1:
+        rounds += 1
+        pairs = []
+        while len(field) > 1:
+            weaker, stronger = heapq.heappop(field), heapq.heappop(field)
+            pairs.append((weaker, stronger) if weaker[1] < stronger[1] else (stronger, weaker))
+
+        skill_1 = np.fromiter((first[0] for first, _ in pairs), dtype=np.float64, count=len(pairs))
+        skill_2 = np.fromiter((second[0] for _, second in pairs), dtype=np.float64, count=len(pairs))
+        draws = np.asarray(randomness.random(len(pairs)))
+        first_won = (draws < win_probabilities(skill_1, skill_2)).tolist()
+
+        survivors = field  # the bye, if any
+        for (first, second), won, draw in zip(pairs, first_won, draws.tolist()):
+            winner, loser = (first, second) if won else (second, first)
+            eliminations.append(Elimination(rounds, loser[2].id, loser[2].name, winner[2].id, winner[2].name, draw))
+            survivors.append(winner)
+        heapq.heapify(survivors)
+        field = survivors
+
+    winner = field[0][2]
+    logger.info(f"{winner.name} won a {len(combatants)}-way battle royale in {rounds} rounds")
+    return RoyaleResult(winner=winner, rounds=rounds, eliminations=eliminations)
@@ -0,0 +1,248 @@
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from models.arena_manager import get_arena_manager
+from models.logger import configure_logger
+from models.pokemon_battle_model import BattleModel, BattleResult, Combatant
+from models.pokemon_model import Pokemons
+from models.randomness import RandomnessProvider
+from models.settings import setting
+from models.stat_cache import PokemonStats
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+CAPACITY = 2
+
+
+class BattlefieldStore(ABC):
+    """
+        Where the pokemons waiting in each arena are kept between requests.
+    """
+
+    @abstractmethod
+    def enter(self, key: str, pokemon_id: int, entrant: Optional[str] = None):
+        """
+            Adds a pokemon to an arena's battlefield.
+
+            Args:
+                key (str): The arena key.
+                pokemon_id (int): The ID of the pokemon entering the ring.
+                entrant (str): The user entering it, if any.
+
+            Raises:
+                ValueError: If the battlefield is full or the pokemon does not exist.
+        """
+
+    @abstractmethod
+    def battle(self, key: str, randomness: RandomnessProvider = None) -> BattleResult:
+        """
+            Fights the two pokemons in an arena and clears its battlefield.
+
+            Args:
+                key (str): The arena key.
+                randomness (RandomnessProvider): Overrides the arena's draw source for this battle,
+                    e.g. a SeededRandomness to replay it.
+
+            Returns:
+                BattleResult: How the fight was decided.
+
+            Raises:
+                ValueError: If there are not two pokemons in the arena.
+        """
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Returns the backend name and its counters."""
+
+    def release(self):
+        """Frees what the calling thread holds open, e.g. at the end of a request."""
+
+
+class InMemoryBattlefieldStore(BattlefieldStore):
+    """
+        Keeps battlefields in this process's ArenaManager. Only correct when every
+        request for an arena reaches the same worker process.
+    """
+
+    def enter(self, key: str, pokemon_id: int, entrant: Optional[str] = None):
+        # Look the stats up before taking the arena's stripe lock, which other arenas may be waiting on
+        combatant = Combatant.from_stats(Pokemons.get_stats_by_id(pokemon_id))
+        with get_arena_manager().arena(key) as battle_model:
+            battle_model.enter_combatant(combatant, entrant)
+
+    def battle(self, key: str, randomness: RandomnessProvider = None) -> BattleResult:
+        with get_arena_manager().arena(key) as battle_model:
+            if randomness is None:
+                return battle_model.fight()
+            default, battle_model.randomness = battle_model.randomness, randomness
+            try:
+                return battle_model.fight()
+            finally:
+                battle_model.randomness = default
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **get_arena_manager().stats()}
+
+
+class SqliteBattlefieldStore(BattlefieldStore):
+    """
+        Keeps battlefields in a SQLite file shared by every worker process on one host.
+
+        Entering and claiming are each one IMMEDIATE transaction, so two workers
+        can neither overfill a ring nor both fight the same pair. The fight itself
+        runs after the claim has committed. The file is in WAL mode, which relies
+        on shared memory between the processes, so it must be on a local disk of
+        the host they all run on, not on a network filesystem.
+
+        Each thread opens its own connection; release() closes the calling
+        thread's one.
+    """
+
+    def __init__(self, path: str, ttl: float = 1800.0, timeout: float = 5.0):
+        """
+            Opens (and creates if needed) the battlefield database.
+
+            Args:
+                path (str): The SQLite file.
+                ttl (float): Seconds after which a waiting pokemon is dropped from an idle arena.
+                timeout (float): Seconds to wait for another process's write lock.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS battlefield ("
+                " arena TEXT NOT NULL,"
+                " slot INTEGER NOT NULL,"
+                " pokemon_id INTEGER NOT NULL,"
+                " name TEXT NOT NULL,"
+                " attack REAL NOT NULL,"
+                " defense REAL NOT NULL,"
+                " entered_at REAL NOT NULL,"
+                " entrant TEXT,"
+                " PRIMARY KEY (arena, slot))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS battlefield_entered_at ON battlefield (entered_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; isolation_level=None lets us issue BEGIN IMMEDIATE ourselves
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._local.connection = connection
+        return connection
+
+    def release(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _transaction(self, work):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(connection)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return result
+
+    def enter(self, key: str, pokemon_id: int, entrant: Optional[str] = None):
+        pokemon = Pokemons.get_stats_by_id(pokemon_id)
+
+        def insert(connection):
+            connection.execute("DELETE FROM battlefield WHERE entered_at < ?", (time.time() - self.ttl,))
+            slots = [slot for (slot,) in connection.execute("SELECT slot FROM battlefield WHERE arena = ?", (key,))]
+            if len(slots) >= CAPACITY:
+                raise ValueError("Battlefield is full")
+            connection.execute(
+                "INSERT INTO battlefield (arena, slot, pokemon_id, name, attack, defense, entered_at, entrant)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, max(slots, default=-1) + 1, pokemon.id, pokemon.name, pokemon.attack, pokemon.defense,
+                 time.time(), entrant),
+            )
+
+        self._transaction(insert)
+        logger.info(f"Adding pokemon '{pokemon.name}' (ID {pokemon_id}) to arena '{key}'")
+
+    def claim(self, key: str) -> List[Tuple[PokemonStats, Optional[str]]]:
+        """
+            Atomically takes both pokemons out of an arena.
+
+            Args:
+                key (str): The arena key.
+
+            Returns:
+                List[Tuple[PokemonStats, Optional[str]]]: The combatants and who entered them, in the order they entered.
+
+            Raises:
+                ValueError: If there are not two pokemons in the arena; the arena is left as it was.
+        """
+        def take(connection):
+            rows = connection.execute(
+                "SELECT pokemon_id, name, attack, defense, entrant FROM battlefield WHERE arena = ? ORDER BY slot",
+                (key,),
+            ).fetchall()
+            if len(rows) < CAPACITY:
+                raise ValueError("There must be two pokemons to start a fight.")
+            connection.execute("DELETE FROM battlefield WHERE arena = ?", (key,))
+            return [(PokemonStats(*row[:4]), row[4]) for row in rows]
+
+        return self._transaction(take)
+
+    def battle(self, key: str, randomness: RandomnessProvider = None) -> BattleResult:
+        battle_model = BattleModel(randomness)
+        for pokemon, entrant in self.claim(key):
+            battle_model.battlefield.append(Combatant.from_stats(pokemon))
+            battle_model.entrants.append(entrant)
+        return battle_model.fight()
+
+    def stats(self) -> dict:
+        (arenas,) = self._connection().execute("SELECT COUNT(DISTINCT arena) FROM battlefield").fetchone()
+        return {"backend": "sqlite", "path": self.path, "ttl": self.ttl, "arenas": arenas}
+
+
+_battlefield_store: BattlefieldStore = InMemoryBattlefieldStore()
+
+
+def configure_battlefield_store(config=None) -> BattlefieldStore:
+    """
+    Replace the shared battlefield store with the backend named by BATTLEFIELD_STORE.
+
+    Args:
+        config (Mapping): Usually the Flask app.config. Missing keys fall back to
+            the BATTLEFIELD_* environment variables and then to the defaults.
+
+    Returns:
+        BattlefieldStore: The new shared store.
+
+    Raises:
+        ValueError: If BATTLEFIELD_STORE names an unknown backend.
+    """
+    global _battlefield_store
+    backend = setting(config, "BATTLEFIELD_STORE", "memory", str).lower()
+    if backend == "memory":
+        _battlefield_store = InMemoryBattlefieldStore()
+    elif backend == "sqlite":
+        _battlefield_store = SqliteBattlefieldStore(
+            path=setting(config, "BATTLEFIELD_SQLITE_PATH", "battlefields.db", str),
+            ttl=setting(config, "ARENA_TTL", 1800.0, float),
+        )
+    else:
+        raise ValueError(f"Unknown battlefield store '{backend}'")
+    return _battlefield_store
+
+
+def get_battlefield_store() -> BattlefieldStore:
+    """Return the shared battlefield store."""
+    return _battlefield_store
@@ -0,0 +1,215 @@
+import itertools
+import logging
+import threading
+from collections import deque
+from typing import Any, List, Optional, Tuple
+
+from models.logger import configure_logger
+from models.settings import setting
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class TooManySubscriptionsError(ValueError):
+    """Raised when one owner already has as many subscriptions open as allowed."""
+
+
+class Subscription:
+    """
+        One subscriber's view of a Broadcaster: a bounded ring buffer of events.
+
+        When the buffer is full the oldest event is overwritten, so a slow reader
+        loses history instead of slowing down publishers.
+    """
+
+    def __init__(self, buffer_size: int, owner: Optional[str] = None):
+        """
+            Initializes an empty subscription.
+
+            Args:
+                buffer_size (int): Events kept for this subscriber before the oldest are dropped.
+                owner (str): Who opened it, e.g. a username.
+
+            Attributes:
+                dropped (int): Events overwritten before this subscriber read them.
+                closed (bool): Whether the subscription has ended.
+        """
+        self.owner = owner
+        self.dropped = 0
+        self.closed = False
+        self._events: "deque[Tuple[int, Any]]" = deque(maxlen=buffer_size)
+        self._reported_dropped = 0
+        self._ready = threading.Condition()
+
+    def _push(self, event: Tuple[int, Any]) -> bool:
+        with self._ready:
+            overwrote = len(self._events) == self._events.maxlen
+            if overwrote:
+                self.dropped += 1
+            self._events.append(event)
+            self._ready.notify()
+        return overwrote
+
+    def get(self, timeout: Optional[float] = None) -> Tuple[List[Tuple[int, Any]], int]:
+        """
+            Takes every buffered event, waiting up to `timeout` seconds for one if there are none.
+
+            Args:
+                timeout (float): Longest wait; None waits until an event arrives or the subscription closes.
+
+            Returns:
+                Tuple[List[Tuple[int, Any]], int]: The (sequence number, event) pairs, oldest first, and how
+                    many events were dropped since the previous call.
+        """
+        with self._ready:
+            if not self._events and not self.closed:
+                self._ready.wait(timeout)
+            events = list(self._events)
+            self._events.clear()
+            dropped, self._reported_dropped = self.dropped - self._reported_dropped, self.dropped
+            return events, dropped
+
+    def close(self):
+        """Ends the subscription and wakes its reader."""
+        with self._ready:
+            self.closed = True
+            self._ready.notify_all()
+
+
+class Broadcaster:
+    """
+        In-process fan-out of events to every current subscriber.
+
+        publish() only appends to each subscriber's ring buffer, which never
+        waits on the reader, so the cost to the publisher is a few microseconds
+        per subscriber however slowly the subscribers read. Events reach every
+        subscriber in sequence order.
+    """
+
+    def __init__(self, buffer_size: int = 256, max_subscribers: int = 1000, max_per_owner: int = 3):
+        """
+            Initializes a broadcaster with no subscribers.
+
+            Args:
+                buffer_size (int): Ring buffer size of each subscription.
+                max_subscribers (int): Most subscriptions open at once.
+                max_per_owner (int): Most subscriptions open at once with the same owner.
+
+            Attributes:
+                published (int): Events published.
+                dropped (int): Events overwritten in some subscriber's buffer before it read them.
+                rejected (int): Subscriptions refused because max_subscribers, or max_per_owner for
+                    their owner, were open.
+        """
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.max_per_owner = max_per_owner
+        self.published = 0
+        self.dropped = 0
+        self.rejected = 0
+        self._subscribers: Tuple[Subscription, ...] = ()
+        self._sequence = itertools.count(1)
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def subscribe(self, owner: Optional[str] = None) -> Subscription:
+        """
+            Opens a subscription that receives every event published from now on.
+
+            Args:
+                owner (str): Who is subscribing; subscriptions without one only count towards max_subscribers.
+
+            Returns:
+                Subscription: The new subscription.
+
+            Raises:
+                TooManySubscriptionsError: If the owner already has max_per_owner subscriptions open.
+                ValueError: If max_subscribers subscriptions are already open, or the broadcaster is closed.
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("The battle feed is closed")
+            if owner is not None and sum(s.owner == owner for s in self._subscribers) >= self.max_per_owner:
+                self.rejected += 1
+                logger.warning(f"Refusing a subscriber: '{owner}' already has {self.max_per_owner} open")
+                raise TooManySubscriptionsError(f"At most {self.max_per_owner} open streams per user")
+            if len(self._subscribers) >= self.max_subscribers:
+                self.rejected += 1
+                logger.warning(f"Refusing a subscriber: {self.max_subscribers} already connected")
+                raise ValueError("Too many subscribers")
+            subscription = Subscription(self.buffer_size, owner)
+            self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Closes a subscription and stops delivering to it; closing twice is harmless."""
+        subscription.close()
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    def close(self):
+        """Closes every subscription, waking their readers, and refuses new ones."""
+        with self._lock:
+            self._closed = True
+            subscribers, self._subscribers = self._subscribers, ()
+        for subscription in subscribers:
+            subscription.close()
+
+    def publish(self, event: Any) -> int:
+        """
+            Delivers an event to every subscriber.
+
+            Args:
+                event (Any): The event; shared, not copied, between subscribers.
+
+            Returns:
+                int: The event's sequence number.
+        """
+        with self._lock:
+            sequence = next(self._sequence)
+            self.published += 1
+            self.dropped += sum(subscription._push((sequence, event)) for subscription in self._subscribers)
+        return sequence
+
+    def stats(self) -> dict:
+        """Returns the subscriber count and the delivery counters."""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "max_subscribers": self.max_subscribers,
+                "max_per_owner": self.max_per_owner,
+                "buffer_size": self.buffer_size,
+                "published": self.published,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+            }
+
+
+_broadcaster = Broadcaster()
+
+
+def configure_broadcaster(config=None) -> Broadcaster:
+    """
+    Replace the shared battle broadcaster with one built from a config mapping.
+
+    Args:
+        config (Mapping): Usually the Flask app.config. Missing keys fall back to
+            the BATTLE_STREAM_* environment variables and then to the defaults.
+
+    Returns:
+        Broadcaster: The new shared broadcaster.
+    """
+    global _broadcaster
+    _broadcaster.close()
+    _broadcaster = Broadcaster(
+        buffer_size=setting(config, "BATTLE_STREAM_BUFFER_SIZE", 256, int),
+        max_subscribers=setting(config, "BATTLE_STREAM_MAX_SUBSCRIBERS", 1000, int),
+        max_per_owner=setting(config, "BATTLE_STREAM_MAX_PER_USER", 3, int),
+    )
+    return _broadcaster
+
+
+def get_broadcaster() -> Broadcaster:
+    """Return the shared battle broadcaster."""
+    return _broadcaster
@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+from collections import deque
+
+import requests
+
+from models.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream that the breaker considers down."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+        Stops calling an upstream dependency while it is failing or too slow.
+
+        Outcomes of the last `window_size` calls are kept. Once at least
+        `minimum_calls` have been seen, the breaker opens if the share of failed
+        calls or of calls slower than `slow_call_seconds` reaches its threshold.
+        While open, calls are rejected immediately. After `open_seconds` a single
+        probe call is let through (half-open): success closes the breaker, failure
+        opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 2.0,
+        slow_call_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        minimum_calls: int = 5,
+        open_seconds: float = 30.0,
+    ):
+        """
+            Initializes a closed breaker.
+
+            Args:
+                failure_rate_threshold (float): Share of failed calls in the window that opens the breaker.
+                slow_call_seconds (float): Calls slower than this count as slow.
+                slow_call_rate_threshold (float): Share of slow calls in the window that opens the breaker.
+                window_size (int): Number of recent calls considered.
+                minimum_calls (int): Calls needed in the window before the rates are evaluated.
+                open_seconds (float): How long the breaker stays open before probing.
+
+            Attributes:
+                trips (int): Number of times the breaker opened.
+                rejected (int): Number of calls refused while open.
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+
+        self.state = CLOSED
+        self.trips = 0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+            Reserves the right to make a call.
+
+            Raises:
+                CircuitOpenError: If the breaker is open, or half-open with its probe already in flight.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError("Circuit breaker is open", retry_after=remaining)
+                logger.info("Circuit breaker half-open, letting a probe through")
+                self.state = HALF_OPEN
+
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError("Circuit breaker is half-open and probing", retry_after=1.0)
+                self._probe_in_flight = True
+
+    def record(self, success: bool, duration: float):
+        """
+            Records the outcome of a call allowed by before_call.
+
+            Args:
+                success (bool): Whether the call succeeded.
+                duration (float): How long the call took, in seconds.
+        """
+        slow = duration > self.slow_call_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if success and not slow:
+                    logger.info("Circuit breaker probe succeeded, closing")
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append((not success, slow))
+            if self.state == CLOSED and len(self._outcomes) >= self.minimum_calls:
+                failures = sum(1 for failed, _ in self._outcomes if failed)
+                slow_calls = sum(1 for _, was_slow in self._outcomes if was_slow)
+                if (failures / len(self._outcomes) >= self.failure_rate_threshold
+                        or slow_calls / len(self._outcomes) >= self.slow_call_rate_threshold):
+                    self._open()
+
+    def release(self):
+        """Gives back a call allowed by before_call without recording an outcome, e.g. one that ran out of our own time budget."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def _open(self):
+        # Caller holds the lock
+        self.state = OPEN
+        self.trips += 1
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        logger.warning(f"Circuit breaker opened (trip #{self.trips}) for {self.open_seconds:.0f}s")
+
+    def stats(self) -> dict:
+        """Returns the breaker state and counters."""
+        with self._lock:
+            return {
+                "state": self.state,
+                "trips": self.trips,
+                "rejected": self.rejected,
+                "window_calls": len(self._outcomes),
+                "window_failures": sum(1 for failed, _ in self._outcomes if failed),
+                "window_slow_calls": sum(1 for _, slow in self._outcomes if slow),
+            }
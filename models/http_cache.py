@@ -0,0 +1,49 @@
+import hashlib
+from typing import Callable
+
+from flask import Response, make_response, request
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the values that determine a response body.
+
+    Args:
+        *parts: The values the body is rendered from, e.g. name, attack, defense and source.
+
+    Returns:
+        str: The ETag value, without quotes.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def add_cache_headers(response: Response, etag: str, max_age: int) -> Response:
+    """Attach an ETag and a Cache-Control header to a response."""
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
+
+
+def conditional_response(etag: str, build: Callable[[], Response], max_age: int) -> Response:
+    """Answer 304 if the client already has this representation, otherwise build it.
+
+    The ETag is checked before build is called, so a revalidation never pays for
+    serializing the body.
+
+    Args:
+        etag (str): The ETag of the current representation, from make_etag.
+        build (Callable[[], Response]): Renders the full response.
+        max_age (int): Seconds clients and shared caches may reuse the response without revalidating.
+
+    Returns:
+        Response: An empty 304 or the built response, with ETag and Cache-Control set.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = make_response(build())
+    return add_cache_headers(response, etag, max_age)
@@ -0,0 +1,258 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from db import db
+from models.logger import configure_logger
+from models.pokemon_battle_model import BattleResult
+from models.rank_index import RankIndex
+from models.settings import setting
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+POKEMON = "pokemon"
+USER = "user"
+KINDS = (POKEMON, USER)
+
+# kind, key, name, rating, games, wins
+Update = Tuple[str, str, str, float, int, int]
+
+
+class Ratings(db.Model):
+    """The Elo rating of a pokemon or a user."""
+
+    __tablename__ = 'ratings'
+
+    kind = db.Column(db.String, primary_key=True)
+    key = db.Column(db.String, primary_key=True)
+    name = db.Column(db.String, nullable=False)
+    rating = db.Column(db.Float, nullable=False)
+    games = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    """The Elo expected score of `rating` against `opponent`."""
+    return 1 / (1 + 10 ** ((opponent - rating) / 400))
+
+
+class Leaderboard:
+    """
+        Elo ratings for pokemons and users, served from in-memory rank indexes.
+
+        The 'ratings' table is the source of truth. rate() reads the current rows
+        of everyone in a batch of fights with SELECT ... FOR UPDATE inside the
+        caller's transaction and computes the new ratings from them, so writers
+        in different processes queue on the rows instead of overwriting each
+        other's updates. Once the caller has committed, apply() copies the new
+        rows into the indexes. The indexes are per-process: they see every row
+        this process writes, and load() rebuilds them from the table, e.g. at
+        startup, to pick up what other processes wrote.
+    """
+
+    def __init__(self, k_factor: float = 32.0, initial_rating: float = 1500.0):
+        """
+            Initializes an empty leaderboard.
+
+            Args:
+                k_factor (float): Maximum rating change per fight.
+                initial_rating (float): Rating of a pokemon or user in their first fight.
+        """
+        self.k_factor = k_factor
+        self.initial_rating = initial_rating
+        self._indexes: Dict[str, RankIndex] = {kind: RankIndex() for kind in KINDS}
+        self._entries: Dict[str, Dict[str, Tuple[str, int, int]]] = {kind: {} for kind in KINDS}
+        self._keys_by_name: Dict[str, Dict[str, str]] = {kind: {} for kind in KINDS}
+        self._lock = threading.Lock()
+
+    def load(self) -> int:
+        """
+            Rebuilds the indexes from the 'ratings' table. Needs an app context.
+
+            Returns:
+                int: The number of ratings loaded.
+        """
+        rows = db.session.query(Ratings.kind, Ratings.key, Ratings.name, Ratings.rating,
+                                Ratings.games, Ratings.wins).all()
+        with self._lock:
+            self._indexes = {kind: RankIndex() for kind in KINDS}
+            self._entries = {kind: {} for kind in KINDS}
+            self._keys_by_name = {kind: {} for kind in KINDS}
+            for kind, key, name, rating, games, wins in rows:
+                if kind in self._indexes:
+                    self._apply(kind, key, name, rating, games, wins)
+        logger.info(f"Loaded {len(rows)} ratings into the leaderboard")
+        return len(rows)
+
+    def _apply(self, kind: str, key: str, name: str, rating: float, games: int, wins: int):
+        # Caller holds the lock
+        self._indexes[kind].set(key, rating)
+        self._entries[kind][key] = (name, games, wins)
+        self._keys_by_name[kind][name] = key
+
+    def rate(self, results: Sequence[BattleResult]) -> List[Update]:
+        """
+            Stages the rating changes of several fights, in order, in the current transaction.
+
+            Both pokemons are rated, and both entrants when two different users fought
+            each other. The caller commits and then passes the result to apply(). Needs
+            an app context.
+
+            Args:
+                results (Sequence[BattleResult]): The fights, oldest first.
+
+            Returns:
+                List[Update]: The new row of everyone rated.
+        """
+        fights = []
+        wanted: Dict[Tuple[str, str], str] = {}
+        for result in results:
+            pairings = [(POKEMON, (str(result.pokemon_1_id), result.pokemon_1_name),
+                         (str(result.pokemon_2_id), result.pokemon_2_name))]
+            if result.entrant_1 and result.entrant_2:
+                pairings.append((USER, (result.entrant_1, result.entrant_1), (result.entrant_2, result.entrant_2)))
+            for kind, (key_1, name_1), (key_2, name_2) in pairings:
+                if key_1 == key_2:
+                    # A pokemon or user fighting itself says nothing about its rating
+                    continue
+                wanted[(kind, key_1)], wanted[(kind, key_2)] = name_1, name_2
+                fights.append((kind, key_1, key_2, result.winner_id == result.pokemon_1_id))
+        if not fights:
+            return []
+
+        rows = self._lock_rows(wanted)
+        for kind, key_1, key_2, first_won in fights:
+            row_1, row_2 = rows[(kind, key_1)], rows[(kind, key_2)]
+            change = self.k_factor * ((1.0 if first_won else 0.0) - expected_score(row_1.rating, row_2.rating))
+            row_1.rating, row_1.games, row_1.wins = row_1.rating + change, row_1.games + 1, row_1.wins + first_won
+            row_2.rating, row_2.games, row_2.wins = row_2.rating - change, row_2.games + 1, row_2.wins + (not first_won)
+        for (kind, key), name in wanted.items():
+            rows[(kind, key)].name = name
+        db.session.flush()
+
+        return [(row.kind, row.key, row.name, row.rating, row.games, row.wins) for row in rows.values()]
+
+    def _lock_rows(self, wanted: Dict[Tuple[str, str], str]) -> Dict[Tuple[str, str], Ratings]:
+        # Create the missing rows first, so that every row can be locked even while another writer creates it.
+        # SQLite ignores FOR UPDATE, but this write already holds its database lock until the commit.
+        insert = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}.get(db.engine.dialect.name)
+        if insert is not None:
+            db.session.execute(insert(Ratings).values([
+                {"kind": kind, "key": key, "name": name, "rating": self.initial_rating, "games": 0, "wins": 0}
+                for (kind, key), name in wanted.items()
+            ]).on_conflict_do_nothing())
+
+        rows = {}
+        for kind in KINDS:
+            keys = [key for (row_kind, key) in wanted if row_kind == kind]
+            if keys:
+                query = (db.session.query(Ratings).filter(Ratings.kind == kind, Ratings.key.in_(keys))
+                         .with_for_update().populate_existing())
+                rows.update(((row.kind, row.key), row) for row in query)
+
+        for (kind, key), name in wanted.items():
+            if (kind, key) not in rows:
+                rows[(kind, key)] = Ratings(kind=kind, key=key, name=name, rating=self.initial_rating, games=0, wins=0)
+                db.session.add(rows[(kind, key)])
+        return rows
+
+    def apply(self, updates: Sequence[Update]):
+        """
+            Copies committed ratings into the indexes.
+
+            Args:
+                updates (Sequence[Update]): What rate() returned, once its transaction has committed.
+        """
+        with self._lock:
+            for update in updates:
+                self._apply(*update)
+
+    def top(self, kind: str, k: int) -> List[dict]:
+        """
+            Returns the k best-rated pokemons or users.
+
+            Args:
+                kind (str): 'pokemon' or 'user'.
+                k (int): How many to return.
+
+            Returns:
+                List[dict]: rank, name, rating, games and wins, best first.
+
+            Raises:
+                ValueError: If kind is unknown.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        with self._lock:
+            entries = self._entries[kind]
+            return [
+                {"rank": position, "name": entries[key][0], "rating": rating,
+                 "games": entries[key][1], "wins": entries[key][2]}
+                for position, (key, rating) in enumerate(self._indexes[kind].top(k), start=1)
+            ]
+
+    def rank_of(self, kind: str, name: str) -> Optional[dict]:
+        """
+            Looks up where a pokemon or user stands.
+
+            Args:
+                kind (str): 'pokemon' or 'user'.
+                name (str): The pokemon name or username.
+
+            Returns:
+                Optional[dict]: rank, name, rating, games and wins, or None if they haven't fought yet.
+
+            Raises:
+                ValueError: If kind is unknown.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        with self._lock:
+            key = self._keys_by_name[kind].get(name)
+            if key is None:
+                return None
+            _, games, wins = self._entries[kind][key]
+            index = self._indexes[kind]
+            return {"rank": index.rank(key), "name": name, "rating": index.score(key),
+                    "games": games, "wins": wins, "of": len(index)}
+
+    def stats(self) -> dict:
+        """Returns the number of rated pokemons and users and the rating parameters."""
+        with self._lock:
+            return {
+                "pokemons": len(self._indexes[POKEMON]),
+                "users": len(self._indexes[USER]),
+                "k_factor": self.k_factor,
+                "initial_rating": self.initial_rating,
+            }
+
+
+_leaderboard = Leaderboard()
+
+
+def configure_leaderboard(config=None) -> Leaderboard:
+    """
+    Replace the shared leaderboard with an empty one built from a config mapping.
+
+    Args:
+        config (Mapping): Usually the Flask app.config. Missing keys fall back to
+            the LEADERBOARD_* environment variables and then to the defaults.
+
+    Returns:
+        Leaderboard: The new shared leaderboard; call load() to fill it.
+    """
+    global _leaderboard
+    _leaderboard = Leaderboard(
+        k_factor=setting(config, "LEADERBOARD_K_FACTOR", 32.0, float),
+        initial_rating=setting(config, "LEADERBOARD_INITIAL_RATING", 1500.0, float),
+    )
+    return _leaderboard
+
+
+def get_leaderboard() -> Leaderboard:
+    """Return the shared leaderboard."""
+    return _leaderboard
@@ -0,0 +1,349 @@
+import bisect
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from models.battle_engine import get_pokemon_skills
+from models.logger import configure_logger
+from models.pokemon_battle_model import BattleResult
+from models.settings import setting
+from models.stat_cache import PokemonStats
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+WAITING = "waiting"
+MATCHED = "matched"
+EXPIRED = "expired"
+CANCELLED = "cancelled"
+
+
+class Ticket:
+    """
+        One pokemon waiting in the matchmaking queue, and what became of it.
+
+        Attributes:
+            id (str): The ticket ID handed back to the user.
+            username (str): Who queued the pokemon.
+            pokemon (PokemonStats): The pokemon.
+            skill (float): Its skill, as BattleModel computes it.
+            enqueued_at (float): time.monotonic() when it was queued.
+            status (str): 'waiting', 'matched', 'expired' or 'cancelled'.
+            opponent (Ticket): The ticket it was paired with, once matched.
+            first (bool): Whether its pokemon entered the ring first, i.e. it was the one waiting.
+            result (BattleResult): The fight, once it has been fought.
+    """
+
+    __slots__ = ("id", "seq", "username", "pokemon", "skill", "enqueued_at", "finished_at",
+                 "status", "opponent", "first", "claimed", "result")
+
+    def __init__(self, seq: int, username: str, pokemon: PokemonStats, skill: float, now: float):
+        self.id = uuid.uuid4().hex
+        self.seq = seq
+        self.username = username
+        self.pokemon = pokemon
+        self.skill = skill
+        self.enqueued_at = now
+        self.finished_at: Optional[float] = None
+        self.status = WAITING
+        self.opponent: Optional["Ticket"] = None
+        self.first = False
+        self.claimed = False
+        self.result: Optional[BattleResult] = None
+
+    def to_dict(self) -> dict:
+        """The ticket as the API reports it."""
+        ticket = {"ticket": self.id, "state": self.status, "pokemon": self.pokemon.name, "skill": self.skill}
+        if self.opponent is not None:
+            ticket["opponent"] = {"username": self.opponent.username, "pokemon": self.opponent.pokemon.name,
+                                  "skill": self.opponent.skill}
+        if self.result is not None:
+            ticket["winner"] = self.result.winner_name
+        return ticket
+
+
+class MatchmakingQueue:
+    """
+        Pairs queued pokemons with the waiting pokemon of closest skill.
+
+        Waiting tickets are kept in a list sorted by skill, so the closest
+        candidates are found by bisection and then walked outwards in order of
+        skill distance; the first one inside the tolerance window is the match.
+        The window starts at `base_tolerance` and widens by `widen_per_second`
+        for as long as the longer-waiting of the two has been queued, so a
+        ticket nobody is close to eventually matches someone. Tickets that wait
+        `timeout` seconds expire; deadlines sit in a heap and are swept on every
+        call. Finished tickets stay readable for another `timeout` seconds.
+
+        The queue lives in process memory, so only users served by the same
+        process can be paired and tickets can only be polled there: run the app
+        as a single process (threads are fine) when matchmaking is used.
+    """
+
+    def __init__(self, base_tolerance: float = 10.0, widen_per_second: float = 5.0, timeout: float = 60.0):
+        """
+            Initializes an empty queue.
+
+            Args:
+                base_tolerance (float): Largest skill difference accepted for a ticket that has just been queued.
+                widen_per_second (float): How much the accepted difference grows per second of waiting.
+                timeout (float): Seconds a ticket waits before it expires.
+
+            Attributes:
+                enqueued (int): Tickets queued.
+                matched (int): Pairs made.
+                expired (int): Tickets that timed out.
+                cancelled (int): Tickets withdrawn by their user.
+                high_water (int): Largest number of waiting tickets seen.
+        """
+        self.base_tolerance = base_tolerance
+        self.widen_per_second = widen_per_second
+        self.timeout = timeout
+        self.enqueued = 0
+        self.matched = 0
+        self.expired = 0
+        self.cancelled = 0
+        self.high_water = 0
+        self._wait_total = 0.0
+        self._order: List[Tuple[float, int]] = []
+        self._waiting: Dict[int, Ticket] = {}
+        self._tickets: Dict[str, Ticket] = {}
+        self._waiting_by_user: Dict[str, Ticket] = {}
+        self._deadlines: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _tolerance(self, ticket: Ticket, now: float) -> float:
+        return self.base_tolerance + self.widen_per_second * (now - ticket.enqueued_at)
+
+    def _find_partner(self, ticket: Ticket, now: float) -> Optional[Ticket]:
+        # Walk outwards from the ticket's skill, nearest first, until no waiting ticket can be close enough
+        order = self._order
+        widest = self.base_tolerance + self.widen_per_second * self.timeout
+        own = self._tolerance(ticket, now)
+        position = bisect.bisect_left(order, (ticket.skill, -1))
+        below, above = position - 1, position
+        while below >= 0 or above < len(order):
+            gap_below = ticket.skill - order[below][0] if below >= 0 else float("inf")
+            gap_above = order[above][0] - ticket.skill if above < len(order) else float("inf")
+            if gap_below <= gap_above:
+                gap, seq = gap_below, order[below][1]
+                below -= 1
+            else:
+                gap, seq = gap_above, order[above][1]
+                above += 1
+            if gap > widest:
+                return None
+            candidate = self._waiting[seq]
+            if candidate is ticket:
+                continue
+            if gap <= max(own, self._tolerance(candidate, now)):
+                return candidate
+        return None
+
+    def _unqueue(self, ticket: Ticket, status: str, now: float):
+        # Caller holds the lock
+        position = bisect.bisect_left(self._order, (ticket.skill, ticket.seq))
+        del self._order[position]
+        del self._waiting[ticket.seq]
+        del self._waiting_by_user[ticket.username]
+        ticket.status = status
+        ticket.finished_at = now
+        heapq.heappush(self._deadlines, (now + self.timeout, ticket.seq, ticket.id))
+
+    def _pair(self, waiting: Ticket, arriving: Ticket, now: float):
+        # Caller holds the lock; the ticket that waited longer entered the ring first
+        if waiting.enqueued_at > arriving.enqueued_at:
+            waiting, arriving = arriving, waiting
+        for ticket in (waiting, arriving):
+            if ticket.seq in self._waiting:
+                self._unqueue(ticket, MATCHED, now)
+            else:
+                ticket.status, ticket.finished_at = MATCHED, now
+            self._wait_total += now - ticket.enqueued_at
+        waiting.opponent, arriving.opponent = arriving, waiting
+        waiting.first = True
+        self.matched += 1
+        logger.info(f"Matched '{waiting.pokemon.name}' ({waiting.skill}) with "
+                    f"'{arriving.pokemon.name}' ({arriving.skill})")
+
+    def _sweep(self, now: float):
+        # Caller holds the lock. A ticket's first deadline is its expiry, the last is when to forget it
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, ticket_id = heapq.heappop(self._deadlines)
+            ticket = self._tickets.get(ticket_id)
+            if ticket is None:
+                continue
+            if ticket.status == WAITING:
+                self._unqueue(ticket, EXPIRED, now)
+                self.expired += 1
+            elif now >= ticket.finished_at + self.timeout:
+                del self._tickets[ticket_id]
+
+    def enqueue(self, username: str, pokemon: PokemonStats) -> Ticket:
+        """
+            Queues a pokemon, pairing it at once if a close enough opponent is waiting.
+
+            Args:
+                username (str): Who is queueing; users are never paired with themselves.
+                pokemon (PokemonStats): The pokemon.
+
+            Returns:
+                Ticket: Matched, with its opponent set, or waiting.
+
+            Raises:
+                ValueError: If the user already has a waiting ticket.
+        """
+        skill = float(get_pokemon_skills(pokemon.attack, pokemon.defense))
+        with self._lock:
+            now = time.monotonic()
+            self._sweep(now)
+            if username in self._waiting_by_user:
+                raise ValueError("You already have a pokemon waiting for a match")
+
+            ticket = Ticket(next(self._seq), username, pokemon, skill, now)
+            self._tickets[ticket.id] = ticket
+            self.enqueued += 1
+            partner = self._find_partner(ticket, now)
+            if partner is not None:
+                self._pair(partner, ticket, now)
+                heapq.heappush(self._deadlines, (now + self.timeout, ticket.seq, ticket.id))
+                return ticket
+
+            bisect.insort(self._order, (skill, ticket.seq))
+            self._waiting[ticket.seq] = ticket
+            self._waiting_by_user[username] = ticket
+            heapq.heappush(self._deadlines, (now + self.timeout, ticket.seq, ticket.id))
+            self.high_water = max(self.high_water, len(self._order))
+            return ticket
+
+    def poll(self, ticket_id: str, username: str) -> Ticket:
+        """
+            Returns a ticket, first retrying its match with the window it has widened to.
+
+            Args:
+                ticket_id (str): The ticket ID.
+                username (str): Who is asking; only the ticket's owner may see it.
+
+            Returns:
+                Ticket: The ticket; once matched, its opponent is set.
+
+            Raises:
+                KeyError: If there is no such ticket for this user.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._sweep(now)
+            ticket = self._owned(ticket_id, username)
+            if ticket.status == WAITING:
+                partner = self._find_partner(ticket, now)
+                if partner is not None:
+                    self._pair(partner, ticket, now)
+            return ticket
+
+    def cancel(self, ticket_id: str, username: str) -> Ticket:
+        """
+            Withdraws a waiting ticket.
+
+            Args:
+                ticket_id (str): The ticket ID.
+                username (str): Who is asking; only the ticket's owner may cancel it.
+
+            Returns:
+                Ticket: The cancelled ticket.
+
+            Raises:
+                KeyError: If there is no such ticket for this user.
+                ValueError: If the ticket is no longer waiting.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._sweep(now)
+            ticket = self._owned(ticket_id, username)
+            if ticket.status != WAITING:
+                raise ValueError(f"Ticket is already {ticket.status}")
+            self._unqueue(ticket, CANCELLED, now)
+            self.cancelled += 1
+            return ticket
+
+    def _owned(self, ticket_id: str, username: str) -> Ticket:
+        ticket = self._tickets.get(ticket_id)
+        if ticket is None or ticket.username != username:
+            raise KeyError(ticket_id)
+        return ticket
+
+    def claim(self, ticket: Ticket) -> bool:
+        """
+            Claims the fight of a matched pair, so that exactly one request fights it.
+
+            Args:
+                ticket (Ticket): Either ticket of the pair.
+
+            Returns:
+                bool: True for the first caller, False if the pair is unmatched or already claimed.
+        """
+        with self._lock:
+            if ticket.status != MATCHED or ticket.claimed:
+                return False
+            ticket.claimed = ticket.opponent.claimed = True
+            return True
+
+    def release(self, ticket: Ticket):
+        """Gives up the claim on a pair whose fight failed, so that the next poll fights it again."""
+        with self._lock:
+            if ticket.result is None:
+                ticket.claimed = ticket.opponent.claimed = False
+
+    def complete(self, ticket: Ticket, result: BattleResult):
+        """Stores the fight's result on both tickets of a pair."""
+        with self._lock:
+            ticket.result = result
+            ticket.opponent.result = result
+
+    def stats(self) -> dict:
+        """Returns the queue depth and the matchmaking counters."""
+        with self._lock:
+            self._sweep(time.monotonic())
+            return {
+                "waiting": len(self._order),
+                "high_water": self.high_water,
+                "enqueued": self.enqueued,
+                "matched": self.matched,
+                "expired": self.expired,
+                "cancelled": self.cancelled,
+                "mean_wait": self._wait_total / (2 * self.matched) if self.matched else 0.0,
+            }
+
+
+_matchmaking_queue = MatchmakingQueue()
+
+
+def configure_matchmaking(config=None) -> MatchmakingQueue:
+    """
+    Replace the shared matchmaking queue with an empty one built from a config mapping.
+
+    The queue is per-process; see MatchmakingQueue.
+
+    Args:
+        config (Mapping): Usually the Flask app.config. Missing keys fall back to
+            the MATCHMAKING_* environment variables and then to the defaults.
+
+    Returns:
+        MatchmakingQueue: The new shared queue.
+    """
+    global _matchmaking_queue
+    _matchmaking_queue = MatchmakingQueue(
+        base_tolerance=setting(config, "MATCHMAKING_BASE_TOLERANCE", 10.0, float),
+        widen_per_second=setting(config, "MATCHMAKING_WIDEN_PER_SECOND", 5.0, float),
+        timeout=setting(config, "MATCHMAKING_TIMEOUT", 60.0, float),
+    )
+    return _matchmaking_queue
+
+
+def get_matchmaking_queue() -> MatchmakingQueue:
+    """Return the shared matchmaking queue."""
+    return _matchmaking_queue
@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from flask import has_app_context
+from sqlalchemy.exc import SQLAlchemyError
+
+from db import db
+from models.logger import configure_logger
+from models.settings import flag, setting
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class MissingPokemons(db.Model):
+    """Names PokéAPI answered 404 for, persisted so the negative cache survives restarts."""
+
+    __tablename__ = 'missing_pokemons'
+
+    name = db.Column(db.String, primary_key=True)
+    expires_at = db.Column(db.Float, nullable=False)
+
+
+class NegativeCache:
+    """
+        A TTL-bounded cache of pokemon names that are known not to exist upstream.
+
+        Entries live in a bounded in-memory LRU; when persistence is enabled they are
+        also written to the 'missing_pokemons' table and read back on a memory miss.
+        Only threads with an app context use the table: names added by others, e.g.
+        fetch pool workers, wait until their caller runs persist_pending().
+    """
+
+    def __init__(self, ttl: float = 3600.0, maxsize: int = 10000, persist: bool = False):
+        """
+            Initializes an empty negative cache.
+
+            Args:
+                ttl (float): Seconds a name stays cached after PokéAPI reported it missing.
+                maxsize (int): Maximum number of names kept in memory.
+                persist (bool): Whether to mirror entries into the 'missing_pokemons' table.
+
+            Attributes:
+                hits (int): Lookups answered from the cache.
+                misses (int): Lookups for names not in the cache.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.persist = persist
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(name: str) -> str:
+        return name.strip().lower()
+
+    def contains(self, name: str) -> bool:
+        """
+            Checks whether a name is known to be missing upstream.
+
+            Args:
+                name (str): The pokemon name.
+
+            Returns:
+                bool: True if the name was reported missing less than ttl seconds ago.
+        """
+        name = self._normalize(name)
+        now = time.time()
+
+        with self._lock:
+            expires_at = self._entries.get(name)
+            if expires_at is not None and expires_at <= now:
+                del self._entries[name]
+                expires_at = None
+
+        if expires_at is None and self.persist and has_app_context():
+            expires_at = self._load(name, now)
+
+        with self._lock:
+            if expires_at is None:
+                self.misses += 1
+                return False
+            self.hits += 1
+            self._remember(name, expires_at)
+
+        logger.info(f"Negative cache hit for '{name}'")
+        return True
+
+    def add(self, name: str):
+        """
+            Records that PokéAPI does not know a name.
+
+            Args:
+                name (str): The pokemon name.
+        """
+        name = self._normalize(name)
+        expires_at = time.time() + self.ttl
+
+        with self._lock:
+            self._remember(name, expires_at)
+            if self.persist and not has_app_context():
+                self._pending[name] = expires_at
+
+        if self.persist and has_app_context():
+            self._store({name: expires_at})
+
+        logger.info(f"Cached '{name}' as missing for {self.ttl:.0f}s")
+
+    def persist_pending(self):
+        """Writes the names added outside an app context to the table. Needs an app context."""
+        if not self.persist or not has_app_context():
+            return
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if pending:
+            self._store(pending)
+
+    def clear(self):
+        """Empties the in-memory entries and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns the cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "persist": self.persist,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _remember(self, name: str, expires_at: float):
+        # Caller holds the lock
+        self._entries[name] = expires_at
+        self._entries.move_to_end(name)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _load(self, name: str, now: float) -> Optional[float]:
+        try:
+            row = db.session.get(MissingPokemons, name)
+        except SQLAlchemyError as e:
+            logger.error(f"Couldn't read the persisted negative cache: {e}")
+            return None
+        if row is None or row.expires_at <= now:
+            return None
+        return row.expires_at
+
+    def _store(self, entries: Dict[str, float]):
+        try:
+            for name, expires_at in entries.items():
+                db.session.merge(MissingPokemons(name=name, expires_at=expires_at))
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Couldn't persist {sorted(entries)} to the negative cache: {e}")
+
+
+_negative_cache = NegativeCache()
+
+
+def configure_negative_cache(config=None) -> NegativeCache:
+    """
+    Replace the shared negative cache with one built from a config mapping.
+
+    Args:
+        config (Mapping): Usually the Flask app.config. Missing keys fall back to
+            the NEGATIVE_CACHE_* environment variables and then to the defaults.
+
+    Returns:
+        NegativeCache: The new shared cache.
+    """
+    global _negative_cache
+    _negative_cache = NegativeCache(
+        ttl=setting(config, "NEGATIVE_CACHE_TTL", 3600.0, float),
+        maxsize=setting(config, "NEGATIVE_CACHE_MAXSIZE", 10000, int),
+        persist=setting(config, "NEGATIVE_CACHE_PERSIST", False, flag),
+    )
+    return _negative_cache
+
+
+def get_negative_cache() -> NegativeCache:
+    """Return the shared negative cache."""
+    return _negative_cache
@@ -0,0 +1,266 @@
+import logging
+import threading
+import time
+from contextvars import Context, ContextVar
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from models.circuit_breaker import CircuitBreaker
+from models.logger import configure_logger
+from models.settings import setting
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+DEFAULT_BASE_URL = "https://pokeapi.co/api/v2"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Monotonic time by which upstream calls made in the current context must finish
+_deadline: ContextVar[Optional[float]] = ContextVar("pokeapi_deadline", default=None)
+
+
+class DeadlineExceededError(requests.exceptions.Timeout):
+    """Raised instead of calling PokéAPI once the current request's time budget is spent."""
+
+
+def _remaining_timeout(timeout: Tuple[float, float]) -> Tuple[float, float]:
+    # (connect, read) timeouts shortened to what is left of the current deadline
+    deadline = _deadline.get()
+    if deadline is None:
+        return timeout
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceededError("Deadline for upstream calls exceeded")
+    return min(timeout[0], remaining), min(timeout[1], remaining)
+
+
+def _deadline_passed() -> bool:
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def set_deadline(seconds: Optional[float]):
+    """Give upstream calls in the current context (e.g. one Flask request) a total time budget.
+
+    Args:
+        seconds (float): The budget, or None to remove it.
+    """
+    _deadline.set(time.monotonic() + seconds if seconds is not None else None)
+
+
+def get_deadline() -> Optional[float]:
+    """Return the current context's deadline as a time.monotonic() value, or None."""
+    return _deadline.get()
+
+
+def run_with_deadline(deadline: Optional[float], fn, *args):
+    """Call fn(*args) in a fresh context that only carries an upstream deadline.
+
+    Pool workers use this rather than a copy of the caller's context, which would
+    also carry Flask's app context and so share the caller's db.session across threads.
+
+    Args:
+        deadline (float): What get_deadline() returned in the caller, or None.
+        fn (Callable): The function to call.
+    """
+    def run():
+        _deadline.set(deadline)
+        return fn(*args)
+
+    return Context().run(run)
+
+
+class PokeAPIClient:
+    """A pooled, keep-alive HTTP client for all PokéAPI traffic.
+
+    Wraps a single requests.Session so that every call reuses connections from
+    the pool instead of paying a fresh TCP+TLS handshake, and applies the same
+    timeouts and bounded retries everywhere.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        max_retries: int = 2,
+        backoff_factor: float = 0.3,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        Initializes the client and its connection pool.
+
+        Args:
+            base_url (str): Root URL of the PokéAPI, without a trailing slash.
+            pool_size (int): Maximum number of keep-alive connections kept per host.
+            connect_timeout (float): Seconds to wait for a connection to be established.
+            read_timeout (float): Seconds to wait between bytes of the response.
+            max_retries (int): How many times a failed request is retried.
+            backoff_factor (float): Base for the exponential sleep between retries.
+            breaker (CircuitBreaker): Optional breaker guarding every call.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.breaker = breaker
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        # Retries are done by get(), which can check the deadline between attempts
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=0,
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update({"Accept": "application/json"})
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url_for(self, path: str) -> str:
+        """Build an absolute URL from a path relative to the base URL."""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        """
+        Issue a GET request through the shared session.
+
+        Connection errors, timeouts and 429/5xx responses are retried up to
+        max_retries times with exponential backoff. Every attempt's timeouts are
+        shortened to what is left of the current deadline, if any, and a retry
+        is only started if its backoff ends before the deadline. The breaker
+        counts one call per get(), failed if it raised or ended in a 5xx. A call
+        cut short by our own deadline says nothing about PokéAPI's health, so it
+        is not counted, nor is one that failed with an error other than a
+        request error; either way the breaker's probe slot is given back.
+
+        Args:
+            path (str): Path relative to the base URL, e.g. 'pokemon/pikachu'.
+            **kwargs: Extra arguments forwarded to requests.Session.get.
+
+        Returns:
+            requests.Response: The upstream response.
+
+        Raises:
+            CircuitOpenError: If the breaker is open.
+            DeadlineExceededError: If the current deadline has already passed.
+            requests.exceptions.RequestException: If the request fails after all retries.
+        """
+        timeout = kwargs.pop("timeout", self.timeout)
+        timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        _remaining_timeout(timeout)
+
+        url = self.url_for(path)
+        logger.debug(f"GET {url}")
+
+        if self.breaker is None:
+            return self._get_with_retries(url, timeout, kwargs)
+
+        self.breaker.before_call()
+        start = time.monotonic()
+        success: Optional[bool] = None
+        try:
+            response = self._get_with_retries(url, timeout, kwargs)
+            success = response.status_code < 500
+            return response
+        except requests.exceptions.Timeout:
+            # Includes DeadlineExceededError
+            if not _deadline_passed():
+                success = False
+            raise
+        except requests.exceptions.RequestException:
+            success = False
+            raise
+        finally:
+            if success is None:
+                self.breaker.release()
+            else:
+                self.breaker.record(success, time.monotonic() - start)
+
+    def _get_with_retries(self, url: str, timeout: Tuple[float, float], kwargs: dict) -> requests.Response:
+        attempt = 0
+        while True:
+            attempt_timeout = _remaining_timeout(timeout)
+            try:
+                response = self.session.get(url, timeout=attempt_timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if not self._may_retry(attempt):
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or not self._may_retry(attempt):
+                    return response
+                response.close()
+            logger.debug(f"Retrying GET {url} ({attempt + 1} of {self.max_retries})")
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        return self.backoff_factor * 2 ** attempt
+
+    def _may_retry(self, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        deadline = _deadline.get()
+        return deadline is None or time.monotonic() + self._backoff(attempt) < deadline
+
+    def close(self):
+        """Close every pooled connection."""
+        self.session.close()
+
+
+_client: Optional[PokeAPIClient] = None
+_client_lock = threading.RLock()
+
+
+def configure_client(config=None) -> PokeAPIClient:
+    """
+    (Re)build the shared client from a config mapping.
+
+    Missing keys fall back to the POKEAPI_* environment variables and then to
+    the client defaults.
+
+    Args:
+        config (Mapping): Usually the Flask app.config.
+
+    Returns:
+        PokeAPIClient: The new shared client.
+    """
+    global _client
+    client = PokeAPIClient(
+        base_url=setting(config, "POKEAPI_BASE_URL", DEFAULT_BASE_URL, str),
+        pool_size=setting(config, "POKEAPI_POOL_SIZE", 10, int),
+        connect_timeout=setting(config, "POKEAPI_CONNECT_TIMEOUT", 3.05, float),
+        read_timeout=setting(config, "POKEAPI_READ_TIMEOUT", 10.0, float),
+        max_retries=setting(config, "POKEAPI_MAX_RETRIES", 2, int),
+        backoff_factor=setting(config, "POKEAPI_BACKOFF_FACTOR", 0.3, float),
+        breaker=CircuitBreaker(
+            failure_rate_threshold=setting(config, "POKEAPI_BREAKER_FAILURE_RATE", 0.5, float),
+            slow_call_seconds=setting(config, "POKEAPI_BREAKER_SLOW_CALL_SECONDS", 2.0, float),
+            slow_call_rate_threshold=setting(config, "POKEAPI_BREAKER_SLOW_CALL_RATE", 0.5, float),
+            window_size=setting(config, "POKEAPI_BREAKER_WINDOW", 20, int),
+            minimum_calls=setting(config, "POKEAPI_BREAKER_MIN_CALLS", 5, int),
+            open_seconds=setting(config, "POKEAPI_BREAKER_OPEN_SECONDS", 30.0, float),
+        ),
+    )
+
+    with _client_lock:
+        previous, _client = _client, client
+    if previous is not None:
+        previous.close()
+
+    logger.info(f"PokéAPI client configured for {client.base_url} (pool size {client.pool_size})")
+    return client
+
+
+def get_client() -> PokeAPIClient:
+    """Return the shared client, building it from the environment on first use."""
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                return configure_client()
+    return _client
@@ -0,0 +1,101 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+
+import requests
+
+from models.api_utils import get_attack_and_defense, list_pokemon_species
+from models.logger import configure_logger
+from models.negative_cache import get_negative_cache
+from models.pokeapi_client import get_deadline, run_with_deadline
+from models.pokemon_model import Pokemons
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+def _fetch_species_stats(species_id: int, name: str) -> Optional[dict]:
+    """Fetch the stats of a species' default form.
+
+    PokéAPI gives every species' default pokemon the same ID as the species, so
+    the lookup goes by ID; the row is stored under the species name.
+    """
+    stats = get_attack_and_defense(str(species_id))
+    if stats is None:
+        return None
+    return {"name": name, "attack": stats[0], "defense": stats[1]}
+
+
+def import_pokedex(limit: int = None, max_workers: int = 8, batch_size: int = 500) -> dict:
+    """Pre-warm the pokemons table from the PokéAPI species listing.
+
+    Species are fetched concurrently on a bounded thread pool and written back in
+    batched upserts, so re-running the import refreshes existing rows instead of
+    failing on the unique name. Must be called inside an app context.
+
+    Args:
+        limit (int): Only import the first `limit` species. Defaults to all of them.
+        max_workers (int): Size of the fetch thread pool.
+        batch_size (int): Number of rows written per transaction.
+
+    Returns:
+        dict: Counts of species listed, imported and failed, the failed names and the elapsed seconds.
+
+    Raises:
+        ValueError: If max_workers or batch_size is not positive.
+        requests.exceptions.RequestException: If the species listing can't be fetched.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    start = time.perf_counter()
+    species = list_pokemon_species()
+    if limit is not None:
+        species = species[:limit]
+
+    logger.info(f"Importing {len(species)} species with {max_workers} workers")
+
+    imported = 0
+    failed: List[str] = []
+    batch: List[dict] = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Workers keep the caller's upstream deadline but not its app context, so only this thread uses the session
+        deadline = get_deadline()
+        futures = {
+            pool.submit(run_with_deadline, deadline, _fetch_species_stats, species_id, name): name
+            for species_id, name in species
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                row = future.result()
+            except (ValueError, requests.exceptions.RequestException) as e:
+                logger.error(f"Couldn't import {name}: {e}")
+                row = None
+
+            if row is None:
+                failed.append(name)
+                continue
+
+            batch.append(row)
+            if len(batch) >= batch_size:
+                imported += Pokemons.bulk_upsert(batch)
+                batch = []
+
+    imported += Pokemons.bulk_upsert(batch)
+    get_negative_cache().persist_pending()
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Imported {imported} species in {elapsed:.2f}s ({len(failed)} failed)")
+
+    return {
+        "listed": len(species),
+        "imported": imported,
+        "failed": len(failed),
+        "failed_names": sorted(failed),
+        "seconds": round(elapsed, 3),
+    }
@@ -1,30 +1,70 @@
 import logging
 import math
-import random
-from typing import List
+import time
+from typing import List, NamedTuple, Optional, Union
 
 from .logger import configure_logger
 from .pokemon_model import Pokemons
+from .randomness import RandomnessProvider, SystemRandomness
+from .stat_cache import PokemonStats
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
-random = random.random()
+
+class Combatant(NamedTuple):
+    """A pokemon waiting on the battlefield: its stats and precomputed skill, detached from the session."""
+
+    id: int
+    name: str
+    attack: float
+    defense: float
+    skill: float
+
+    @classmethod
+    def from_stats(cls, stats: PokemonStats) -> "Combatant":
+        """Build a combatant from a pokemon's stats, computing its skill once."""
+        return cls(stats.id, stats.name, stats.attack, stats.defense, stats.attack + stats.defense)
+
+
+class BattleResult(NamedTuple):
+    """Everything that decided one fight."""
+
+    pokemon_1_id: int
+    pokemon_1_name: str
+    pokemon_2_id: int
+    pokemon_2_name: str
+    skill_1: float
+    skill_2: float
+    draw: float
+    winner_id: int
+    winner_name: str
+    fought_at: float
+    entrant_1: Optional[str] = None
+    entrant_2: Optional[str] = None
+
 
 class BattleModel:
     """
         A class that manages the battlefield where pokemons fight.
     """
 
-    def __init__(self):
+    def __init__(self, randomness: RandomnessProvider = None):
         """
             Initializes the BattleManager with an empty list of combatants.
 
+            Args:
+                randomness (RandomnessProvider): Where each battle's draw comes from. Defaults to a
+                    fresh draw per battle; pass a SeededRandomness to replay battles.
+
             Attributes:
-                battlefield (List[int]): The list of ids of the pokemons in the battlefield
+                battlefield (List[Combatant]): The pokemons in the battlefield
+                entrants (List[Optional[str]]): Who entered each pokemon, in the same order
         """
 
-        self.battlefield: List[int] = []
+        self.battlefield: List[Combatant] = []
+        self.entrants: List[Optional[str]] = []
+        self.randomness = randomness if randomness is not None else SystemRandomness()
 
     def battle(self) -> str:
         """
@@ -37,11 +77,25 @@ class BattleModel:
                 ValueError: If there is not enough pokemons in the ring
         """
 
+        return self.fight().winner_name
+
+    def fight(self) -> BattleResult:
+        """
+            Simulates a fight between two pokemons and reports how it was decided.
+
+            Returns:
+                BattleResult: The combatants, their skills, the draw and the winner.
+
+            Raises:
+                ValueError: If there is not enough pokemons in the ring
+        """
+
         if len(self.battlefield) < 2:
             logger.error("There must be two pokemons to start a fight.")
             raise ValueError("There must be two pokemons to start a fight.")
         
         pokemon_1, pokemon_2 = self.get_pokemons()
+        entrant_1, entrant_2 = self.entrants if len(self.entrants) == 2 else (None, None)
 
         logger.info(f"Fight started between {pokemon_1.name} and {pokemon_2.name}")
 
@@ -57,9 +111,10 @@ class BattleModel:
         logger.debug(f"Raw delta between skills: {delta:.3f}")
         logger.debug(f"Normalized delta: {normalized_delta:.3f}")
 
-        logger.debug(f"Random number from random.org: {random :.3f}")
+        draw = self.randomness.random()
+        logger.debug(f"Random draw: {draw:.3f}")
 
-        if random < normalized_delta:
+        if draw < normalized_delta:
             winner = pokemon_1
         else:
             winner = pokemon_2
@@ -68,7 +123,20 @@ class BattleModel:
 
         self.clear_battlefield()
 
-        return winner.name
+        return BattleResult(
+            pokemon_1_id=pokemon_1.id,
+            pokemon_1_name=pokemon_1.name,
+            pokemon_2_id=pokemon_2.id,
+            pokemon_2_name=pokemon_2.name,
+            skill_1=skill_1,
+            skill_2=skill_2,
+            draw=draw,
+            winner_id=winner.id,
+            winner_name=winner.name,
+            fought_at=time.time(),
+            entrant_1=entrant_1,
+            entrant_2=entrant_2,
+        )
 
     def clear_battlefield(self):
         """
@@ -80,13 +148,15 @@ class BattleModel:
             return
         logger.info("Clearing pokemons from the battlefield.")
         self.battlefield.clear()
+        self.entrants.clear()
 
-    def enter_battlefield(self, pokemon_id: int):
+    def enter_battlefield(self, pokemon_id: int, entrant: Optional[str] = None):
         """
             Prepares a pokemon by adding them to the battlefield.
 
             Args:
                 pokemon_id (int): The ID of the pokemon to enter the ring.
+                entrant (str): The user entering it, if any.
 
             Raises:
                 ValueError: If the battlefield already has two pokemons.
@@ -98,22 +168,41 @@ class BattleModel:
             raise ValueError("Battlefield is full")
 
         try:
-            pokemon = Pokemons.get_pokemon_by_id(pokemon_id)
+            pokemon = Pokemons.get_stats_by_id(pokemon_id)
         except ValueError as e:
             logger.error(str(e))
             raise
 
-        self.battlefield.append(pokemon)  # append the whole pokemon object
-        logger.info(f"Adding pokemon '{pokemon.name}' (ID {pokemon_id}) to the battlefield")
+        self.enter_combatant(Combatant.from_stats(pokemon), entrant)
+
+    def enter_combatant(self, combatant: Combatant, entrant: Optional[str] = None):
+        """
+            Adds a pokemon whose stats have already been looked up to the battlefield.
+
+            Args:
+                combatant (Combatant): The pokemon entering the ring.
+                entrant (str): The user entering it, if any.
+
+            Raises:
+                ValueError: If the battlefield already has two pokemons.
+        """
+
+        if len(self.battlefield) >= 2:
+            logger.error(f"Battlefield is full")
+            raise ValueError("Battlefield is full")
+
+        self.battlefield.append(combatant)
+        self.entrants.append(entrant)
+        logger.info(f"Adding pokemon '{combatant.name}' (ID {combatant.id}) to the battlefield")
 
         logger.info(f"Current pokemons in the battlefield: {[p.name for p in self.battlefield]}")
 
-    def get_pokemons(self) -> List[Pokemons]:
+    def get_pokemons(self) -> List[Combatant]:
         """
         Retrieves the current list of pokemons on the battlefield.
 
         Returns:
-            List[Pokemons]: A list of Pokemons dataclass instances representing the pokemons in the battlefield.
+            List[Combatant]: The combatants in the battlefield.
 
         Raises:
             ValueError: If the battlefield is not empty
@@ -123,17 +212,20 @@ class BattleModel:
         
         return self.battlefield
 
-    def get_pokemon_skills(self, pokemon: Pokemons) -> float:
+    def get_pokemon_skills(self, pokemon: Union[Combatant, Pokemons]) -> float:
         """
             Calculates the skill for a pokemon
 
             Args:
-                pokemon (Pokemons): A Pokemons dataclass representing the combatant.
+                pokemon (Combatant | Pokemons): The combatant; a Combatant's precomputed skill is used as is.
             
             Returns:
                 float: The calculated skill
         """
 
+        if isinstance(pokemon, Combatant):
+            return pokemon.skill
+
         logger.info(f"Calculating fighting skill for {pokemon.name}: attack={pokemon.attack}, defense={pokemon.defense}")
 
         skill = (pokemon.attack + pokemon.defense)
@@ -1,8 +1,16 @@
 import logging
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from db import db
 from models.logger import configure_logger
-from models.api_utils import get_attack_and_defense
+from models.api_utils import get_attack_and_defense, get_attack_and_defense_many
+from models.stat_cache import PokemonStats, get_stat_cache
+from models.stats_snapshot import lookup_snapshot
+from models.win_matrix import get_win_matrix
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
@@ -35,7 +43,16 @@ class Pokemons(db.Model):
             raise ValueError("Pokemon must be a non-empty string.")
         
         if attack is None or defense is None:
-            stats = get_attack_and_defense(name.lower())
+            snapshot_stats = lookup_snapshot(name.lower())
+            if snapshot_stats is not None:
+                stats = [snapshot_stats.attack, snapshot_stats.defense]
+            else:
+                try:
+                    stats = get_attack_and_defense(name.lower())
+                except requests.exceptions.RequestException:
+                    stats = None
+            if stats is None:
+                raise ValueError(f"Stats for '{name}' could not be fetched from PokéAPI.")
             attack = stats[0]
             defense = stats[1]
         
@@ -101,6 +118,8 @@ class Pokemons(db.Model):
             
             db.session.add(pokemon)
             db.session.commit()
+            get_stat_cache().put(pokemon.to_stats())
+            get_win_matrix().upsert(pokemon.to_stats())
             logger.info(f"pokemon created successfully: {name}")
 
         except IntegrityError:
@@ -112,6 +131,72 @@ class Pokemons(db.Model):
             db.session.rollback()
             raise
 
+    @classmethod
+    def bulk_upsert(cls, rows: List[dict]) -> int:
+        """Insert or update many pokemons in a single transaction.
+
+        Rows whose name already exists get their attack and defense overwritten.
+
+        Args:
+            rows: Dicts with 'name', 'attack' and 'defense' keys.
+
+        Returns:
+            int: The number of rows written.
+
+        Raises:
+            ValueError: If any row has an invalid name or stats.
+            SQLAlchemyError: If there is a database error during the write.
+        """
+        if not rows:
+            return 0
+
+        values = {}
+        for row in rows:
+            name, attack, defense = row["name"], row["attack"], row["defense"]
+            if not name or not isinstance(name, str):
+                raise ValueError("Pokemon must be a non-empty string.")
+            if not isinstance(attack, (int, float)) or attack <= 0:
+                raise ValueError(f"Attack for '{name}' must be a float and greater than 0.")
+            if not isinstance(defense, (int, float)) or defense <= 0:
+                raise ValueError(f"Defense for '{name}' must be a float and greater than 0.")
+            # The last row for a name wins, as it would with sequential upserts
+            values[name.strip().lower()] = {"name": name.strip().lower(), "attack": attack, "defense": defense}
+
+        dialect = db.engine.dialect.name
+        insert = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}.get(dialect)
+
+        try:
+            if insert is not None:
+                statement = insert(cls.__table__).values(list(values.values()))
+                statement = statement.on_conflict_do_update(
+                    index_elements=[cls.__table__.c.name],
+                    set_={
+                        "attack": statement.excluded.attack,
+                        "defense": statement.excluded.defense,
+                    },
+                )
+                db.session.execute(statement)
+            else:
+                # No native upsert on this dialect: update the names that exist and insert the rest
+                existing = {pokemon.name: pokemon for pokemon in cls.query.filter(cls.name.in_(list(values))).all()}
+                for name, row in values.items():
+                    pokemon = existing.get(name)
+                    if pokemon is None:
+                        db.session.add(cls(**row))
+                    else:
+                        pokemon.attack, pokemon.defense = row["attack"], row["defense"]
+            db.session.commit()
+            stat_cache = get_stat_cache()
+            for name in values:
+                stat_cache.invalidate(name=name)
+            get_win_matrix().invalidate()
+            logger.info(f"Upserted {len(values)} pokemons")
+            return len(values)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error during bulk upsert: {e}")
+            db.session.rollback()
+            raise
+
     @classmethod
     def get_pokemon_by_id(cls, pokemon_id: int) -> "Pokemons":
         """Retrieve a pokemon by ID.
@@ -137,6 +222,7 @@ class Pokemons(db.Model):
                 raise ValueError(f"Pokemon with ID {pokemon_id} not found")
             
             logger.info(f"Successfully retrieved pokemon")
+            get_stat_cache().put(pokemon.to_stats())
             return pokemon
         
         except SQLAlchemyError as e:
@@ -162,8 +248,217 @@ class Pokemons(db.Model):
             logger.info(f"Pokemon '{name}' not found.")
             raise ValueError(f"Pokemon with name '{name}' does not exist.")
         
+        get_stat_cache().put(pokemon.to_stats())
         return pokemon
 
+    def to_stats(self) -> PokemonStats:
+        """Return an immutable snapshot of this pokemon's stats."""
+        return PokemonStats(id=self.id, name=self.name, attack=self.attack, defense=self.defense)
+
+    @classmethod
+    def get_stats_by_id(cls, pokemon_id: int) -> PokemonStats:
+        """Retrieve a pokemon's stats by ID, from the stat cache when possible.
+
+        Args:
+            pokemon_id: The ID of the pokemon.
+
+        Returns:
+            PokemonStats: The pokemon's stats.
+
+        Raises:
+            ValueError: If the pokemon with the given ID does not exist.
+        """
+        stats = get_stat_cache().get_by_id(pokemon_id)
+        if stats is None:
+            stats = cls._query_stats(id=pokemon_id)
+        return stats
+
+    @classmethod
+    def get_stats_by_name(cls, name: str) -> PokemonStats:
+        """Retrieve a pokemon's stats by name, from the stat cache when possible.
+
+        Args:
+            name: The name of the pokemon.
+
+        Returns:
+            PokemonStats: The pokemon's stats.
+
+        Raises:
+            ValueError: If the pokemon with the given name does not exist.
+        """
+        stats = get_stat_cache().get_by_name(name)
+        if stats is None:
+            stats = cls._query_stats(name=name)
+        return stats
+
+    @classmethod
+    def get_stats_by_names(cls, names: List[str]) -> Dict[str, PokemonStats]:
+        """Retrieve several pokemons' stats by name, from the stat cache when possible.
+
+        Names missing from the cache are read together in one IN query.
+
+        Args:
+            names: The names of the pokemons.
+
+        Returns:
+            Dict[str, PokemonStats]: The stats of each name.
+
+        Raises:
+            ValueError: If any of the names does not exist.
+        """
+        found = {}
+        missing = []
+        for name in names:
+            stats = get_stat_cache().get_by_name(name)
+            if stats is None:
+                missing.append(name)
+            else:
+                found[name] = stats
+
+        if missing:
+            rows = db.session.query(cls.id, cls.name, cls.attack, cls.defense).filter(cls.name.in_(set(missing))).all()
+            for row in rows:
+                stats = PokemonStats(*row)
+                get_stat_cache().put(stats)
+                found[stats.name] = stats
+
+        unknown = [name for name in names if name not in found]
+        if unknown:
+            logger.info(f"Pokemons not found: {unknown}")
+            raise ValueError(f"Pokemon with name '{unknown[0]}' does not exist.")
+        return found
+
+    @classmethod
+    def _query_stats(cls, **criteria) -> PokemonStats:
+        """Read one pokemon's stats as plain columns and cache them.
+
+        No ORM instance is built, so nothing is added to the session's identity
+        map and nothing can lazy-load later.
+
+        Raises:
+            ValueError: If no pokemon matches the criteria (an id or a name).
+        """
+        try:
+            row = db.session.query(cls.id, cls.name, cls.attack, cls.defense).filter_by(**criteria).first()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error while retrieving pokemon stats by {criteria}: {e}")
+            raise
+        if row is None:
+            if "id" in criteria:
+                message = f"Pokemon with ID {criteria['id']} not found"
+            else:
+                message = f"Pokemon with name '{criteria['name']}' does not exist."
+            logger.info(message)
+            raise ValueError(message)
+        stats = PokemonStats(*row)
+        get_stat_cache().put(stats)
+        return stats
+
+    @classmethod
+    def all_stats(cls) -> List[PokemonStats]:
+        """Read every pokemon's stats in one query, without building ORM instances.
+
+        Returns:
+            List[PokemonStats]: The stats of every stored pokemon.
+        """
+        rows = db.session.query(cls.id, cls.name, cls.attack, cls.defense).all()
+        return [PokemonStats(*row) for row in rows]
+
+    @classmethod
+    def warm_stat_cache(cls) -> int:
+        """Load every pokemon into the stat cache.
+
+        Returns:
+            int: The number of pokemons loaded.
+        """
+        return get_stat_cache().warm(cls.all_stats())
+
+    @classmethod
+    def get_pokemons_by_names(cls, names: List[str]) -> Dict[str, "Pokemons"]:
+        """Retrieve several pokemons by name with a single IN query.
+
+        Args:
+            names: The names of the pokemons.
+
+        Returns:
+            Dict[str, Pokemons]: name -> pokemon, for the names that exist.
+        """
+        if not names:
+            return {}
+        pokemons = cls.query.filter(cls.name.in_(set(names))).all()
+        return {pokemon.name: pokemon for pokemon in pokemons}
+
+    @classmethod
+    def stored_results(cls, names: List[str]) -> Optional[List[dict]]:
+        """Resolve several pokemons from what is stored, without fetching or writing anything.
+
+        Args:
+            names: The names of the pokemons. Case-insensitive; duplicates are resolved once.
+
+        Returns:
+            Optional[List[dict]]: The results fetch_many would return, or None if any name isn't stored.
+        """
+        names, results = cls._resolve_stored(names)
+        if len(results) < len(names):
+            return None
+        return [results[name] for name in names]
+
+    @classmethod
+    def _resolve_stored(cls, names: List[str]) -> Tuple[List[str], Dict[str, dict]]:
+        # The distinct normalized names, and a fetch_many result for each one that is stored
+        names = list(dict.fromkeys(name.strip().lower() for name in names if name and name.strip()))
+
+        stat_cache = get_stat_cache()
+        local = {name: stat_cache.get_by_name(name) for name in names}
+        uncached = [name for name, stats in local.items() if stats is None]
+        for name, pokemon in cls.get_pokemons_by_names(uncached).items():
+            local[name] = pokemon.to_stats()
+            stat_cache.put(local[name])
+
+        return names, {
+            name: {"name": name, "found": True, "source": "local database",
+                   "pokemon": {"name": name, "attack": stats.attack, "defense": stats.defense}}
+            for name, stats in local.items() if stats is not None
+        }
+
+    @classmethod
+    def fetch_many(cls, names: List[str], max_workers: int = 8) -> List[dict]:
+        """Resolve several pokemons, fetching and saving the ones not stored yet.
+
+        Known names come from the stat cache or one IN query, the misses are fetched from PokéAPI
+        concurrently and all new rows are persisted in a single commit.
+
+        Args:
+            names: The names of the pokemons. Case-insensitive; duplicates are resolved once.
+            max_workers: Size of the thread pool used for the PokéAPI misses.
+
+        Returns:
+            List[dict]: One result per distinct name, in request order, with the
+            name, a 'found' flag, the 'pokemon' stats and the 'source'.
+
+        Raises:
+            requests.exceptions.RequestException: If PokéAPI fails or its breaker is open; nothing is saved.
+        """
+        names, results = cls._resolve_stored(names)
+
+        misses = [name for name in names if name not in results]
+        logger.info(f"Resolving {len(names)} pokemons: {len(results)} local, {len(misses)} from PokéAPI")
+
+        fetched = get_attack_and_defense_many(misses, max_workers=max_workers)
+        new_rows = []
+        for name in misses:
+            stats = fetched.get(name)
+            if stats is None:
+                results[name] = {"name": name, "found": False, "source": None, "pokemon": None}
+                continue
+            row = {"name": name, "attack": stats[0], "defense": stats[1]}
+            new_rows.append(row)
+            results[name] = {"name": name, "found": True, "source": "external API and saved to DB", "pokemon": row}
+
+        cls.bulk_upsert(new_rows)
+
+        return [results[name] for name in names]
+
     @classmethod
     def delete(cls, pokemon_id: int) -> None:
         """Delete a pokemon by ID.
@@ -175,12 +470,14 @@ class Pokemons(db.Model):
             ValueError: If the pokemon with the given ID does not exist.
 
         """
-        pokemon = cls.query.get(pokemon_id)
+        pokemon = db.session.get(cls, pokemon_id)
         if pokemon is None:
             logger.info(f"pokemon with ID {pokemon_id} not found.")
             raise ValueError(f"pokemon with ID {pokemon_id} not found.")
         db.session.delete(pokemon)
         db.session.commit()
+        get_stat_cache().invalidate(pokemon_id=pokemon_id, name=pokemon.name)
+        get_win_matrix().remove(pokemon_id)
         logger.info(f"pokemon with ID {pokemon_id} permanently deleted.")
 
     def update_stats(self, stat, change):
@@ -211,6 +508,8 @@ class Pokemons(db.Model):
             self.defense += change
             
         db.session.commit()
+        get_stat_cache().put(self.to_stats())
+        get_win_matrix().upsert(self.to_stats())
         logger.info(f"Updated stats for pokemon {self.name}: {self.defense} defense, {self.attack} attack.")
         
         
@@ -0,0 +1,158 @@
+import random
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ("sort_key", "priority", "left", "right", "size")
+
+    def __init__(self, sort_key):
+        self.sort_key = sort_key
+        self.priority = random.random()
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.size = 1
+
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node is not None else 0
+
+
+def _resize(node: _Node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+
+
+def _split(node: Optional[_Node], sort_key) -> Tuple[Optional[_Node], Optional[_Node]]:
+    # Keys < sort_key go left, the rest go right
+    if node is None:
+        return None, None
+    if node.sort_key < sort_key:
+        left, right = _split(node.right, sort_key)
+        node.right = left
+        _resize(node)
+        return node, right
+    left, right = _split(node.left, sort_key)
+    node.left = right
+    _resize(node)
+    return left, node
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    # Every key in left is smaller than every key in right
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _resize(left)
+        return left
+    right.left = _merge(left, right.left)
+    _resize(right)
+    return right
+
+
+def _remove(node: Optional[_Node], sort_key) -> Optional[_Node]:
+    if node is None:
+        return None
+    if node.sort_key == sort_key:
+        return _merge(node.left, node.right)
+    if sort_key < node.sort_key:
+        node.left = _remove(node.left, sort_key)
+    else:
+        node.right = _remove(node.right, sort_key)
+    _resize(node)
+    return node
+
+
+class RankIndex:
+    """
+        Keys ordered by descending score, with O(log n) updates and rank queries.
+
+        A treap whose nodes carry subtree sizes (an order-statistics tree): the
+        rank of a key is the number of nodes before it, found on one root-to-leaf
+        walk, and the top k are the first k nodes of an in-order walk. Ties are
+        broken by key so the order is deterministic. Not thread-safe; callers lock.
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._scores: Dict[Hashable, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._scores
+
+    def score(self, key: Hashable) -> Optional[float]:
+        """Returns a key's score, or None if it isn't indexed."""
+        return self._scores.get(key)
+
+    def set(self, key: Hashable, score: float):
+        """
+            Adds a key or moves it to a new score.
+
+            Args:
+                key (Hashable): The key, e.g. a pokemon ID or a username.
+                score (float): Its score; higher ranks first.
+        """
+        self.discard(key)
+        sort_key = (-score, key)
+        left, right = _split(self._root, sort_key)
+        self._root = _merge(_merge(left, _Node(sort_key)), right)
+        self._scores[key] = score
+
+    def discard(self, key: Hashable):
+        """Removes a key if it is indexed."""
+        score = self._scores.pop(key, None)
+        if score is not None:
+            self._root = _remove(self._root, (-score, key))
+
+    def rank(self, key: Hashable) -> Optional[int]:
+        """
+            Returns a key's 1-based rank.
+
+            Args:
+                key (Hashable): The key.
+
+            Returns:
+                Optional[int]: 1 for the highest score, or None if the key isn't indexed.
+        """
+        score = self._scores.get(key)
+        if score is None:
+            return None
+        sort_key = (-score, key)
+        before = 0
+        node = self._root
+        while node is not None:
+            if node.sort_key < sort_key:
+                before += _size(node.left) + 1
+                node = node.right
+            elif node.sort_key == sort_key:
+                return before + _size(node.left) + 1
+            else:
+                node = node.left
+        return None
+
+    def top(self, k: int) -> List[Tuple[Hashable, float]]:
+        """
+            Returns the k highest-scoring keys.
+
+            Args:
+                k (int): How many to return.
+
+            Returns:
+                List[Tuple[Hashable, float]]: (key, score) pairs, best first.
+        """
+        return [(sort_key[1], -sort_key[0]) for sort_key in self._walk(k)]
+
+    def _walk(self, limit: int) -> Iterator[tuple]:
+        stack: List[_Node] = []
+        node = self._root
+        emitted = 0
+        while emitted < limit and (stack or node is not None):
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.sort_key
+            emitted += 1
+            node = node.right
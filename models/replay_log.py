@@ -0,0 +1,232 @@
+import atexit
+import glob
+import logging
+import os
+import re
+import struct
+import threading
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from models.battle_engine import win_probabilities
+from models.logger import configure_logger
+from models.pokemon_battle_model import BattleResult
+from models.settings import setting
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+MAGIC = b"PKREPLAY"
+VERSION = 1
+SEGMENT_PATTERN = "battles-{:06d}-{}.replay"  # index, writer pid
+_SEGMENT_INDEX = re.compile(r"battles-(\d+)")
+
+# magic, version, record size, padding up to a 32-byte header
+_HEADER = struct.Struct("<8sHH20x")
+# pokemon_1_id, pokemon_2_id, winner_id, skill_1, skill_2, draw, fought_at
+_RECORD = struct.Struct("<IIIdddd")
+
+RECORD_DTYPE = np.dtype([
+    ("pokemon_1_id", "<u4"),
+    ("pokemon_2_id", "<u4"),
+    ("winner_id", "<u4"),
+    ("skill_1", "<f8"),
+    ("skill_2", "<f8"),
+    ("draw", "<f8"),
+    ("fought_at", "<f8"),
+])
+
+
+class ReplayLog:
+    """
+        Append-only binary log of fought battles, split into fixed-size segments.
+
+        Each battle is one fixed-width record, so a segment can be mapped straight
+        into a NumPy structured array by read_segment(). When the current segment
+        holds `segment_records` records a new one is started.
+
+        Several processes can share a directory: each writes only to segments it
+        created itself, with O_EXCL, and named after its pid, so no segment ever
+        has two writers. Every record is written whole with a single unbuffered
+        write to a file opened with O_APPEND, so readers see it at once. A partly
+        written record, e.g. from a crash, can only be at the end of a segment,
+        where readers ignore it. The first segment is created by the first
+        append, so opening a log to read it writes nothing.
+    """
+
+    def __init__(self, directory: str, segment_records: int = 1_000_000):
+        """
+            Opens the log; its segment is created by the first append.
+
+            Args:
+                directory (str): Where the segments are kept; created if needed.
+                segment_records (int): Records per segment before rotating.
+
+            Attributes:
+                appended (int): Records appended since the log was opened.
+                rotations (int): Segments started since the log was opened.
+        """
+        self.directory = directory
+        self.segment_records = segment_records
+        self.appended = 0
+        self.rotations = 0
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+        self._index = 0
+        self._records = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _rotate(self):
+        # Caller holds the lock. O_EXCL never reuses a file, e.g. one left behind by an earlier process with the same pid
+        self._close_segment()
+        pid = os.getpid()
+        index = max([self._index] + [_segment_index(path) for path in list_segments(self.directory)])
+        while True:
+            index += 1
+            path = os.path.join(self.directory, SEGMENT_PATTERN.format(index, pid))
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND | getattr(os, "O_BINARY", 0), 0o644)
+                break
+            except FileExistsError:
+                continue
+        os.write(fd, _HEADER.pack(MAGIC, VERSION, _RECORD.size))
+        self._fd, self._pid, self._index, self._records = fd, pid, index, 0
+        self.rotations += 1
+        logger.info(f"Started replay segment {path}")
+
+    def _close_segment(self):
+        # Caller holds the lock
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def append(self, result: BattleResult):
+        """
+            Appends one battle.
+
+            Args:
+                result (BattleResult): The fight.
+        """
+        record = _RECORD.pack(result.pokemon_1_id, result.pokemon_2_id, result.winner_id,
+                              result.skill_1, result.skill_2, result.draw, result.fought_at)
+        with self._lock:
+            # A forked worker must not keep writing to its parent's segment
+            if self._fd is None or self._pid != os.getpid() or self._records >= self.segment_records:
+                self._rotate()
+            os.write(self._fd, record)
+            self._records += 1
+            self.appended += 1
+
+    def close(self):
+        """Closes the current segment; a later append starts a new one."""
+        with self._lock:
+            self._close_segment()
+
+    def stats(self) -> dict:
+        """Returns the current segment and the append counters."""
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "segment": self._index,
+                "segment_records": self._records,
+                "appended": self.appended,
+                "rotations": self.rotations,
+            }
+
+
+def list_segments(directory: str) -> List[str]:
+    """Return the paths of a log's segments, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, "battles-[0-9]*.replay")))
+
+
+def _segment_index(path: str) -> int:
+    return int(_SEGMENT_INDEX.match(os.path.basename(path)).group(1))
+
+
+def read_segment(path: str) -> np.ndarray:
+    """Map a replay segment as a read-only structured array of RECORD_DTYPE.
+
+    Nothing is copied: columns such as `records["winner_id"]` are views over
+    the page cache, so scanning a segment never builds per-row Python objects.
+
+    Args:
+        path (str): The segment file.
+
+    Returns:
+        np.ndarray: The segment's complete records.
+
+    Raises:
+        ValueError: If the file is not a replay segment or has an unsupported version.
+    """
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path} is too short to be a replay segment")
+    magic, version, record_size = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a replay segment")
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} has unsupported replay version {version}")
+
+    count = (os.path.getsize(path) - _HEADER.size) // record_size
+    if count == 0:
+        # np.memmap can't map an empty range
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=_HEADER.size, shape=(count,))
+
+
+def iter_segments(directory: str) -> Iterator[np.ndarray]:
+    """Map every segment of a log in turn, oldest first."""
+    for path in list_segments(directory):
+        yield read_segment(path)
+
+
+def replay_winners(records: np.ndarray) -> np.ndarray:
+    """Decide recorded battles again from their skills and draws, with the BattleModel rules.
+
+    Args:
+        records (np.ndarray): Records of RECORD_DTYPE, e.g. a mapped segment.
+
+    Returns:
+        np.ndarray: The winner of each battle; equal to records['winner_id'] for an intact log.
+    """
+    first_won = records["draw"] < win_probabilities(records["skill_1"], records["skill_2"])
+    return np.where(first_won, records["pokemon_1_id"], records["pokemon_2_id"])
+
+
+_replay_log: Optional[ReplayLog] = None
+
+
+def configure_replay_log(config=None) -> Optional[ReplayLog]:
+    """
+    Replace the shared replay log with one writing to REPLAY_LOG_DIR, if set.
+
+    Args:
+        config (Mapping): Usually the Flask app.config. Missing keys fall back to
+            the REPLAY_* environment variables and then to the defaults.
+
+    Returns:
+        Optional[ReplayLog]: The shared log, or None if no directory is configured.
+    """
+    global _replay_log
+    if _replay_log is not None:
+        _replay_log.close()
+        _replay_log = None
+
+    directory = setting(config, "REPLAY_LOG_DIR", None, str)
+    if directory:
+        _replay_log = ReplayLog(directory, segment_records=setting(config, "REPLAY_SEGMENT_RECORDS", 1_000_000, int))
+    return _replay_log
+
+
+def get_replay_log() -> Optional[ReplayLog]:
+    """Return the shared replay log, or None if battles aren't being logged."""
+    return _replay_log
+
+
+@atexit.register
+def _close_replay_log():
+    if _replay_log is not None:
+        _replay_log.close()
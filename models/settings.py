@@ -0,0 +1,28 @@
+import os
+from typing import Any, Callable, Mapping, Optional
+
+
+def setting(config: Optional[Mapping], key: str, default: Any, cast: Callable[[Any], Any]) -> Any:
+    """Read one setting for a configure_* function.
+
+    The value comes from `config` (usually the Flask app.config), then from the
+    environment variable of the same name, then from `default`.
+
+    Args:
+        config (Mapping): The config mapping; None reads only the environment.
+        key (str): The setting name, which is also the environment variable name.
+        default (Any): The value when neither source has one.
+        cast (Callable): Converts the raw value, e.g. int or flag.
+
+    Returns:
+        Any: The cast value, or None if there is none and the default is None.
+    """
+    value = config.get(key) if config else None
+    if value is None:
+        value = os.getenv(key, default)
+    return cast(value) if value is not None else None
+
+
+def flag(value: Any) -> bool:
+    """Cast a boolean setting, accepting '1', 'true' and 'yes' from the environment."""
+    return str(value).lower() in ("1", "true", "yes")
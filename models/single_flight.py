@@ -0,0 +1,91 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from models.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class _Call:
+    """A call in flight, shared by its leader and every waiter."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+        Coalesces concurrent calls for the same key into one execution.
+
+        The first caller for a key (the leader) runs the function; callers that arrive
+        while it is still running block until it finishes and receive the same result,
+        or the same exception.
+    """
+
+    def __init__(self):
+        """
+            Initializes the SingleFlight with no calls in flight.
+
+            Attributes:
+                leaders (int): Number of calls that actually ran the function.
+                coalesced (int): Number of calls that waited on another caller instead.
+        """
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+            Runs fn once for all concurrent callers sharing the key.
+
+            Args:
+                key (Hashable): Identifies the work, e.g. a normalized pokemon name.
+                fn (Callable): The work to run if no call for the key is in flight.
+
+            Returns:
+                Any: The result of fn.
+
+            Raises:
+                Exception: Whatever fn raised, re-raised in the leader and every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            logger.debug(f"Waiting on in-flight call for {key!r}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.info(f"Coalesced {call.waiters} concurrent calls for {key!r}")
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being worked on."""
+        with self._lock:
+            return len(self._calls)
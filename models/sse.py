@@ -0,0 +1,29 @@
+import json
+from typing import Any, Optional
+
+
+def format_sse(data: Any, event: Optional[str] = None, event_id: Optional[str] = None) -> str:
+    """Encode one Server-Sent Events message.
+
+    Args:
+        data (Any): The payload, sent as JSON on a single data line.
+        event (str): The event name clients listen for; None for the default 'message'.
+        event_id (str): The message ID, echoed back by reconnecting clients as Last-Event-ID.
+
+    Returns:
+        str: The message, terminated by the blank line that ends it.
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop reverse proxies from buffering the stream
+    "X-Accel-Buffering": "no",
+}
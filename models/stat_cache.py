@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from models.logger import configure_logger
+from models.settings import setting
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class PokemonStats(NamedTuple):
+    """An immutable snapshot of a pokemon's row, safe to share across requests and threads."""
+
+    id: int
+    name: str
+    attack: float
+    defense: float
+
+
+class StatCache:
+    """
+        A bounded LRU + TTL cache of pokemon stats, addressable by ID and by name.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 600.0):
+        """
+            Initializes an empty stat cache.
+
+            Args:
+                maxsize (int): Maximum number of pokemons kept.
+                ttl (float): Seconds an entry stays valid; 0 keeps entries until evicted or invalidated.
+
+            Attributes:
+                hits (int): Lookups answered from the cache.
+                misses (int): Lookups that had to go to the database.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._by_id: "OrderedDict[int, Tuple[PokemonStats, float]]" = OrderedDict()
+        self._ids_by_name: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get_by_id(self, pokemon_id: int) -> Optional[PokemonStats]:
+        """
+            Looks up a pokemon's stats by ID.
+
+            Args:
+                pokemon_id (int): The pokemon ID.
+
+            Returns:
+                Optional[PokemonStats]: The cached stats, or None on a miss.
+        """
+        with self._lock:
+            return self._get(pokemon_id)
+
+    def get_by_name(self, name: str) -> Optional[PokemonStats]:
+        """
+            Looks up a pokemon's stats by name.
+
+            Args:
+                name (str): The pokemon name, as stored.
+
+            Returns:
+                Optional[PokemonStats]: The cached stats, or None on a miss.
+        """
+        with self._lock:
+            return self._get(self._ids_by_name.get(name))
+
+    def put(self, stats: PokemonStats):
+        """
+            Stores a pokemon's stats, replacing any previous entry for its ID or name.
+
+            Args:
+                stats (PokemonStats): The stats to cache.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else float("inf")
+        with self._lock:
+            self._discard(stats.id)
+            self._discard(self._ids_by_name.get(stats.name))
+            self._by_id[stats.id] = (stats, expires_at)
+            self._ids_by_name[stats.name] = stats.id
+            while len(self._by_id) > self.maxsize:
+                oldest_id = next(iter(self._by_id))
+                self._discard(oldest_id)
+
+    def warm(self, records: Iterable[PokemonStats]) -> int:
+        """
+            Loads many records at once, e.g. the whole table at startup.
+
+            Returns:
+                int: The number of records loaded.
+        """
+        count = 0
+        for stats in records:
+            self.put(stats)
+            count += 1
+        logger.info(f"Warmed stat cache with {count} pokemons")
+        return count
+
+    def invalidate(self, pokemon_id: int = None, name: str = None):
+        """
+            Drops the entry for a pokemon ID and/or name.
+        """
+        with self._lock:
+            self._discard(pokemon_id)
+            self._discard(self._ids_by_name.get(name))
+
+    def clear(self):
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self._by_id.clear()
+            self._ids_by_name.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns the cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "size": len(self._by_id),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _get(self, pokemon_id: Optional[int]) -> Optional[PokemonStats]:
+        # Caller holds the lock
+        entry = self._by_id.get(pokemon_id) if pokemon_id is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        stats, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._discard(pokemon_id)
+            self.misses += 1
+            return None
+        self._by_id.move_to_end(pokemon_id)
+        self.hits += 1
+        return stats
+
+    def _discard(self, pokemon_id: Optional[int]):
+        # Caller holds the lock
+        if pokemon_id is None:
+            return
+        entry = self._by_id.pop(pokemon_id, None)
+        if entry is not None and self._ids_by_name.get(entry[0].name) == pokemon_id:
+            del self._ids_by_name[entry[0].name]
+
+
+_stat_cache = StatCache()
+
+
+def configure_stat_cache(config=None) -> StatCache:
+    """
+    Replace the shared stat cache with one built from a config mapping.
+
+    Args:
+        config (Mapping): Usually the Flask app.config. Missing keys fall back to
+            the STAT_CACHE_* environment variables and then to the defaults.
+
+    Returns:
+        StatCache: The new shared cache.
+    """
+    global _stat_cache
+    _stat_cache = StatCache(
+        maxsize=setting(config, "STAT_CACHE_MAXSIZE", 4096, int),
+        ttl=setting(config, "STAT_CACHE_TTL", 600.0, float),
+    )
+    return _stat_cache
+
+
+def get_stat_cache() -> StatCache:
+    """Return the shared stat cache."""
+    return _stat_cache
@@ -0,0 +1,105 @@
+import json
+import logging
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+from models.logger import configure_logger
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+_STATS_KEY = re.compile(rb'"stats"\s*:\s*\[')
+# Bytes kept between chunks so a key split across a chunk boundary is still found
+_TAIL = 64
+_BACKSLASH = 0x5C
+_NOT_STRUCTURAL = bytes(set(range(256)) - set(b'"[]{}'))
+
+_decoder = json.JSONDecoder()
+
+
+def _scan(data: bytes, in_string: bool) -> Tuple[int, bool]:
+    """Measure how a run of JSON text changes the nesting depth.
+
+    Works on whole runs with bytes methods instead of walking characters: escape
+    sequences are dropped, everything but quotes and brackets is deleted, and
+    brackets are only counted in the pieces that lie outside strings.
+
+    Args:
+        data (bytes): The JSON text. Must not end in the middle of an escape sequence.
+        in_string (bool): Whether data starts inside a string.
+
+    Returns:
+        Tuple[int, bool]: The depth change and whether data ends inside a string.
+    """
+    if b"\\" in data:
+        data = data.replace(b"\\\\", b"").replace(b'\\"', b"")
+    # Adjacent quotes enclose (or separate) bracket-free text; dropping them in
+    # pairs keeps the inside/outside alternation intact
+    data = data.translate(None, _NOT_STRUCTURAL).replace(b'""', b"")
+    parts = data.split(b'"')
+    outside = b"".join(parts[1::2] if in_string else parts[0::2])
+    delta = outside.count(b"{") + outside.count(b"[") - outside.count(b"}") - outside.count(b"]")
+    # An odd number of quotes leaves us on the other side of a string boundary
+    return delta, in_string != (len(parts) % 2 == 0)
+
+
+def extract_stats(chunks: Iterable[bytes]) -> Optional[Dict[str, int]]:
+    """Pull the base stats out of a /pokemon/{name} body without parsing the rest of it.
+
+    The body is scanned chunk by chunk for the top-level "stats" array, tracking
+    the nesting depth so that the "stats" arrays nested under "past_stats" are
+    skipped. Only that array is decoded, so the moves, sprites and game indices
+    that make up most of the document are never turned into Python objects or
+    held in memory at once. Iteration stops as soon as the array is complete,
+    leaving the rest of the chunks unread.
+
+    Args:
+        chunks (Iterable[bytes]): The response body, e.g. response.iter_content().
+
+    Returns:
+        Optional[Dict[str, int]]: stat name -> base stat, or None if the body has no stats array.
+    """
+    pending = b""
+    buffer = None
+    depth = 0
+    in_string = False
+
+    for chunk in chunks:
+        if buffer is not None:
+            buffer += chunk
+        else:
+            data = pending + chunk
+            scanned = 0
+            for match in _STATS_KEY.finditer(data):
+                if match.start() > 0 and data[match.start() - 1] == _BACKSLASH:
+                    continue
+                delta, in_string = _scan(data[scanned:match.start()], in_string)
+                depth += delta
+                scanned = match.start()
+                if not in_string and depth == 1:
+                    # Keep only the text from the array's opening bracket on
+                    buffer = bytearray(data[match.end() - 1:])
+                    break
+
+            if buffer is None:
+                cut = max(scanned, len(data) - _TAIL)
+                while cut > scanned and data[cut - 1] == _BACKSLASH:
+                    cut -= 1
+                delta, in_string = _scan(data[scanned:cut], in_string)
+                depth += delta
+                pending = data[cut:]
+                continue
+
+        if b"]" not in buffer:
+            continue
+
+        try:
+            # A multi-byte character split at the end of the buffer lies past the array
+            stats, _ = _decoder.raw_decode(buffer.decode("utf-8", errors="replace"))
+        except json.JSONDecodeError:
+            continue
+
+        return {entry["stat"]["name"]: entry["base_stat"] for entry in stats}
+
+    logger.error("No stats array found in PokéAPI response")
+    return None
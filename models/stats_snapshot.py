@@ -0,0 +1,187 @@
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from typing import Iterable, Optional
+
+from models.logger import configure_logger
+from models.settings import setting
+from models.stat_cache import PokemonStats
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+MAGIC = b"PKSNAP\x00\x00"
+VERSION = 1
+NAME_SIZE = 32
+
+# magic, version, record size, record count, padding up to a 32-byte header
+_HEADER = struct.Struct("<8sHHI16x")
+# name (UTF-8, NUL-padded), id, attack, defense
+_RECORD = struct.Struct(f"<{NAME_SIZE}sIdd")
+
+
+def _encode_name(name: str) -> bytes:
+    encoded = name.encode("utf-8")
+    if len(encoded) > NAME_SIZE:
+        raise ValueError(f"Name '{name}' is longer than {NAME_SIZE} bytes")
+    return encoded.ljust(NAME_SIZE, b"\x00")
+
+
+def write_snapshot(path: str, records: Iterable[PokemonStats]) -> int:
+    """Write a stats snapshot file.
+
+    Records are sorted by name so readers can binary search them. The file is
+    written next to its destination and moved into place atomically, so
+    processes that still map the previous version keep reading a consistent file.
+
+    Args:
+        path (str): Destination file.
+        records (Iterable[PokemonStats]): The stats to store. Names longer than 32 bytes are skipped.
+
+    Returns:
+        int: The number of records written.
+    """
+    encoded = {}
+    for record in records:
+        try:
+            key = _encode_name(record.name)
+        except ValueError as e:
+            logger.warning(f"Skipping snapshot record: {e}")
+            continue
+        encoded[key] = _RECORD.pack(key, record.id, record.attack, record.defense)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, _RECORD.size, len(encoded)))
+            for key in sorted(encoded):
+                f.write(encoded[key])
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    logger.info(f"Wrote stats snapshot with {len(encoded)} pokemons to {path}")
+    return len(encoded)
+
+
+class StatsSnapshot:
+    """
+        Read-only, memory-mapped view of a stats snapshot file.
+
+        The mapping is shared through the page cache, so every worker process that
+        opens the same file reads the same physical pages.
+    """
+
+    def __init__(self, path: str):
+        """
+            Maps a snapshot file.
+
+            Args:
+                path (str): The snapshot file.
+
+            Raises:
+                ValueError: If the file is not a snapshot or has an unsupported version.
+                OSError: If the file can't be opened.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < _HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is too short to be a stats snapshot")
+        magic, version, record_size, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a stats snapshot")
+        if version != VERSION or record_size != _RECORD.size:
+            self.close()
+            raise ValueError(f"{path} has unsupported snapshot version {version}")
+        if len(self._mmap) < _HEADER.size + count * record_size:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _name_at(self, index: int) -> bytes:
+        offset = _HEADER.size + index * _RECORD.size
+        return self._mmap[offset:offset + NAME_SIZE]
+
+    def lookup(self, name: str) -> Optional[PokemonStats]:
+        """
+            Finds a pokemon's stats by binary search over the sorted records.
+
+            Args:
+                name (str): The pokemon name, as stored.
+
+            Returns:
+                Optional[PokemonStats]: The stats, or None if the snapshot doesn't have the name.
+        """
+        try:
+            key = _encode_name(name)
+        except ValueError:
+            return None
+
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == self.count or self._name_at(low) != key:
+            return None
+
+        _, pokemon_id, attack, defense = _RECORD.unpack_from(self._mmap, _HEADER.size + low * _RECORD.size)
+        return PokemonStats(id=pokemon_id, name=name, attack=attack, defense=defense)
+
+    def close(self):
+        """Unmaps the file."""
+        self._mmap.close()
+
+
+_snapshot: Optional[StatsSnapshot] = None
+
+
+def configure_snapshot(config=None) -> Optional[StatsSnapshot]:
+    """
+    Open the snapshot named by STATS_SNAPSHOT_PATH, if there is one, and close the one it replaces.
+
+    Args:
+        config (Mapping): Usually the Flask app.config. Falls back to the
+            STATS_SNAPSHOT_PATH environment variable.
+
+    Returns:
+        Optional[StatsSnapshot]: The shared snapshot, or None if none is configured or it can't be read.
+    """
+    global _snapshot
+    path = setting(config, "STATS_SNAPSHOT_PATH", None, str)
+
+    snapshot = None
+    if path:
+        try:
+            snapshot = StatsSnapshot(path)
+            logger.info(f"Loaded stats snapshot {path} with {len(snapshot)} pokemons")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Not using stats snapshot {path}: {e}")
+
+    previous, _snapshot = _snapshot, snapshot
+    if previous is not None:
+        previous.close()
+    return snapshot
+
+
+def lookup_snapshot(name: str) -> Optional[PokemonStats]:
+    """Look a name up in the shared snapshot, if one is loaded."""
+    snapshot = _snapshot
+    if snapshot is None:
+        return None
+    return snapshot.lookup(name)
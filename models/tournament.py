@@ -0,0 +1,94 @@
+import logging
+from concurrent.futures import Executor
+from typing import Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from models.battle_engine import win_probabilities
+from models.logger import configure_logger
+from models.pokemon_battle_model import Combatant
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class Match(NamedTuple):
+    """One bracket match; pokemon_1 is the higher-placed entrant and enters the ring first."""
+
+    pokemon_1: Combatant
+    pokemon_2: Combatant
+    winner: Combatant
+
+
+class TournamentRound(NamedTuple):
+    """Every match of one bracket round, in bracket order."""
+
+    round: int
+    matches: List[Match]
+
+
+def _fight_chunk(skill_1: np.ndarray, skill_2: np.ndarray, seed: np.random.SeedSequence) -> np.ndarray:
+    """Decide one chunk of matches on its own stream; True where the first combatant won."""
+    probabilities = win_probabilities(skill_1, skill_2)
+    return np.random.default_rng(seed).random(probabilities.shape) < probabilities
+
+
+def run_tournament(combatants: Sequence[Combatant], seed: Optional[int] = None, chunk_size: int = 1024,
+                   executor: Optional[Executor] = None,
+                   parallel_threshold: int = 65536) -> Iterator[TournamentRound]:
+    """Play a single-elimination bracket lazily, one round per item consumed.
+
+    Entrants are paired in bracket order, 1 v 2, 3 v 4 and so on, and winners
+    meet in the same order the next round. Matches follow the BattleModel rules.
+    A round's matches are split into chunks of `chunk_size`, each with its own
+    stream spawned from one SeedSequence, so a seeded bracket plays out the same
+    however the chunks are scheduled. Only rounds of at least
+    `parallel_threshold` matches run their chunks on `executor` in parallel:
+    for smaller ones, pickling the chunks to a process pool costs far more
+    than the vectorized draws, so they run inline.
+
+    Args:
+        combatants (Sequence[Combatant]): The entrants, 2^k of them, in seeding order.
+        seed (int): Seed for a reproducible bracket.
+        chunk_size (int): Matches per task.
+        executor (Executor): Where large rounds run, e.g. the shared process pool. None runs every round inline.
+        parallel_threshold (int): Fewest matches in a round for it to use the executor.
+
+    Returns:
+        Iterator[TournamentRound]: Each round, first to final, computed as it is consumed.
+
+    Raises:
+        ValueError: If the number of entrants is not a power of two of at least 2.
+    """
+    count = len(combatants)
+    if count < 2 or count & (count - 1):
+        raise ValueError("A tournament needs a power of two of entrants, at least 2")
+    # Validated here rather than in the generator, so a bad bracket fails before anything is streamed
+    return _play(list(combatants), np.random.SeedSequence(seed), chunk_size, executor, parallel_threshold)
+
+
+def _play(field: List[Combatant], seeds: np.random.SeedSequence, chunk_size: int,
+          executor: Optional[Executor], parallel_threshold: int) -> Iterator[TournamentRound]:
+    number = 0
+    while len(field) > 1:
+        number += 1
+        firsts, seconds = field[0::2], field[1::2]
+        skill_1 = np.fromiter((c.skill for c in firsts), dtype=np.float64, count=len(firsts))
+        skill_2 = np.fromiter((c.skill for c in seconds), dtype=np.float64, count=len(seconds))
+
+        starts = range(0, len(firsts), chunk_size)
+        streams = seeds.spawn(len(starts))
+        chunks = [(skill_1[start:start + chunk_size], skill_2[start:start + chunk_size], stream)
+                  for start, stream in zip(starts, streams)]
+        if executor is None or len(chunks) == 1 or len(firsts) < parallel_threshold:
+            results = [_fight_chunk(*chunk) for chunk in chunks]
+        else:
+            futures = [executor.submit(_fight_chunk, *chunk) for chunk in chunks]
+            results = [future.result() for future in futures]
+        first_won = np.concatenate(results).tolist()
+
+        matches = [Match(first, second, first if won else second)
+                   for first, second, won in zip(firsts, seconds, first_won)]
+        field = [match.winner for match in matches]
+        logger.info(f"Tournament round {number}: {len(matches)} matches")
+        yield TournamentRound(number, matches)
@@ -0,0 +1,213 @@
+import logging
+import threading
+import uuid
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from models.battle_engine import get_pokemon_skills, win_probabilities
+from models.logger import configure_logger
+from models.stat_cache import PokemonStats
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class WinMatrix:
+    """
+        The N×N matrix of win probabilities between every pair of stored pokemons.
+
+        matrix[i, j] is the probability that pokemon i wins when it enters the ring
+        first against pokemon j, as computed by BattleModel.battle. The matrix is
+        built in one vectorized pass and then kept current one row and column at a
+        time as single pokemons are created, updated or deleted.
+
+        The matrix is per-process: it only sees the changes made through this
+        process, so with several worker processes each one serves its own copy,
+        and rows changed by another worker stay stale until this one rebuilds
+        after its own invalidate().
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[PokemonStats]]):
+        """
+            Initializes an empty matrix that is built on first use.
+
+            Args:
+                loader (Callable): Returns the stats of every stored pokemon, e.g. Pokemons.all_stats.
+
+            Attributes:
+                version (int): Bumped on every change, together with a per-process token it identifies the contents.
+                rebuilds (int): Number of full builds.
+                updates (int): Number of single-row updates.
+        """
+        self.loader = loader
+        self.token = uuid.uuid4().hex
+        self.version = 0
+        self.rebuilds = 0
+        self.updates = 0
+        self._built = False
+        self._count = 0
+        self._ids = np.empty(0, dtype=np.int64)
+        self._names: List[Optional[str]] = []
+        self._skills = np.empty(0, dtype=np.float64)
+        self._matrix = np.empty((0, 0), dtype=np.float64)
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def _build(self):
+        # Caller holds the lock
+        records = list(self.loader())
+        count = len(records)
+        capacity = max(16, count)
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._skills = np.empty(capacity, dtype=np.float64)
+        self._matrix = np.empty((capacity, capacity), dtype=np.float64)
+        self._names = [None] * capacity
+        self._positions = {}
+        for position, record in enumerate(records):
+            self._ids[position] = record.id
+            self._skills[position] = record.attack + record.defense
+            self._names[position] = record.name
+            self._positions[record.id] = position
+        skills = self._skills[:count]
+        self._matrix[:count, :count] = win_probabilities(skills[:, None], skills[None, :])
+        self._count = count
+        self._built = True
+        self.rebuilds += 1
+        self.version += 1
+        logger.info(f"Built win-probability matrix for {count} pokemons")
+
+    def _grow(self):
+        # Caller holds the lock; doubles the capacity so appends stay amortized O(N)
+        capacity = len(self._ids) * 2
+        count = self._count
+        ids = np.empty(capacity, dtype=np.int64)
+        skills = np.empty(capacity, dtype=np.float64)
+        matrix = np.empty((capacity, capacity), dtype=np.float64)
+        ids[:count] = self._ids[:count]
+        skills[:count] = self._skills[:count]
+        matrix[:count, :count] = self._matrix[:count, :count]
+        self._ids, self._skills, self._matrix = ids, skills, matrix
+        self._names.extend([None] * (capacity - len(self._names)))
+
+    def _refresh(self, position: int):
+        # Caller holds the lock; recomputes one row and one column
+        count = self._count
+        skills = self._skills[:count]
+        skill = self._skills[position]
+        self._matrix[position, :count] = win_probabilities(skill, skills)
+        self._matrix[:count, position] = win_probabilities(skills, skill)
+
+    def upsert(self, stats: PokemonStats):
+        """
+            Adds a pokemon or refreshes its stats, recomputing only its row and column.
+
+            Args:
+                stats (PokemonStats): The pokemon's current stats.
+        """
+        with self._lock:
+            if not self._built:
+                return
+            position = self._positions.get(stats.id)
+            if position is None:
+                if self._count == len(self._ids):
+                    self._grow()
+                position = self._count
+                self._count += 1
+                self._positions[stats.id] = position
+                self._ids[position] = stats.id
+            self._names[position] = stats.name
+            self._skills[position] = get_pokemon_skills(stats.attack, stats.defense)
+            self._refresh(position)
+            self.updates += 1
+            self.version += 1
+
+    def remove(self, pokemon_id: int):
+        """
+            Drops a pokemon by moving the last row and column into its slot.
+
+            Args:
+                pokemon_id (int): The ID of the deleted pokemon.
+        """
+        with self._lock:
+            if not self._built:
+                return
+            position = self._positions.pop(pokemon_id, None)
+            if position is None:
+                return
+            last = self._count - 1
+            if position != last:
+                self._ids[position] = self._ids[last]
+                self._skills[position] = self._skills[last]
+                self._names[position] = self._names[last]
+                self._matrix[position, :last + 1] = self._matrix[last, :last + 1]
+                self._matrix[:last + 1, position] = self._matrix[:last + 1, last]
+                self._matrix[position, position] = self._matrix[last, last]
+                self._positions[int(self._ids[position])] = position
+            self._names[last] = None
+            self._count = last
+            self.updates += 1
+            self.version += 1
+
+    def invalidate(self):
+        """Forgets the matrix so the next read rebuilds it, e.g. after a bulk upsert."""
+        with self._lock:
+            self._built = False
+            self.version += 1
+
+    def snapshot(self) -> Tuple[List[int], List[str], np.ndarray]:
+        """
+            Returns the current matrix, ordered by pokemon ID.
+
+            Returns:
+                Tuple[List[int], List[str], np.ndarray]: The IDs, names and a copy of the matrix.
+        """
+        with self._lock:
+            if not self._built:
+                self._build()
+            count = self._count
+            order = np.argsort(self._ids[:count], kind="stable")
+            ids = self._ids[order].tolist()
+            names = [self._names[position] for position in order]
+            matrix = self._matrix[np.ix_(order, order)]
+        return ids, names, matrix
+
+    def etag_parts(self) -> Tuple[str, int]:
+        """Returns the values that identify the matrix contents, for make_etag, building it if needed."""
+        with self._lock:
+            if not self._built:
+                self._build()
+            return self.token, self.version
+
+    def stats(self) -> dict:
+        """Returns the matrix size and update counters."""
+        with self._lock:
+            return {
+                "built": self._built,
+                "size": self._count,
+                "rebuilds": self.rebuilds,
+                "updates": self.updates,
+            }
+
+
+_win_matrix = WinMatrix(lambda: [])
+
+
+def configure_win_matrix(loader: Callable[[], Iterable[PokemonStats]]) -> WinMatrix:
+    """
+    Replace the shared win matrix with an empty one that loads from `loader`.
+
+    Args:
+        loader (Callable): Returns the stats of every stored pokemon.
+
+    Returns:
+        WinMatrix: The new shared matrix.
+    """
+    global _win_matrix
+    _win_matrix = WinMatrix(loader)
+    return _win_matrix
+
+
+def get_win_matrix() -> WinMatrix:
+    """Return the shared win matrix."""
+    return _win_matrix
@@ -3,6 +3,8 @@ import pytest
 from app import create_app
 from config import TestConfig
 from db import db
+from models.pokeapi_client import configure_client
+from tests.pokeapi_stub import PokeAPIStub
 
 @pytest.fixture
 def app():
@@ -20,4 +22,21 @@ def client(app):
 @pytest.fixture
 def session(app):
     with app.app_context():
-        yield db.session
\ No newline at end of file
+        yield db.session
+
+@pytest.fixture
+def pokeapi_stub(app):
+    """Start a local stand-in for PokéAPI and point the shared client at it."""
+    stub = PokeAPIStub().start()
+    app.config["POKEAPI_BASE_URL"] = stub.base_url
+    app.config["POKEAPI_MAX_RETRIES"] = 0
+    configure_client(app.config)
+    yield stub
+    stub.stop()
+
+@pytest.fixture
+def auth_client(client):
+    """A test client logged in as a freshly created user."""
+    client.put("/api/create-user", json={"username": "trainer", "password": "secret"})
+    client.post("/api/login", json={"username": "trainer", "password": "secret"})
+    return client
@@ -0,0 +1,171 @@
+"""A small local stand-in for PokéAPI used by the tests and benchmarks."""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_POKEMONS = {
+    "bulbasaur": (1, 49, 49),
+    "charmander": (4, 52, 43),
+    "squirtle": (7, 48, 65),
+    "pikachu": (25, 55, 40),
+    "staryu": (120, 45, 55),
+}
+
+
+def make_pokemon_payload(pokemon_id, name, attack, defense, moves=0):
+    """Build a /pokemon/{name} document shaped like the real one.
+
+    Args:
+        moves (int): Number of filler move entries, to mimic the size of real payloads.
+    """
+    return {
+        "abilities": [],
+        "base_experience": 112,
+        "id": pokemon_id,
+        "moves": [
+            {
+                "move": {"name": f"move-{i}", "url": f"https://pokeapi.co/api/v2/move/{i}/"},
+                "version_group_details": [
+                    {
+                        "level_learned_at": i % 50,
+                        "move_learn_method": {"name": "level-up", "url": "https://pokeapi.co/api/v2/move-learn-method/1/"},
+                        "version_group": {"name": "red-blue", "url": "https://pokeapi.co/api/v2/version-group/1/"},
+                    }
+                ],
+            }
+            for i in range(moves)
+        ],
+        "name": name,
+        "past_stats": [],
+        "species": {"name": name, "url": f"https://pokeapi.co/api/v2/pokemon-species/{pokemon_id}/"},
+        "stats": [
+            {"base_stat": 35, "effort": 0, "stat": {"name": "hp", "url": "https://pokeapi.co/api/v2/stat/1/"}},
+            {"base_stat": attack, "effort": 0, "stat": {"name": "attack", "url": "https://pokeapi.co/api/v2/stat/2/"}},
+            {"base_stat": defense, "effort": 0, "stat": {"name": "defense", "url": "https://pokeapi.co/api/v2/stat/3/"}},
+            {"base_stat": 90, "effort": 2, "stat": {"name": "speed", "url": "https://pokeapi.co/api/v2/stat/6/"}},
+        ],
+        "types": [{"slot": 1, "type": {"name": "normal", "url": "https://pokeapi.co/api/v2/type/1/"}}],
+        "weight": 60,
+    }
+
+
+class PokeAPIStub:
+    """Serves /pokemon/{name|id} and /pokemon-species from an in-memory table.
+
+    Attributes:
+        pokemons (dict): name -> (id, attack, defense).
+        hits (Counter): Number of requests received per path.
+        connections (int): Number of TCP connections accepted.
+        connect_delay (float): Seconds slept on every new connection, to stand in
+            for the handshake cost of a real TLS endpoint.
+        response_delay (float): Seconds slept before answering each request.
+    """
+
+    def __init__(self, pokemons=None, moves=0, connect_delay=0.0, response_delay=0.0):
+        self.pokemons = dict(DEFAULT_POKEMONS if pokemons is None else pokemons)
+        self.moves = moves
+        self.connect_delay = connect_delay
+        self.response_delay = response_delay
+        self.hits = Counter()
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v2"
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            wbufsize = 1 << 16
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                if stub.connect_delay:
+                    time.sleep(stub.connect_delay)
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                status, body = stub.handle(self.path)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def handle(self, raw_path):
+        url = urlparse(raw_path)
+        parts = [part for part in url.path.split("/") if part]
+        with self._lock:
+            self.hits[url.path.rstrip("/")] += 1
+        if self.response_delay:
+            time.sleep(self.response_delay)
+
+        if parts[:2] != ["api", "v2"] or len(parts) < 3:
+            return 404, {"detail": "Not found."}
+
+        if parts[2] == "pokemon-species" and len(parts) == 3:
+            return 200, self._species_page(parse_qs(url.query))
+
+        if parts[2] == "pokemon" and len(parts) == 4:
+            found = self._lookup(parts[3])
+            if found is None:
+                return 404, {"detail": "Not found."}
+            name, (pokemon_id, attack, defense) = found
+            return 200, make_pokemon_payload(pokemon_id, name, attack, defense, self.moves)
+
+        return 404, {"detail": "Not found."}
+
+    def _lookup(self, key):
+        key = key.lower()
+        if key in self.pokemons:
+            return key, self.pokemons[key]
+        for name, row in self.pokemons.items():
+            if str(row[0]) == key:
+                return name, row
+        return None
+
+    def _species_page(self, query):
+        limit = int(query.get("limit", ["20"])[0])
+        offset = int(query.get("offset", ["0"])[0])
+        rows = sorted(self.pokemons.items(), key=lambda item: item[1][0])
+        page = rows[offset:offset + limit]
+        next_url = None
+        if offset + limit < len(rows):
+            next_url = f"{self.base_url}/pokemon-species/?offset={offset + limit}&limit={limit}"
+        return {
+            "count": len(rows),
+            "next": next_url,
+            "previous": None,
+            "results": [
+                {"name": name, "url": f"{self.base_url}/pokemon-species/{row[0]}/"}
+                for name, row in page
+            ],
+        }
@@ -0,0 +1,33 @@
+import time
+
+import pytest
+from flask import has_app_context
+
+from models.api_utils import get_attack_and_defense, get_attack_and_defense_many
+from models.pokeapi_client import DeadlineExceededError, get_deadline, run_with_deadline, set_deadline
+
+##########################################################
+# Fetching
+##########################################################
+
+def test_get_attack_and_defense(pokeapi_stub):
+    """Test extracting attack and defense from the fetched document."""
+    assert get_attack_and_defense("pikachu") == [55, 40]
+
+def test_get_attack_and_defense_many_keeps_deadline(pokeapi_stub):
+    """Test that pool workers inherit the caller's upstream deadline and an expired one fails the batch."""
+    set_deadline(0.001)
+    time.sleep(0.01)
+    try:
+        with pytest.raises(DeadlineExceededError):
+            get_attack_and_defense_many(["pikachu", "staryu"])
+    finally:
+        set_deadline(None)
+
+    assert pokeapi_stub.hits["/api/v2/pokemon/pikachu"] == 0
+
+def test_run_with_deadline_carries_only_the_deadline(app):
+    """Test that a pool worker's context has the caller's deadline but no app context."""
+    with app.app_context():
+        assert run_with_deadline(123.0, lambda: (get_deadline(), has_app_context())) == (123.0, False)
+        assert get_deadline() is None
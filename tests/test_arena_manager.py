@@ -0,0 +1,137 @@
+import threading
+
+from models.arena_manager import ArenaManager
+from models.battlefield_store import InMemoryBattlefieldStore
+from models.pokemon_model import Pokemons
+from models.stat_cache import PokemonStats
+
+
+def test_arenas_are_keyed():
+    """Test that each key gets its own battle model and keeps it."""
+    manager = ArenaManager(stripes=4)
+
+    with manager.arena("user:ash") as first:
+        first.battlefield.append(PokemonStats(id=25, name="pikachu", attack=55.0, defense=40.0))
+    with manager.arena("user:misty") as other:
+        assert other is not first
+        assert other.battlefield == []
+    with manager.arena("user:ash") as again:
+        assert again is first
+
+    assert manager.stats()["arenas"] == 2
+    assert manager.stats()["created"] == 2
+
+def test_idle_arenas_are_evicted():
+    """Test that arenas idle for longer than the TTL are dropped."""
+    manager = ArenaManager(stripes=1, ttl=0.0)
+    with manager.arena("user:ash") as first:
+        pass
+
+    with manager.arena("user:ash") as second:
+        assert second is not first
+    assert manager.sweep() == 1
+    assert len(manager) == 0
+
+def test_least_recently_used_arena_is_evicted():
+    """Test that maxsize bounds the number of arenas."""
+    manager = ArenaManager(stripes=1, maxsize=2)
+    for key in ("a", "b", "a", "c"):
+        with manager.arena(key):
+            pass
+
+    assert len(manager) == 2
+    assert manager.stats()["evicted"] == 1
+    with manager.arena("a"):
+        assert manager.stats()["created"] == 3
+
+def test_concurrent_arenas_do_not_interfere():
+    """Test that threads working on their own arenas never see each other's pokemons."""
+    manager = ArenaManager(stripes=4)
+    errors = []
+
+    def fill(user):
+        stats = PokemonStats(id=1, name=user, attack=1.0, defense=1.0)
+        for _ in range(200):
+            with manager.arena(f"user:{user}") as arena:
+                arena.battlefield.append(stats)
+                if [p.name for p in arena.battlefield] != [user]:
+                    errors.append(user)
+                arena.battlefield.clear()
+
+    threads = [threading.Thread(target=fill, args=(f"user-{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(manager) == 8
+
+def test_users_battle_in_separate_arenas(app, auth_client, session):
+    """Test that two logged-in users each fill their own ring, and can share an explicit arena."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    Pokemons.create_pokemon("staryu", attack=45.0, defense=55.0)
+
+    other_client = app.test_client()
+    other_client.put("/api/create-user", json={"username": "rival", "password": "secret"})
+    other_client.post("/api/login", json={"username": "rival", "password": "secret"})
+
+    def call(client, method, url, **kwargs):
+        # The fixture's app context would otherwise share Flask-Login's current user across requests
+        with app.app_context():
+            return getattr(client, method)(url, **kwargs)
+
+    for client in (auth_client, other_client):
+        assert call(client, "post", "/api/enter-ring", json={"name": "pikachu"}).status_code == 200
+    assert call(auth_client, "get", "/api/battle").status_code == 400
+
+    assert call(auth_client, "post", "/api/enter-ring", json={"name": "staryu"}).status_code == 200
+    assert call(auth_client, "get", "/api/battle").get_json()["winner"] in ("pikachu", "staryu")
+    assert call(auth_client, "get", "/api/battle").status_code == 400
+
+    response = call(auth_client, "post", "/api/arenas", json={"members": ["rival"]})
+    assert response.status_code == 201
+    assert response.get_json()["members"] == ["rival", "trainer"]
+    finals = response.get_json()["arena"]
+
+    assert call(auth_client, "post", "/api/enter-ring", json={"name": "pikachu", "arena": finals}).status_code == 200
+    assert call(other_client, "post", "/api/enter-ring", json={"name": "staryu", "arena": finals}).status_code == 200
+    assert call(other_client, "get", "/api/battle", query_string={"arena": finals}).status_code == 200
+
+def test_explicit_arenas_are_members_only(app, auth_client, session):
+    """Test that only an arena's members can enter or battle in it, and that arena IDs can't be made up."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    finals = auth_client.post("/api/arenas", json={"members": []}).get_json()["arena"]
+
+    outsider = app.test_client()
+    outsider.put("/api/create-user", json={"username": "outsider", "password": "secret"})
+    outsider.post("/api/login", json={"username": "outsider", "password": "secret"})
+
+    def call(client, method, url, **kwargs):
+        with app.app_context():
+            return getattr(client, method)(url, **kwargs)
+
+    assert call(outsider, "post", "/api/enter-ring", json={"name": "pikachu", "arena": finals}).status_code == 403
+    assert call(outsider, "get", "/api/battle", query_string={"arena": finals}).status_code == 403
+    assert call(auth_client, "post", "/api/enter-ring", json={"name": "pikachu", "arena": "finals"}).status_code == 403
+    assert call(auth_client, "post", "/api/arenas", json={"members": "rival"}).status_code == 400
+
+def test_entering_looks_up_stats_outside_the_arena_lock(app, session, mocker):
+    """Test that the in-memory store resolves a pokemon before locking its arena."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    pokemon = Pokemons.get_pokemon_by_name("pikachu")
+    manager = ArenaManager(stripes=1)
+    mocker.patch("models.battlefield_store.get_arena_manager", return_value=manager)
+    locked_during_lookup = []
+    lookup = Pokemons.get_stats_by_id
+
+    def get_stats_by_id(pokemon_id):
+        locked_during_lookup.append(manager._stripes[0].lock.locked())
+        return lookup(pokemon_id)
+
+    mocker.patch.object(Pokemons, "get_stats_by_id", side_effect=get_stats_by_id)
+    InMemoryBattlefieldStore().enter("user:ash", pokemon.id, entrant="ash")
+
+    assert locked_during_lookup == [False]
+    with manager.arena("user:ash") as arena:
+        assert [combatant.name for combatant in arena.battlefield] == ["pikachu"]
@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+import pytest
+
+from models.battle_engine import get_pokemon_skills, simulate_battles, simulate_matchups, win_probabilities
+from models.pokemon_model import Pokemons
+from models.stat_cache import PokemonStats
+
+PIKACHU = PokemonStats(id=25, name="pikachu", attack=55.0, defense=40.0)
+STARYU = PokemonStats(id=120, name="staryu", attack=45.0, defense=55.0)
+
+##########################################################
+# Engine
+##########################################################
+
+def test_win_probabilities_match_battle_model():
+    """Test that the vectorized math agrees with the formula in BattleModel.battle."""
+    skills_1 = get_pokemon_skills([55.0, 10.0, 30.0], [40.0, 5.0, 30.0])
+    skills_2 = get_pokemon_skills([45.0, 12.0, 30.0], [55.0, 4.0, 30.0])
+
+    expected = [1 / (1 + math.e ** (-abs(s1 - s2))) for s1, s2 in zip(skills_1, skills_2)]
+
+    np.testing.assert_allclose(win_probabilities(skills_1, skills_2), expected)
+
+def test_simulate_battles_is_reproducible():
+    """Test that the same seed gives the same win vector."""
+    stats = np.array([55.0, 40.0, 45.0, 55.0])
+    first = simulate_battles(*stats[:, None].repeat(1000, axis=1), rng=np.random.default_rng(7))
+    second = simulate_battles(*stats[:, None].repeat(1000, axis=1), rng=np.random.default_rng(7))
+
+    assert first.dtype == bool
+    assert first.shape == (1000,)
+    np.testing.assert_array_equal(first, second)
+
+def test_simulate_matchups_win_rates():
+    """Test that win counts converge on the win probability."""
+    wins = simulate_matchups([(PIKACHU, STARYU), (PIKACHU, PIKACHU)], 100_000, rng=np.random.default_rng(1))
+
+    # Skills 95 and 100 are 5 apart, giving the first combatant 1/(1+e^-5); the mirror match is 1/2
+    assert wins[0] / 100_000 == pytest.approx(1 / (1 + math.e ** -5), abs=0.01)
+    assert wins[1] / 100_000 == pytest.approx(0.5, abs=0.01)
+
+def test_simulate_matchups_invalid_fights():
+    """Test that a non-positive fight count is rejected."""
+    with pytest.raises(ValueError, match="fights must be a positive integer"):
+        simulate_matchups([(PIKACHU, STARYU)], 0)
+
+##########################################################
+# Route
+##########################################################
+
+def test_simulate_route(auth_client, session):
+    """Test simulating matchups through the API."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    Pokemons.create_pokemon("staryu", attack=45.0, defense=55.0)
+
+    body = {"matchups": [["Pikachu", "staryu"]], "fights": 500, "seed": 3}
+    response = auth_client.post("/api/battle/simulate", json=body)
+
+    assert response.status_code == 200
+    result = response.get_json()["results"][0]
+    assert result["pokemon_1"] == "pikachu"
+    assert result["wins_1"] + result["wins_2"] == 500
+    assert auth_client.post("/api/battle/simulate", json=body).get_json()["results"][0] == result
+
+def test_simulate_route_validation(auth_client, session):
+    """Test the simulate endpoint's error responses."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+
+    response = auth_client.post("/api/battle/simulate", json={"matchups": [["pikachu"]]})
+    assert response.status_code == 400
+
+    response = auth_client.post("/api/battle/simulate", json={"matchups": [["pikachu", "pikachu"]], "fights": 10**7})
+    assert response.status_code == 400
+
+    response = auth_client.post("/api/battle/simulate", json={"matchups": [["pikachu", "missingno"]]})
+    assert response.status_code == 404
@@ -0,0 +1,82 @@
+import time
+
+from models.battle_history import BattleRecorder, Battles
+from models.pokemon_battle_model import BattleResult
+from models.pokemon_model import Pokemons
+
+
+def make_result(draw=0.5):
+    return BattleResult(pokemon_1_id=1, pokemon_1_name="pikachu", pokemon_2_id=2, pokemon_2_name="staryu",
+                        skill_1=95.0, skill_2=100.0, draw=draw, winner_id=1, winner_name="pikachu",
+                        fought_at=time.time())
+
+def test_synchronous_recorder(app, session):
+    """Test that synchronous mode writes each result before record returns."""
+    recorder = BattleRecorder(app, synchronous=True)
+
+    assert recorder.record(make_result(), username="ash") is True
+
+    row = Battles.query.one()
+    assert (row.winner_name, row.username, row.draw) == ("pikachu", "ash", 0.5)
+    assert recorder.stats()["written"] == 1
+
+def test_writes_are_batched(app, session):
+    """Test that queued results are written together by flush."""
+    recorder = BattleRecorder(app, batch_size=4, flush_interval=60)
+    recorder._ensure_writer = lambda: None  # keep the test in control of when rows are written
+
+    for i in range(10):
+        recorder.record(make_result(draw=i / 10))
+    assert Battles.query.count() == 0
+
+    recorder.flush()
+
+    assert Battles.query.count() == 10
+    assert recorder.stats()["batches"] == 3
+    assert recorder.stats()["high_water"] == 10
+
+def test_background_writer(app, session):
+    """Test that the writer thread drains the queue on its own."""
+    recorder = BattleRecorder(app, flush_interval=0.01)
+    recorder.record(make_result())
+
+    deadline = time.monotonic() + 5
+    while recorder.stats()["written"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    recorder.close()
+
+    assert recorder.stats()["written"] == 1
+    assert Battles.query.count() == 1
+
+def test_full_queue_drops(app):
+    """Test that a full queue drops results and counts them."""
+    recorder = BattleRecorder(app, maxsize=2)
+    recorder._ensure_writer = lambda: None
+
+    assert [recorder.record(make_result()) for _ in range(3)] == [True, True, False]
+    assert recorder.stats()["dropped"] == 1
+
+def test_full_queue_backpressure(app):
+    """Test that with a block timeout, record waits for room before giving up."""
+    recorder = BattleRecorder(app, maxsize=1, block_timeout=0.05)
+    recorder._ensure_writer = lambda: None
+    recorder.record(make_result())
+
+    started = time.monotonic()
+    assert recorder.record(make_result()) is False
+    assert time.monotonic() - started >= 0.05
+    assert recorder.stats()["blocked"] == 1
+
+def test_battle_route_records_history(auth_client, session):
+    """Test that /api/battle stores the fight with its user."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    Pokemons.create_pokemon("staryu", attack=45.0, defense=55.0)
+    auth_client.post("/api/enter-ring", json={"name": "pikachu"})
+    auth_client.post("/api/enter-ring", json={"name": "staryu"})
+
+    response = auth_client.get("/api/battle")
+
+    row = Battles.query.one()
+    assert row.winner_name == response.get_json()["winner"]
+    assert (row.pokemon_1_name, row.pokemon_2_name, row.username) == ("pikachu", "staryu", "trainer")
+    assert (row.skill_1, row.skill_2) == (95.0, 100.0)
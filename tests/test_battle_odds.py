@@ -0,0 +1,68 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from models.battle_odds import estimate_odds, wilson_interval
+from models.pokemon_model import Pokemons
+from models.stat_cache import PokemonStats
+
+# Skills 95 vs 96: close enough that the outcome is genuinely uncertain
+PIKACHU = PokemonStats(id=25, name="pikachu", attack=55.0, defense=40.0)
+BULBASAUR = PokemonStats(id=1, name="bulbasaur", attack=47.0, defense=49.0)
+EXPECTED = 1 / (1 + math.e ** -1)
+
+
+def test_wilson_interval():
+    """Test the interval against a hand-computed value."""
+    low, high = wilson_interval(50, 100, 0.95)
+    assert low == pytest.approx(0.4038, abs=1e-4)
+    assert high == pytest.approx(0.5962, abs=1e-4)
+
+def test_estimate_is_reproducible_and_covers_truth():
+    """Test that a seeded estimate repeats exactly and its interval covers the exact probability."""
+    odds = estimate_odds(PIKACHU, BULBASAUR, 200_000, chunk_size=50_000, seed=42)
+
+    assert odds == estimate_odds(PIKACHU, BULBASAUR, 200_000, chunk_size=50_000, seed=42)
+    assert odds["trials"] == 200_000
+    assert odds["ci_low"] <= EXPECTED <= odds["ci_high"]
+    assert odds["stopped_early"] is False
+
+def test_estimate_stops_early():
+    """Test that the run stops once the interval is narrow enough."""
+    odds = estimate_odds(PIKACHU, BULBASAUR, 10_000_000, chunk_size=10_000, tolerance=0.01, seed=1)
+
+    assert odds["stopped_early"] is True
+    assert odds["trials"] < 10_000_000
+    assert (odds["ci_high"] - odds["ci_low"]) / 2 <= 0.01
+
+def test_estimate_on_process_pool():
+    """Test that chunks run on a process pool give the same answer as inline."""
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pooled = estimate_odds(PIKACHU, BULBASAUR, 40_000, chunk_size=10_000, seed=7, executor=pool, workers=2)
+
+    assert pooled == estimate_odds(PIKACHU, BULBASAUR, 40_000, chunk_size=10_000, seed=7)
+
+def test_estimate_validation():
+    """Test that bad arguments are rejected."""
+    with pytest.raises(ValueError, match="trials must be a positive integer"):
+        estimate_odds(PIKACHU, BULBASAUR, 0)
+    with pytest.raises(ValueError, match="confidence must be between 0 and 1"):
+        estimate_odds(PIKACHU, BULBASAUR, 10, confidence=1.5)
+
+def test_odds_route(auth_client, session):
+    """Test the odds endpoint."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    Pokemons.create_pokemon("bulbasaur", attack=47.0, defense=49.0)
+
+    response = auth_client.get("/api/battle/odds?p1=pikachu&p2=Bulbasaur&n=50000&seed=3&tolerance=0")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["trials"] == 50_000
+    assert data["pokemon_2"] == "bulbasaur"
+    assert data["ci_low"] <= EXPECTED <= data["ci_high"]
+
+    assert auth_client.get("/api/battle/odds?p1=pikachu").status_code == 400
+    assert auth_client.get("/api/battle/odds?p1=pikachu&p2=bulbasaur&n=0").status_code == 400
+    assert auth_client.get("/api/battle/odds?p1=pikachu&p2=missingno").status_code == 404
@@ -0,0 +1,71 @@
+import math
+
+import pytest
+
+from models.battle_royale import battle_royale
+from models.pokemon_battle_model import BattleModel, Combatant
+from models.pokemon_model import Pokemons
+from models.randomness import BufferedRandomness, SeededRandomness
+from models.stat_cache import PokemonStats
+
+
+def field(skills):
+    return [Combatant.from_stats(PokemonStats(id=i, name=f"p{i}", attack=float(skill), defense=0.0))
+            for i, skill in enumerate(skills, start=1)]
+
+def test_everyone_but_the_winner_is_eliminated_once():
+    """Test the elimination order covers every loser exactly once in ceil(log2 N) rounds."""
+    combatants = field(range(1, 1002))
+    result = battle_royale(combatants, SeededRandomness(0))
+
+    eliminated = [e.pokemon_id for e in result.eliminations]
+    assert len(eliminated) == len(set(eliminated)) == 1000
+    assert result.winner.id not in eliminated
+    assert result.rounds == math.ceil(math.log2(1001))
+    assert [e.round for e in result.eliminations] == sorted(e.round for e in result.eliminations)
+
+def test_pairs_neighbours_in_skill():
+    """Test that each round pairs the closest skills and the strongest gets the bye."""
+    result = battle_royale(field([40, 10, 30, 20, 50]), SeededRandomness(1))
+
+    first_round = [{e.name, e.eliminated_by} for e in result.eliminations if e.round == 1]
+    assert first_round == [{"p2", "p4"}, {"p1", "p3"}]
+
+def test_matches_battle_model_for_two():
+    """Test that a two-way royale is decided exactly like BattleModel.fight with the same draws."""
+    combatants = field([70, 65])
+    for seed in range(20):
+        royale = battle_royale(combatants, SeededRandomness(seed))
+        battle_model = BattleModel(SeededRandomness(seed))
+        battle_model.battlefield.extend(combatants)
+        assert royale.winner.id == battle_model.fight().winner_id
+
+def test_buffered_draws_replay_seeded_event():
+    """Test that a whole-event block of draws decides a royale exactly like the seeded stream."""
+    combatants = field(range(1, 102))
+    buffered = BufferedRandomness(7, block_size=len(combatants) - 1)
+
+    assert battle_royale(combatants, buffered).eliminations == battle_royale(combatants, SeededRandomness(7)).eliminations
+    assert buffered.refills == 1
+
+def test_needs_two_combatants():
+    """Test that a royale with a single entrant is rejected."""
+    with pytest.raises(ValueError):
+        battle_royale(field([50]))
+
+def test_battle_royale_route(auth_client, session):
+    """Test the battle royale endpoint."""
+    for name, attack in (("pikachu", 55.0), ("staryu", 45.0), ("bulbasaur", 49.0)):
+        Pokemons.create_pokemon(name, attack, 40.0)
+
+    response = auth_client.post("/api/battle-royale", json={"pokemons": ["Pikachu", "staryu", "bulbasaur"], "seed": 3})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["rounds"] == 2
+    assert len(body["eliminations"]) == 2
+    assert body["winner"] not in {e["name"] for e in body["eliminations"]}
+
+    assert auth_client.post("/api/battle-royale", json={"pokemons": ["pikachu"]}).status_code == 400
+    assert auth_client.post("/api/battle-royale", json={"pokemons": ["pikachu", "pikachu"]}).status_code == 400
+    assert auth_client.post("/api/battle-royale", json={"pokemons": ["pikachu", "staryu"], "seed": True}).status_code == 400
+    assert auth_client.post("/api/battle-royale", json={"pokemons": ["pikachu", "mew"]}).status_code == 404
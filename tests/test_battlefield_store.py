@@ -0,0 +1,117 @@
+import sqlite3
+import threading
+
+import pytest
+
+from models.battlefield_store import (
+    BattlefieldStore,
+    InMemoryBattlefieldStore,
+    SqliteBattlefieldStore,
+    configure_battlefield_store,
+)
+from models.pokemon_model import Pokemons
+
+
+@pytest.fixture
+def pokemon_ids(session):
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    Pokemons.create_pokemon("staryu", attack=45.0, defense=55.0)
+    Pokemons.create_pokemon("bulbasaur", attack=49.0, defense=49.0)
+    return [Pokemons.get_pokemon_by_name(name).id for name in ("pikachu", "staryu", "bulbasaur")]
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryBattlefieldStore()
+    return SqliteBattlefieldStore(str(tmp_path / "battlefields.db"))
+
+def test_enter_and_battle(store, pokemon_ids):
+    """Test the enter/battle cycle on both backends."""
+    store.enter("user:ash", pokemon_ids[0])
+    with pytest.raises(ValueError, match="There must be two pokemons to start a fight."):
+        store.battle("user:ash")
+
+    store.enter("user:ash", pokemon_ids[1])
+    with pytest.raises(ValueError, match="Battlefield is full"):
+        store.enter("user:ash", pokemon_ids[2])
+
+    assert store.battle("user:ash").winner_name in ("pikachu", "staryu")
+    with pytest.raises(ValueError, match="There must be two pokemons to start a fight."):
+        store.battle("user:ash")
+
+def test_enter_unknown_pokemon(store, session):
+    """Test that entering a missing pokemon fails without touching the arena."""
+    with pytest.raises(ValueError):
+        store.enter("user:ash", 999)
+
+def test_store_is_abstract():
+    """Test that a backend must implement every store operation."""
+    with pytest.raises(TypeError):
+        BattlefieldStore()
+
+def test_sqlite_release_closes_the_thread_connection(tmp_path, pokemon_ids):
+    """Test that release() closes this thread's connection and the next call opens a new one."""
+    store = SqliteBattlefieldStore(str(tmp_path / "battlefields.db"))
+    store.enter("user:ash", pokemon_ids[0])
+    connection = store._connection()
+
+    store.release()
+    with pytest.raises(sqlite3.ProgrammingError):
+        connection.execute("SELECT 1")
+    store.enter("user:ash", pokemon_ids[1])
+    assert store.stats()["arenas"] == 1
+
+def test_sqlite_store_is_shared_between_instances(tmp_path, pokemon_ids):
+    """Test that two stores on one file, as in two worker processes, see the same arenas."""
+    path = str(tmp_path / "battlefields.db")
+    first_worker = SqliteBattlefieldStore(path)
+    second_worker = SqliteBattlefieldStore(path)
+
+    first_worker.enter("arena:finals", pokemon_ids[0], entrant="ash")
+    second_worker.enter("arena:finals", pokemon_ids[1], entrant="misty")
+
+    claimed = first_worker.claim("arena:finals")
+    assert [(p.name, entrant) for p, entrant in claimed] == [("pikachu", "ash"), ("staryu", "misty")]
+    assert second_worker.stats()["arenas"] == 0
+
+def test_sqlite_claim_is_atomic(tmp_path, pokemon_ids):
+    """Test that concurrent claims on one arena hand the pair to exactly one caller."""
+    path = str(tmp_path / "battlefields.db")
+    SqliteBattlefieldStore(path).enter("arena:finals", pokemon_ids[0])
+    SqliteBattlefieldStore(path).enter("arena:finals", pokemon_ids[1])
+
+    results = []
+
+    def claim():
+        try:
+            results.append(SqliteBattlefieldStore(path).claim("arena:finals"))
+        except ValueError:
+            results.append(None)
+
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len([result for result in results if result is not None]) == 1
+
+def test_sqlite_idle_entries_expire(tmp_path, pokemon_ids):
+    """Test that pokemons left waiting longer than the TTL are dropped."""
+    store = SqliteBattlefieldStore(str(tmp_path / "battlefields.db"), ttl=-1)
+    store.enter("user:ash", pokemon_ids[0])
+    store.enter("user:ash", pokemon_ids[1])
+
+    with pytest.raises(ValueError, match="There must be two pokemons"):
+        store.claim("user:ash")
+
+def test_configure_battlefield_store(tmp_path):
+    """Test picking the backend from config."""
+    assert isinstance(configure_battlefield_store({}), InMemoryBattlefieldStore)
+    store = configure_battlefield_store({
+        "BATTLEFIELD_STORE": "sqlite",
+        "BATTLEFIELD_SQLITE_PATH": str(tmp_path / "battlefields.db"),
+    })
+    assert isinstance(store, SqliteBattlefieldStore)
+    with pytest.raises(ValueError, match="Unknown battlefield store"):
+        configure_battlefield_store({"BATTLEFIELD_STORE": "redis"})
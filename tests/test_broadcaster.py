@@ -0,0 +1,117 @@
+import json
+import threading
+
+import pytest
+
+from models.broadcaster import Broadcaster, TooManySubscriptionsError, configure_broadcaster, get_broadcaster
+from models.pokemon_model import Pokemons
+
+
+def test_fan_out_in_order():
+    """Test that every subscriber gets every event, numbered in publish order."""
+    broadcaster = Broadcaster()
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+    for i in range(3):
+        broadcaster.publish({"n": i})
+
+    for subscription in (first, second):
+        events, dropped = subscription.get(timeout=0)
+        assert events == [(1, {"n": 0}), (2, {"n": 1}), (3, {"n": 2})]
+        assert dropped == 0
+
+def test_slow_subscriber_drops_oldest():
+    """Test that a full ring buffer overwrites its oldest events and counts them."""
+    broadcaster = Broadcaster(buffer_size=2)
+    slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+    broadcaster.publish("a")
+    assert fast.get(timeout=0)[0] == [(1, "a")]
+    broadcaster.publish("b")
+    broadcaster.publish("c")
+
+    assert slow.get(timeout=0) == ([(2, "b"), (3, "c")], 1)
+    assert slow.get(timeout=0) == ([], 0)
+    assert broadcaster.stats()["dropped"] == 1
+
+def test_subscriber_limit_and_unsubscribe():
+    """Test that subscriptions are capped and closing one wakes its reader."""
+    broadcaster = Broadcaster(max_subscribers=1)
+    subscription = broadcaster.subscribe()
+    with pytest.raises(ValueError):
+        broadcaster.subscribe()
+
+    reader = threading.Thread(target=subscription.get)
+    reader.start()
+    broadcaster.unsubscribe(subscription)
+    reader.join(timeout=5)
+
+    assert not reader.is_alive()
+    assert broadcaster.stats()["subscribers"] == 0
+    assert broadcaster.stats()["rejected"] == 1
+    broadcaster.subscribe()
+
+def test_per_owner_limit():
+    """Test that one owner can only hold max_per_owner subscriptions."""
+    broadcaster = Broadcaster(max_per_owner=2)
+    first = broadcaster.subscribe(owner="ash")
+    broadcaster.subscribe(owner="ash")
+    with pytest.raises(TooManySubscriptionsError):
+        broadcaster.subscribe(owner="ash")
+    broadcaster.subscribe(owner="misty")
+
+    broadcaster.unsubscribe(first)
+    broadcaster.subscribe(owner="ash")
+    assert broadcaster.stats()["rejected"] == 1
+
+def test_close_ends_every_subscription():
+    """Test that closing a broadcaster closes its subscriptions and refuses new ones."""
+    broadcaster = Broadcaster()
+    subscriptions = [broadcaster.subscribe() for _ in range(3)]
+
+    broadcaster.close()
+
+    assert all(subscription.closed for subscription in subscriptions)
+    assert broadcaster.stats()["subscribers"] == 0
+    with pytest.raises(ValueError):
+        broadcaster.subscribe()
+
+def test_configure_closes_previous():
+    """Test that replacing the shared broadcaster ends the old one's streams."""
+    subscription = get_broadcaster().subscribe()
+    configure_broadcaster({})
+    assert subscription.closed
+
+def test_battle_stream_route(app, auth_client, session):
+    """Test that a battle fought through the API is pushed to an open stream."""
+    app.config["BATTLE_STREAM_KEEPALIVE"] = 0.05
+    Pokemons.create_pokemon("pikachu", 40.0, 25.0)
+    Pokemons.create_pokemon("staryu", 45.0, 30.0)
+
+    with app.app_context():
+        # A fresh app context, so the anonymous user isn't cached for the requests below
+        assert app.test_client().get("/api/battles/stream").status_code == 401
+    response = auth_client.get("/api/battles/stream", buffered=False)
+    chunks = iter(response.response)
+    assert next(chunks) == b": connected\n\n"
+    assert get_broadcaster().stats()["subscribers"] == 1
+
+    winner = auth_client.post("/api/quick-battle", json={"pokemon_1": "pikachu", "pokemon_2": "staryu"}).get_json()["winner"]
+    message = next(chunks).decode()
+    assert message.startswith("id: 1\nevent: battle\n")
+    assert json.loads(message.split("data: ", 1)[1])["winner"] == winner
+
+    assert next(chunks) == b": keepalive\n\n"
+    response.close()
+    assert get_broadcaster().stats()["subscribers"] == 0
+
+def test_battle_stream_per_user_limit(app, auth_client, session):
+    """Test that a user past BATTLE_STREAM_MAX_PER_USER open streams gets 429."""
+    app.config["BATTLE_STREAM_MAX_PER_USER"] = 1
+    configure_broadcaster(app.config)
+    try:
+        response = auth_client.get("/api/battles/stream", buffered=False)
+        assert auth_client.get("/api/battles/stream").status_code == 429
+        response.close()
+        assert get_broadcaster().stats()["subscribers"] == 0
+    finally:
+        app.config["BATTLE_STREAM_MAX_PER_USER"] = 3
+        configure_broadcaster(app.config)
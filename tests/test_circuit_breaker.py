@@ -0,0 +1,199 @@
+import time
+
+import pytest
+import requests
+
+from models.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from models.pokeapi_client import DeadlineExceededError, PokeAPIClient, configure_client, set_deadline
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker(window_size=4, minimum_calls=4, open_seconds=30, slow_call_seconds=1.0)
+
+##########################################################
+# Breaker state machine
+##########################################################
+
+def test_opens_on_failure_rate(breaker):
+    """Test that the breaker opens once half of the window failed."""
+    for success in (True, True, False):
+        breaker.before_call()
+        breaker.record(success, 0.01)
+    assert breaker.state == CLOSED
+
+    breaker.before_call()
+    breaker.record(False, 0.01)
+
+    assert breaker.state == OPEN
+    assert breaker.trips == 1
+
+def test_opens_on_slow_calls(breaker):
+    """Test that successful but slow calls also open the breaker."""
+    for duration in (0.01, 0.01, 1.5, 1.5):
+        breaker.before_call()
+        breaker.record(True, duration)
+
+    assert breaker.state == OPEN
+
+def test_rejects_calls_while_open(breaker):
+    """Test that an open breaker refuses calls and says when to retry."""
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record(False, 0.01)
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_call()
+
+    assert 29 < exc_info.value.retry_after <= 30
+    assert breaker.rejected == 1
+
+def test_half_open_probe(breaker):
+    """Test that one probe is let through after the open period and its outcome decides the state."""
+    breaker.open_seconds = 0.0
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record(False, 0.01)
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(False, 0.01)
+    assert breaker.state == OPEN
+    assert breaker.trips == 2
+
+    breaker.before_call()
+    breaker.record(True, 0.01)
+    assert breaker.state == CLOSED
+
+##########################################################
+# Client integration
+##########################################################
+
+def test_client_skips_upstream_when_open(mocker):
+    """Test that the client doesn't touch the network while its breaker is open."""
+    client = PokeAPIClient(max_retries=0, breaker=CircuitBreaker(minimum_calls=1, open_seconds=30))
+    mock_get = mocker.patch.object(client.session, "get", return_value=mocker.Mock(status_code=503))
+
+    client.get("pokemon/pikachu")
+    with pytest.raises(CircuitOpenError):
+        client.get("pokemon/pikachu")
+
+    assert mock_get.call_count == 1
+
+def test_not_found_is_not_a_failure(mocker):
+    """Test that 404s from PokéAPI don't count against the upstream."""
+    breaker = CircuitBreaker(minimum_calls=1)
+    client = PokeAPIClient(breaker=breaker)
+    mocker.patch.object(client.session, "get", return_value=mocker.Mock(status_code=404))
+
+    for _ in range(3):
+        client.get("pokemon/missingno")
+
+    assert breaker.state == CLOSED
+
+def test_timeouts_capped_by_deadline(mocker):
+    """Test that the remaining deadline bounds the connect and read timeouts."""
+    client = PokeAPIClient(connect_timeout=3.0, read_timeout=10.0)
+    mock_get = mocker.patch.object(client.session, "get")
+
+    set_deadline(0.5)
+    try:
+        client.get("pokemon/pikachu")
+    finally:
+        set_deadline(None)
+
+    connect_timeout, read_timeout = mock_get.call_args.kwargs["timeout"]
+    assert connect_timeout <= 0.5
+    assert read_timeout <= 0.5
+
+def test_expired_deadline(mocker):
+    """Test that no call is made once the deadline has passed."""
+    client = PokeAPIClient()
+    mock_get = mocker.patch.object(client.session, "get")
+
+    set_deadline(0.001)
+    time.sleep(0.01)
+    try:
+        with pytest.raises(DeadlineExceededError):
+            client.get("pokemon/pikachu")
+    finally:
+        set_deadline(None)
+
+    mock_get.assert_not_called()
+
+def test_unexpected_error_frees_the_probe(mocker, breaker):
+    """Test that a half-open probe failing with a non-request error doesn't block later calls."""
+    breaker.open_seconds = 0.0
+    breaker._open()
+    client = PokeAPIClient(max_retries=0, breaker=breaker)
+    mock_get = mocker.patch.object(client.session, "get", side_effect=RuntimeError("boom"))
+
+    with pytest.raises(RuntimeError):
+        client.get("pokemon/pikachu")
+
+    mock_get.side_effect = None
+    mock_get.return_value = mocker.Mock(status_code=200)
+    client.get("pokemon/pikachu")
+    assert breaker.state == CLOSED
+
+def test_own_deadline_is_not_an_upstream_failure(mocker):
+    """Test that a call cut short by our own deadline isn't counted against PokéAPI."""
+    breaker = CircuitBreaker(minimum_calls=1)
+    client = PokeAPIClient(max_retries=0, breaker=breaker)
+
+    def slow_get(url, timeout, **kwargs):
+        time.sleep(timeout[1])
+        raise requests.exceptions.ReadTimeout()
+
+    mocker.patch.object(client.session, "get", side_effect=slow_get)
+    set_deadline(0.02)
+    try:
+        with pytest.raises(requests.exceptions.Timeout):
+            client.get("pokemon/pikachu")
+    finally:
+        set_deadline(None)
+
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_calls"] == 0
+
+##########################################################
+# Routes
+##########################################################
+
+def test_fetch_pokemon_fails_fast_when_open(app, client):
+    """Test that once PokéAPI keeps failing, the route answers 503 with Retry-After."""
+    app.config["POKEAPI_BASE_URL"] = "http://127.0.0.1:9/api/v2"
+    app.config["POKEAPI_MAX_RETRIES"] = 0
+    app.config["POKEAPI_BREAKER_MIN_CALLS"] = 2
+    configure_client(app.config)
+
+    for name in ("pikachu", "staryu"):
+        response = client.get(f"/api/fetch-pokemon/{name}")
+        assert response.status_code == 503
+        assert "Retry-After" not in response.headers
+
+    response = client.get("/api/fetch-pokemon/bulbasaur")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
+
+    upstream = client.get("/api/metrics").get_json()["upstream"]
+    assert upstream["state"] == OPEN
+    assert upstream["rejected"] == 1
+
+def test_batch_fetch_fails_fast_when_open(app, client, session):
+    """Test that the batch route reports an unreachable PokéAPI or open breaker as 503, not as missing pokemons."""
+    app.config["POKEAPI_BASE_URL"] = "http://127.0.0.1:9/api/v2"
+    app.config["POKEAPI_MAX_RETRIES"] = 0
+    app.config["POKEAPI_BREAKER_MIN_CALLS"] = 1
+    configure_client(app.config)
+
+    response = client.post("/api/fetch-pokemon", json={"names": ["pikachu"]})
+    assert response.status_code == 503
+    assert "Retry-After" not in response.headers
+
+    response = client.get("/api/fetch-pokemon?names=pikachu,staryu")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
@@ -0,0 +1,73 @@
+from models.http_cache import make_etag
+from models.pokemon_model import Pokemons
+
+
+def test_make_etag_tracks_stats():
+    """Test that the ETag is stable for the same stats and changes with them."""
+    assert make_etag("pikachu", 55.0, 40.0) == make_etag("pikachu", 55.0, 40.0)
+    assert make_etag("pikachu", 55.0, 40.0) != make_etag("pikachu", 56.0, 40.0)
+
+def test_fetch_pokemon_revalidation(client, session, mocker):
+    """Test that a matching If-None-Match gets a bodyless 304 without rendering the JSON."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+
+    response = client.get("/api/fetch-pokemon/pikachu")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "public, max-age=300"
+    etag = response.headers["ETag"]
+
+    mock_jsonify = mocker.patch("app.jsonify")
+    response = client.get("/api/fetch-pokemon/pikachu", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    mock_jsonify.assert_not_called()
+
+def test_fetch_pokemon_etag_changes_with_stats(client, session):
+    """Test that updating a pokemon's stats invalidates its ETag."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    etag = client.get("/api/fetch-pokemon/pikachu").headers["ETag"]
+
+    Pokemons.get_pokemon_by_name("pikachu").update_stats("attack", 5.0)
+
+    response = client.get("/api/fetch-pokemon/pikachu", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["pokemon"]["attack"] == 60.0
+    assert response.headers["ETag"] != etag
+
+def test_fetch_pokemons_revalidation(client, session):
+    """Test conditional GETs on the batch endpoint."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    Pokemons.create_pokemon("staryu", attack=45.0, defense=55.0)
+
+    response = client.get("/api/fetch-pokemon?names=pikachu,staryu")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get("/api/fetch-pokemon?names=pikachu,staryu", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.get("/api/fetch-pokemon?names=staryu,pikachu", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+def test_fetch_pokemons_revalidation_skips_upstream(client, session, pokeapi_stub):
+    """Test that a stored batch is revalidated without fetching, and a batch that stored rows isn't cacheable."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+
+    response = client.get("/api/fetch-pokemon?names=pikachu,staryu")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert "Cache-Control" not in response.headers
+
+    etag = client.get("/api/fetch-pokemon?names=pikachu,staryu").headers["ETag"]
+    response = client.get("/api/fetch-pokemon?names=pikachu,staryu", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert pokeapi_stub.hits["/api/v2/pokemon/staryu"] == 1
+
+def test_fetch_pokemon_created_is_not_cacheable(client, session, pokeapi_stub):
+    """Test that the response that stored a new pokemon carries no cache headers."""
+    response = client.get("/api/fetch-pokemon/staryu")
+    assert response.status_code == 201
+    assert "Cache-Control" not in response.headers
+
+    assert client.get("/api/fetch-pokemon/staryu").headers["Cache-Control"] == "public, max-age=300"
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+from models.battle_history import BattleRecorder
+from models.leaderboard import Leaderboard, Ratings, expected_score, get_leaderboard
+from models.pokemon_battle_model import BattleResult
+from models.pokemon_model import Pokemons
+
+
+def make_result(winner=1, entrant_1=None, entrant_2=None):
+    names = {1: "pikachu", 2: "staryu"}
+    return BattleResult(pokemon_1_id=1, pokemon_1_name="pikachu", pokemon_2_id=2, pokemon_2_name="staryu",
+                        skill_1=95.0, skill_2=100.0, draw=0.5, winner_id=winner, winner_name=names[winner],
+                        fought_at=time.time(), entrant_1=entrant_1, entrant_2=entrant_2)
+
+def record(app, leaderboard, *results):
+    """Rate fights the way the app does: through a synchronous battle recorder."""
+    recorder = BattleRecorder(app, synchronous=True, leaderboard=leaderboard)
+    for result in results:
+        recorder.record(result)
+
+def test_expected_score():
+    """Test the Elo expected score."""
+    assert expected_score(1500, 1500) == 0.5
+    assert expected_score(1900, 1500) == pytest.approx(10 / 11)
+    assert expected_score(1500, 1900) + expected_score(1900, 1500) == pytest.approx(1.0)
+
+def test_record_updates_ratings(app, session):
+    """Test that a fight moves both ratings by the same amount in opposite directions."""
+    leaderboard = Leaderboard(k_factor=32, initial_rating=1500)
+    record(app, leaderboard, make_result(winner=2))
+
+    top = leaderboard.top("pokemon", 10)
+    assert [(entry["name"], entry["rating"], entry["wins"]) for entry in top] == [
+        ("staryu", 1516.0, 1), ("pikachu", 1484.0, 0)]
+    assert leaderboard.rank_of("pokemon", "pikachu")["rank"] == 2
+    assert leaderboard.top("user", 10) == []
+
+    record(app, leaderboard, make_result(winner=2))
+    assert leaderboard.rank_of("pokemon", "staryu")["rating"] == pytest.approx(1516 + 32 * (1 - expected_score(1516, 1484)))
+
+def test_users_rated_only_against_other_users(app, session):
+    """Test that user ratings change only when two different users' pokemons fight."""
+    leaderboard = Leaderboard()
+    record(app, leaderboard, make_result(entrant_1="ash", entrant_2="ash"), make_result(entrant_1="ash", entrant_2=None))
+    assert leaderboard.stats()["users"] == 0
+
+    record(app, leaderboard, make_result(entrant_1="ash", entrant_2="misty"))
+    assert [entry["name"] for entry in leaderboard.top("user", 2)] == ["ash", "misty"]
+    assert leaderboard.rank_of("user", "misty")["games"] == 1
+
+def test_reload_matches_live_index(app, session):
+    """Test that rebuilding from the ratings table gives the same leaderboard."""
+    live = Leaderboard()
+    for winner, entrants in ((1, ("ash", "misty")), (2, ("misty", "ash")), (2, (None, None))):
+        record(app, live, make_result(winner, *entrants))
+
+    reloaded = Leaderboard()
+    assert reloaded.load() == Ratings.query.count() == 4
+    for kind in ("pokemon", "user"):
+        assert reloaded.top(kind, 10) == live.top(kind, 10)
+
+def test_ratings_computed_from_stored_rows(app, session):
+    """Test that a leaderboard with a stale index still builds on what another one persisted."""
+    stale = Leaderboard(k_factor=32, initial_rating=1500)
+    other = Leaderboard(k_factor=32, initial_rating=1500)
+    record(app, other, make_result(winner=2))
+
+    record(app, stale, make_result(winner=2))
+
+    staryu = session.get(Ratings, ("pokemon", "2"))
+    assert (staryu.games, staryu.wins) == (2, 2)
+    assert staryu.rating == pytest.approx(1516 + 32 * (1 - expected_score(1516, 1484)))
+    assert stale.rank_of("pokemon", "staryu")["rating"] == staryu.rating
+
+def test_recorder_rates_in_its_write(app, session):
+    """Test that the battle recorder rates a queued batch when it writes it."""
+    leaderboard = Leaderboard(k_factor=32, initial_rating=1500)
+    recorder = BattleRecorder(app, flush_interval=60, leaderboard=leaderboard)
+    recorder._ensure_writer = lambda: None  # keep the test in control of when rows are written
+
+    recorder.record(make_result(winner=2))
+    recorder.record(make_result(winner=1))
+    assert leaderboard.top("pokemon", 10) == []
+
+    recorder.flush()
+
+    assert leaderboard.rank_of("pokemon", "pikachu")["games"] == 2
+    assert Ratings.query.count() == 2
+
+def test_unknown_kind():
+    """Test that an unknown kind is rejected."""
+    with pytest.raises(ValueError):
+        Leaderboard().top("trainer", 5)
+
+def test_battle_route_updates_leaderboard(auth_client, session):
+    """Test that a fight through the API shows up on the leaderboard routes."""
+    Pokemons.create_pokemon("pikachu", 55, 40)
+    Pokemons.create_pokemon("staryu", 45, 55)
+    for name in ("pikachu", "staryu"):
+        auth_client.post("/api/enter-ring", json={"name": name})
+    winner = auth_client.get("/api/battle").get_json()["winner"]
+
+    response = auth_client.get("/api/leaderboard?top=1")
+    assert response.status_code == 200
+    assert response.get_json()["leaderboard"][0]["name"] == winner
+
+    response = auth_client.get(f"/api/leaderboard/rank?name={winner.upper()}")
+    assert response.get_json()["rank"] == 1
+    assert auth_client.get("/api/leaderboard/rank?name=mew").status_code == 404
+    assert auth_client.get("/api/leaderboard?top=0").status_code == 400
+    assert get_leaderboard().stats()["pokemons"] == 2
@@ -0,0 +1,140 @@
+import time
+
+import pytest
+
+from models.matchmaking import CANCELLED, EXPIRED, MATCHED, WAITING, MatchmakingQueue, get_matchmaking_queue
+from models.pokemon_battle_model import BattleModel
+from models.pokemon_model import Pokemons
+from models.stat_cache import PokemonStats
+
+
+def pokemon(pokemon_id, skill):
+    return PokemonStats(id=pokemon_id, name=f"p{pokemon_id}", attack=float(skill), defense=0.0)
+
+def test_pairs_with_closest_skill():
+    """Test that a new ticket is paired with the nearest waiting skill inside the window."""
+    queue = MatchmakingQueue(base_tolerance=10, widen_per_second=0, timeout=60)
+    for i, skill in enumerate((50, 95, 120, 300)):
+        assert queue.enqueue(f"user-{i}", pokemon(i, skill)).status == WAITING
+
+    ticket = queue.enqueue("ash", pokemon(10, 103))
+
+    assert ticket.status == MATCHED
+    assert ticket.opponent.pokemon.id == 1
+    assert ticket.opponent.first and not ticket.first
+    assert queue.stats()["waiting"] == 3
+    assert queue.enqueue("misty", pokemon(11, 200)).status == WAITING
+
+def test_window_widens_while_waiting():
+    """Test that a ticket too far from everyone matches once its window has widened."""
+    queue = MatchmakingQueue(base_tolerance=1, widen_per_second=1000, timeout=60)
+    first = queue.enqueue("ash", pokemon(1, 100))
+    second = queue.enqueue("misty", pokemon(2, 130))
+    assert second.status == WAITING
+
+    time.sleep(0.05)
+    assert queue.poll(second.id, "misty").status == MATCHED
+    assert first.status == MATCHED and first.opponent is second
+
+def test_one_waiting_ticket_per_user():
+    """Test that a user can't have two tickets waiting at once."""
+    queue = MatchmakingQueue()
+    queue.enqueue("ash", pokemon(1, 100))
+    with pytest.raises(ValueError):
+        queue.enqueue("ash", pokemon(2, 100))
+
+def test_cancel_and_expire():
+    """Test that cancelled and timed-out tickets leave the queue."""
+    queue = MatchmakingQueue(timeout=0.02)
+    cancelled = queue.enqueue("ash", pokemon(1, 100))
+    assert queue.cancel(cancelled.id, "ash").status == CANCELLED
+    with pytest.raises(ValueError):
+        queue.cancel(cancelled.id, "ash")
+    with pytest.raises(KeyError):
+        queue.poll(cancelled.id, "misty")
+
+    expiring = queue.enqueue("ash", pokemon(2, 100))
+    time.sleep(0.03)
+    assert queue.stats()["waiting"] == 0
+    assert expiring.status == EXPIRED
+    assert queue.stats()["expired"] == 1
+    assert queue.enqueue("misty", pokemon(3, 100)).status == WAITING
+
+def test_claim_is_granted_once():
+    """Test that only one request gets to fight a matched pair."""
+    queue = MatchmakingQueue()
+    waiting = queue.enqueue("ash", pokemon(1, 100))
+    assert queue.claim(waiting) is False
+
+    arriving = queue.enqueue("misty", pokemon(2, 100))
+    assert queue.claim(arriving) is True
+    assert queue.claim(waiting) is False
+
+def test_release_reopens_claim():
+    """Test that a released pair can be claimed again, unless its fight already completed."""
+    queue = MatchmakingQueue()
+    queue.enqueue("ash", pokemon(1, 100))
+    ticket = queue.enqueue("misty", pokemon(2, 100))
+    assert queue.claim(ticket) is True
+
+    queue.release(ticket)
+    assert queue.claim(ticket.opponent) is True
+
+    queue.complete(ticket, object())
+    queue.release(ticket)
+    assert queue.claim(ticket) is False
+
+def test_failed_fight_is_retried(app, auth_client, session, monkeypatch):
+    """Test that a fight that raises returns 500 and is fought again on the next poll."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    Pokemons.create_pokemon("staryu", attack=45.0, defense=55.0)
+    with app.app_context():
+        response = auth_client.post("/api/matchmaking", json={"name": "pikachu"})
+    ticket_id = response.get_json()["ticket"]
+    get_matchmaking_queue().enqueue("rival", Pokemons.get_stats_by_name("staryu"))
+
+    def broken_fight(self):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(BattleModel, "fight", broken_fight)
+    with app.app_context():
+        assert auth_client.get(f"/api/matchmaking/{ticket_id}").status_code == 500
+
+    monkeypatch.undo()
+    with app.app_context():
+        response = auth_client.get(f"/api/matchmaking/{ticket_id}")
+    assert response.status_code == 200
+    assert response.get_json()["winner"] in ("pikachu", "staryu")
+
+def test_matchmaking_routes(app, auth_client, session):
+    """Test queueing, polling and the fight through the API."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    Pokemons.create_pokemon("staryu", attack=45.0, defense=55.0)
+
+    rival = app.test_client()
+    rival.put("/api/create-user", json={"username": "rival", "password": "secret"})
+    rival.post("/api/login", json={"username": "rival", "password": "secret"})
+
+    def call(client, method, url, **kwargs):
+        # The fixture's app context would otherwise share Flask-Login's current user across requests
+        with app.app_context():
+            return getattr(client, method)(url, **kwargs)
+
+    response = call(auth_client, "post", "/api/matchmaking", json={"name": "pikachu"})
+    assert response.status_code == 202
+    ticket_id = response.get_json()["ticket"]
+    assert call(rival, "get", f"/api/matchmaking/{ticket_id}").status_code == 404
+    assert call(auth_client, "post", "/api/matchmaking", json={"name": "staryu"}).status_code == 400
+    assert call(auth_client, "post", "/api/matchmaking", json={"name": "mew"}).status_code == 404
+
+    response = call(rival, "post", "/api/matchmaking", json={"name": "staryu"})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["state"] == "matched"
+    assert body["opponent"]["username"] == "trainer"
+    assert body["winner"] in ("pikachu", "staryu")
+
+    polled = call(auth_client, "get", f"/api/matchmaking/{ticket_id}").get_json()
+    assert polled["winner"] == body["winner"]
+    assert call(auth_client, "delete", f"/api/matchmaking/{ticket_id}").status_code == 400
+    assert len(call(auth_client, "get", "/api/leaderboard?kind=user").get_json()["leaderboard"]) == 2
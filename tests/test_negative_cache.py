@@ -0,0 +1,92 @@
+import pytest
+
+from models.api_utils import get_attack_and_defense, get_attack_and_defense_many
+from models.negative_cache import MissingPokemons, NegativeCache, configure_negative_cache, get_negative_cache
+from models.pokemon_model import Pokemons
+
+
+@pytest.fixture
+def negative_cache():
+    return NegativeCache(ttl=60, maxsize=2)
+
+##########################################################
+# Cache behaviour
+##########################################################
+
+def test_add_and_contains(negative_cache):
+    """Test that added names are reported missing, case-insensitively."""
+    negative_cache.add("MissingNo")
+
+    assert negative_cache.contains("missingno") is True
+    assert negative_cache.contains("pikachu") is False
+    assert negative_cache.stats()["hits"] == 1
+    assert negative_cache.stats()["misses"] == 1
+
+def test_entries_expire(negative_cache, mocker):
+    """Test that names are forgotten after the TTL."""
+    mock_time = mocker.patch("models.negative_cache.time.time", return_value=1000.0)
+    negative_cache.add("missingno")
+
+    mock_time.return_value = 1059.0
+    assert negative_cache.contains("missingno") is True
+
+    mock_time.return_value = 1061.0
+    assert negative_cache.contains("missingno") is False
+    assert negative_cache.stats()["size"] == 0
+
+def test_size_is_bounded(negative_cache):
+    """Test that the least recently used names are evicted past maxsize."""
+    negative_cache.add("a")
+    negative_cache.add("b")
+    negative_cache.contains("a")
+    negative_cache.add("c")
+
+    assert negative_cache.contains("b") is False
+    assert negative_cache.contains("a") is True
+    assert negative_cache.contains("c") is True
+
+def test_persisted_entries(session):
+    """Test that a persisting cache reads back entries written by another instance."""
+    NegativeCache(persist=True).add("missingno")
+
+    assert session.get(MissingPokemons, "missingno") is not None
+    assert NegativeCache(persist=True).contains("missingno") is True
+
+def test_pool_workers_leave_persistence_to_caller(app, pokeapi_stub, session):
+    """Test that names found missing by fetch pool workers are written by the calling thread."""
+    configure_negative_cache({"NEGATIVE_CACHE_PERSIST": True})
+    try:
+        assert get_attack_and_defense_many(["missingno", "pikachu"]) == {"missingno": None, "pikachu": [55, 40]}
+        assert session.get(MissingPokemons, "missingno") is not None
+    finally:
+        configure_negative_cache(app.config)
+
+##########################################################
+# Upstream short-circuit
+##########################################################
+
+def test_get_attack_and_defense_remembers_404(pokeapi_stub):
+    """Test that an upstream 404 is only requested once."""
+    assert get_attack_and_defense("missingno") is None
+    assert get_attack_and_defense("missingno") is None
+
+    assert pokeapi_stub.hits["/api/v2/pokemon/missingno"] == 1
+    assert get_negative_cache().stats()["hits"] == 1
+
+def test_pokemon_without_stats_for_unknown_name(pokeapi_stub):
+    """Test that constructing an unknown pokemon without stats raises a ValueError."""
+    with pytest.raises(ValueError, match="could not be fetched"):
+        Pokemons(name="missingno")
+    with pytest.raises(ValueError, match="could not be fetched"):
+        Pokemons(name="missingno")
+
+    assert pokeapi_stub.hits["/api/v2/pokemon/missingno"] == 1
+
+def test_fetch_pokemon_route_404_is_cached(client, pokeapi_stub):
+    """Test that repeated requests for an unknown name stop reaching PokéAPI."""
+    for _ in range(3):
+        assert client.get("/api/fetch-pokemon/missingno").status_code == 404
+
+    assert pokeapi_stub.hits["/api/v2/pokemon/missingno"] == 1
+    metrics = client.get("/api/metrics").get_json()
+    assert metrics["negative_cache"]["hits"] == 2
@@ -0,0 +1,106 @@
+import pytest
+import requests
+
+from models.pokeapi_client import PokeAPIClient, configure_client, get_client, set_deadline
+
+
+@pytest.fixture
+def client_config():
+    return {
+        "POKEAPI_BASE_URL": "http://pokeapi.test/api/v2/",
+        "POKEAPI_POOL_SIZE": 4,
+        "POKEAPI_CONNECT_TIMEOUT": 1.5,
+        "POKEAPI_READ_TIMEOUT": 2.5,
+        "POKEAPI_MAX_RETRIES": 3,
+        "POKEAPI_BACKOFF_FACTOR": 0.1,
+    }
+
+##########################################################
+# Configuration
+##########################################################
+
+def test_configure_client(client_config):
+    """Test that the shared client is built from the config mapping."""
+    client = configure_client(client_config)
+
+    assert get_client() is client
+    assert client.base_url == "http://pokeapi.test/api/v2"
+    assert client.timeout == (1.5, 2.5)
+
+    assert client.max_retries == 3
+    assert client.backoff_factor == 0.1
+
+    adapter = client.session.get_adapter("https://pokeapi.co")
+    assert adapter._pool_maxsize == 4
+
+def test_url_for():
+    """Test joining paths onto the base URL."""
+    client = PokeAPIClient(base_url="http://pokeapi.test/api/v2/")
+    assert client.url_for("/pokemon/pikachu") == "http://pokeapi.test/api/v2/pokemon/pikachu"
+
+def test_get_uses_default_timeout(mocker):
+    """Test that every request carries the connect/read timeouts."""
+    client = PokeAPIClient(connect_timeout=1.0, read_timeout=2.0)
+    mock_get = mocker.patch.object(client.session, "get")
+
+    client.get("pokemon/pikachu")
+
+    mock_get.assert_called_once_with("https://pokeapi.co/api/v2/pokemon/pikachu", timeout=(1.0, 2.0))
+
+##########################################################
+# Retries
+##########################################################
+
+def test_retries_transient_failures(mocker):
+    """Test that 5xx responses and connection errors are retried with backoff."""
+    client = PokeAPIClient(max_retries=2, backoff_factor=0.1)
+    mock_sleep = mocker.patch("models.pokeapi_client.time.sleep")
+    mocker.patch.object(client.session, "get", side_effect=[
+        requests.exceptions.ConnectionError(),
+        mocker.Mock(status_code=503),
+        mocker.Mock(status_code=200),
+    ])
+
+    assert client.get("pokemon/pikachu").status_code == 200
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [0.1, 0.2]
+
+def test_gives_up_after_max_retries(mocker):
+    """Test that the last response is returned once the retries are spent."""
+    client = PokeAPIClient(max_retries=1, backoff_factor=0)
+    mock_get = mocker.patch.object(client.session, "get", return_value=mocker.Mock(status_code=503))
+
+    assert client.get("pokemon/pikachu").status_code == 503
+    assert mock_get.call_count == 2
+
+def test_no_retry_past_deadline(mocker):
+    """Test that a retry whose backoff would outlast the deadline isn't started."""
+    client = PokeAPIClient(max_retries=3, backoff_factor=1.0)
+    mock_get = mocker.patch.object(client.session, "get", side_effect=requests.exceptions.ReadTimeout())
+
+    set_deadline(0.5)
+    try:
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            client.get("pokemon/pikachu")
+    finally:
+        set_deadline(None)
+
+    assert mock_get.call_count == 1
+
+##########################################################
+# Connection reuse
+##########################################################
+
+def test_connections_are_reused(pokeapi_stub):
+    """Test that consecutive requests share one keep-alive connection."""
+    client = get_client()
+    for _ in range(5):
+        response = client.get("pokemon/pikachu")
+        assert response.status_code == 200
+
+    assert pokeapi_stub.connections == 1
+
+def test_not_found_is_not_retried(pokeapi_stub):
+    """Test that a 404 is returned as-is without retries."""
+    response = get_client().get("pokemon/missingno")
+    assert response.status_code == 404
+    assert pokeapi_stub.hits["/api/v2/pokemon/missingno"] == 1
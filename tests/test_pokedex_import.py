@@ -0,0 +1,112 @@
+import pytest
+
+from db import db
+from models.pokedex_import import import_pokedex
+from models.pokemon_model import Pokemons
+
+
+@pytest.fixture
+def large_pokedex(pokeapi_stub):
+    """Give the stub enough species to span several listing pages and batches."""
+    pokeapi_stub.pokemons = {f"species-{i}": (i, 10 + i, 20 + i) for i in range(1, 251)}
+    return pokeapi_stub
+
+##########################################################
+# Bulk upsert
+##########################################################
+
+def test_bulk_upsert_inserts_and_updates(session):
+    """Test that existing names are updated rather than rejected."""
+    Pokemons.create_pokemon("pikachu", 40.0, 25.0)
+
+    written = Pokemons.bulk_upsert([
+        {"name": "pikachu", "attack": 55, "defense": 40},
+        {"name": "Staryu", "attack": 45, "defense": 55},
+    ])
+
+    assert written == 2
+    assert Pokemons.query.count() == 2
+    pikachu = Pokemons.get_pokemon_by_name("pikachu")
+    session.refresh(pikachu)
+    assert (pikachu.attack, pikachu.defense) == (55, 40)
+    assert Pokemons.get_pokemon_by_name("staryu").attack == 45
+
+def test_bulk_upsert_invalid_stats(session):
+    """Test that a bad row rejects the whole batch."""
+    with pytest.raises(ValueError, match="Attack for 'pikachu'"):
+        Pokemons.bulk_upsert([
+            {"name": "staryu", "attack": 45, "defense": 55},
+            {"name": "pikachu", "attack": -1, "defense": 40},
+        ])
+    assert Pokemons.query.count() == 0
+
+def test_bulk_upsert_without_native_upsert(session, mocker):
+    """Test that dialects without ON CONFLICT fall back to updating and inserting row by row."""
+    Pokemons.create_pokemon("pikachu", 40.0, 25.0)
+    mocker.patch.object(db.engine.dialect, "name", "mssql")
+
+    written = Pokemons.bulk_upsert([
+        {"name": "pikachu", "attack": 55, "defense": 40},
+        {"name": "staryu", "attack": 45, "defense": 55},
+    ])
+
+    assert written == 2
+    assert Pokemons.query.count() == 2
+    assert Pokemons.get_pokemon_by_name("pikachu").attack == 55
+    assert Pokemons.get_pokemon_by_name("staryu").defense == 55
+
+##########################################################
+# Import
+##########################################################
+
+def test_import_pokedex(session, large_pokedex):
+    """Test importing every species in batches."""
+    summary = import_pokedex(max_workers=4, batch_size=64)
+
+    assert summary["listed"] == 250
+    assert summary["imported"] == 250
+    assert summary["failed"] == 0
+    assert Pokemons.query.count() == 250
+    assert Pokemons.get_pokemon_by_name("species-25").attack == 35
+    assert large_pokedex.hits["/api/v2/pokemon/25"] == 1
+
+def test_import_pokedex_limit_and_rerun(session, large_pokedex):
+    """Test that a limited import can be re-run without duplicate errors."""
+    import_pokedex(limit=10)
+    summary = import_pokedex(limit=10)
+
+    assert summary["imported"] == 10
+    assert Pokemons.query.count() == 10
+
+def test_import_pokedex_records_failures(session, pokeapi_stub, mocker):
+    """Test that species whose stats can't be fetched are reported, not fatal."""
+    mocker.patch("models.pokedex_import.get_attack_and_defense",
+                 side_effect=lambda key: None if key == "25" else [10, 10])
+
+    summary = import_pokedex()
+
+    assert summary["failed_names"] == ["pikachu"]
+    assert summary["imported"] == len(pokeapi_stub.pokemons) - 1
+
+def test_import_pokedex_command(app, large_pokedex):
+    """Test the import-pokedex CLI command."""
+    result = app.test_cli_runner().invoke(args=["import-pokedex", "--limit", "5", "--workers", "2"])
+
+    assert result.exit_code == 0, result.output
+    assert "Imported 5 of 5 species" in result.output
+    assert Pokemons.query.count() == 5
+
+@pytest.mark.parametrize("body", [
+    {"limit": "all"},
+    {"limit": 0},
+    {"max_workers": 10_000},
+    {"max_workers": True},
+    {"batch_size": 0},
+    {"batch_size": 2.5},
+])
+def test_import_pokedex_route_rejects_bad_parameters(auth_client, large_pokedex, body):
+    """Test that the import endpoint validates its parameters before importing anything."""
+    response = auth_client.post("/api/import-pokedex", json=body)
+
+    assert response.status_code == 400
+    assert Pokemons.query.count() == 0
@@ -1,8 +1,9 @@
 import pytest
 import random
 
-from models.pokemon_battle_model import BattleModel
+from models.pokemon_battle_model import BattleModel, Combatant
 from models.pokemon_model import Pokemons
+from models.stat_cache import get_stat_cache
 
 @pytest.fixture
 def pokemon_battle_model():
@@ -104,6 +105,24 @@ def test_enter_battlefield_full(pokemon_battle_model, app, sample_pokemons):
 
     assert len(pokemon_battle_model.battlefield) == 2, "Battlefield should still contain only 2 pokemons after trying to add a third."
 
+def test_battlefield_holds_detached_combatants(pokemon_battle_model, sample_pokemons, session):
+    """Test that entered pokemons are slotted records with their skill, loaded without ORM instances."""
+    ids = [p.id for p in sample_pokemons]
+    session.expunge_all()
+    get_stat_cache().clear()
+
+    for pokemon_id in ids:
+        pokemon_battle_model.enter_battlefield(pokemon_id)
+
+    combatant = pokemon_battle_model.battlefield[0]
+    assert isinstance(combatant, Combatant)
+    assert combatant.skill == 65.0
+    assert not hasattr(combatant, "__dict__")
+    assert len(session.identity_map) == 0, "Entering the ring should not load ORM instances."
+
+    session.remove()
+    assert pokemon_battle_model.battle() in ("Pikachu", "Staryu")
+
 ##########################################################
 # Fight
 ##########################################################
@@ -151,4 +170,4 @@ def test_battle_with_one_pokemon(pokemon_battle_model, sample_pokemon1):
     pokemon_battle_model.battlefield.append(sample_pokemon1)
 
     with pytest.raises(ValueError, match="There must be two pokemons to start a fight."):
-        pokemon_battle_model.battle()
\ No newline at end of file
+        pokemon_battle_model.battle()
@@ -99,4 +99,35 @@ def test_battle_with_empty_battlefield(pokemon_battle_model):
 def test_battle_with_one_pokemon(pokemon_battle_model, sample_pokemon1):
     pokemon_battle_model.battlefield.append(sample_pokemon1)
     with pytest.raises(ValueError, match="There must be two pokemons to start a fight."):
-        pokemon_battle_model.battle()
\ No newline at end of file
+        pokemon_battle_model.battle()
+
+##########################################################
+# Batch fetch
+##########################################################
+
+def test_fetch_many(session, pokeapi_stub):
+    """Test resolving a mix of stored, new and unknown names."""
+    Pokemons.create_pokemon("pikachu", 40.0, 25.0)
+
+    results = Pokemons.fetch_many(["Pikachu", "staryu", "missingno", "staryu"])
+
+    assert [r["name"] for r in results] == ["pikachu", "staryu", "missingno"]
+    assert results[0]["source"] == "local database"
+    assert results[0]["pokemon"]["attack"] == 40.0
+    assert results[1]["source"] == "external API and saved to DB"
+    assert results[2]["found"] is False
+    assert pokeapi_stub.hits["/api/v2/pokemon/pikachu"] == 0
+    assert pokeapi_stub.hits["/api/v2/pokemon/staryu"] == 1
+    assert Pokemons.get_pokemon_by_name("staryu").defense == 55
+
+def test_fetch_pokemons_route(client, pokeapi_stub):
+    """Test the batch fetch endpoint with GET and POST."""
+    response = client.post("/api/fetch-pokemon", json={"names": ["pikachu", "bulbasaur"]})
+    assert response.status_code == 200
+    assert [r["source"] for r in response.get_json()["results"]] == ["external API and saved to DB"] * 2
+
+    response = client.get("/api/fetch-pokemon?names=pikachu,bulbasaur")
+    assert [r["source"] for r in response.get_json()["results"]] == ["local database"] * 2
+
+    response = client.post("/api/fetch-pokemon", json={"names": []})
+    assert response.status_code == 400
@@ -0,0 +1,38 @@
+from models.battle_history import Battles
+from models.pokemon_model import Pokemons
+
+
+def create_pokemons():
+    Pokemons.create_pokemon("pikachu", 40.0, 25.0)
+    Pokemons.create_pokemon("staryu", 45.0, 30.0)
+
+def test_quick_battle_route(auth_client, session):
+    """Test that one request resolves both names, fights and reports the winner."""
+    create_pokemons()
+    body = {"pokemon_1": "Pikachu", "pokemon_2": "Staryu", "seed": 1}
+    response = auth_client.post("/api/quick-battle", json=body)
+
+    assert response.status_code == 200
+    result = response.get_json()
+    assert (result["pokemon_1"], result["skill_1"], result["skill_2"]) == ("pikachu", 65.0, 75.0)
+    assert auth_client.post("/api/quick-battle", json=body).get_json()["winner"] == result["winner"]
+    assert auth_client.post("/api/quick-battle", json={"pokemon_1": "Pikachu"}).status_code == 400
+    assert auth_client.post("/api/quick-battle", json={"pokemon_1": "Pikachu", "pokemon_2": "mew"}).status_code == 404
+
+def test_quick_battle_rejects_bad_input(auth_client, session):
+    """Test that a pokemon can't fight itself and that a boolean isn't a seed."""
+    create_pokemons()
+
+    assert auth_client.post("/api/quick-battle", json={"pokemon_1": "pikachu", "pokemon_2": "Pikachu"}).status_code == 400
+    body = {"pokemon_1": "pikachu", "pokemon_2": "staryu", "seed": True}
+    assert auth_client.post("/api/quick-battle", json=body).status_code == 400
+
+def test_seeded_quick_battle_is_not_recorded(auth_client, session):
+    """Test that only unseeded quick battles reach the battle history."""
+    create_pokemons()
+    body = {"pokemon_1": "pikachu", "pokemon_2": "staryu"}
+
+    assert auth_client.post("/api/quick-battle", json={**body, "seed": 1}).get_json()["recorded"] is False
+    assert Battles.query.count() == 0
+    assert auth_client.post("/api/quick-battle", json=body).get_json()["recorded"] is True
+    assert Battles.query.count() == 1
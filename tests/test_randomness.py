@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from models.battle_engine import simulate_battles
+from models.battle_history import Battles
+from models.leaderboard import get_leaderboard
+from models.pokemon_battle_model import BattleModel
+from models.pokemon_model import Pokemons
+from models.randomness import BufferedRandomness, RandomnessProvider, SeededRandomness, SystemRandomness
+from models.stat_cache import PokemonStats
+
+PIKACHU = PokemonStats(id=25, name="pikachu", attack=55.0, defense=40.0)
+STARYU = PokemonStats(id=120, name="staryu", attack=45.0, defense=55.0)
+
+
+def fight(battle_model):
+    battle_model.battlefield = [PIKACHU, STARYU]
+    return battle_model.battle()
+
+def test_draws_are_per_battle(mocker):
+    """Test that every battle takes a new draw instead of reusing one per process."""
+    mocker.patch("random.random", side_effect=[0.1, 0.9999])
+    battle_model = BattleModel()
+
+    assert fight(battle_model) == "pikachu"
+    assert fight(battle_model) == "staryu"
+
+def test_seeded_battles_replay():
+    """Test that the same seed replays the same sequence of winners."""
+    battle_model = BattleModel(SeededRandomness(5))
+    winners = [fight(battle_model) for _ in range(50)]
+    battle_model = BattleModel(SeededRandomness(5))
+    assert [fight(battle_model) for _ in range(50)] == winners
+
+def test_buffered_randomness_matches_its_stream():
+    """Test that buffered draws come out in generator order, across block boundaries and sizes."""
+    buffered = BufferedRandomness(seed=3, block_size=8)
+    expected = np.random.default_rng(3).random(8 * 4)
+
+    draws = [buffered.random() for _ in range(5)]
+    draws.extend(buffered.random(6).tolist())
+    draws.extend(buffered.random((3, 2)).ravel().tolist())
+    draws.append(buffered.random())
+
+    np.testing.assert_array_equal(draws, expected[:len(draws)])
+    assert buffered.refills == 3
+
+def test_provider_is_abstract():
+    """Test that a provider must implement random()."""
+    with pytest.raises(TypeError):
+        RandomnessProvider()
+
+def test_providers_drive_the_batch_engine():
+    """Test that providers can stand in for a numpy Generator in the batch engine."""
+    stats = np.array([[55.0], [40.0], [45.0], [55.0]]).repeat(100, axis=1)
+
+    for provider in (SystemRandomness(), BufferedRandomness(block_size=64)):
+        assert simulate_battles(*stats, rng=provider).shape == (100,)
+    np.testing.assert_array_equal(simulate_battles(*stats, rng=SeededRandomness(1)),
+                                  simulate_battles(*stats, rng=SeededRandomness(1)))
+
+def test_seeded_battle_route_is_not_recorded(auth_client, session):
+    """Test that a seeded battle, whose outcome the caller picks, leaves the history and ratings alone."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    Pokemons.create_pokemon("staryu", attack=45.0, defense=55.0)
+    for name in ("pikachu", "staryu"):
+        auth_client.post("/api/enter-ring", json={"name": name})
+
+    response = auth_client.get("/api/battle?seed=3")
+
+    assert response.status_code == 200
+    assert response.get_json()["recorded"] is False
+    assert Battles.query.count() == 0
+    assert get_leaderboard().stats()["pokemons"] == 0
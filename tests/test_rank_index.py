@@ -0,0 +1,50 @@
+import random
+
+from models.rank_index import RankIndex
+
+
+def reference_order(scores):
+    """Keys sorted the way the index should order them."""
+    return sorted(scores, key=lambda key: (-scores[key], key))
+
+def test_matches_sorted_reference():
+    """Test that ranks and top-k agree with sorting after random updates and removals."""
+    rng = random.Random(7)
+    index = RankIndex()
+    scores = {}
+    for step in range(2000):
+        key = f"k{rng.randrange(300)}"
+        if step % 5 == 0:
+            index.discard(key)
+            scores.pop(key, None)
+        else:
+            score = float(rng.randrange(50))
+            index.set(key, score)
+            scores[key] = score
+
+    order = reference_order(scores)
+    assert len(index) == len(scores)
+    assert [key for key, _ in index.top(len(order) + 10)] == order
+    assert index.top(5) == [(key, scores[key]) for key in order[:5]]
+    assert all(index.rank(key) == position for position, key in enumerate(order, start=1))
+
+def test_missing_keys():
+    """Test that unknown keys have no rank or score and can be discarded."""
+    index = RankIndex()
+    index.set("pikachu", 1500.0)
+    index.discard("staryu")
+
+    assert index.rank("staryu") is None
+    assert index.score("staryu") is None
+    assert "pikachu" in index and "staryu" not in index
+    assert index.top(0) == []
+
+def test_ties_break_by_key():
+    """Test that equal scores are ordered by key."""
+    index = RankIndex()
+    for key in ("c", "a", "b"):
+        index.set(key, 10.0)
+    index.set("d", 11.0)
+
+    assert [key for key, _ in index.top(4)] == ["d", "a", "b", "c"]
+    assert index.rank("b") == 3
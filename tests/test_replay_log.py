@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import pytest
+
+from models.pokemon_battle_model import BattleModel
+from models.pokemon_model import Pokemons
+from models.randomness import SeededRandomness
+from models.replay_log import ReplayLog, configure_replay_log, iter_segments, list_segments, read_segment, replay_winners
+from models.stat_cache import PokemonStats
+
+
+def fight_many(count, seed=0):
+    """Fight `count` battles between a few pokemons and return the results."""
+    pokemons = [PokemonStats(id=i, name=f"p{i}", attack=float(i), defense=float(i % 3)) for i in range(1, 6)]
+    battle_model = BattleModel(SeededRandomness(seed))
+    results = []
+    for i in range(count):
+        battle_model.battlefield.extend([pokemons[i % 5], pokemons[(i * 3 + 1) % 5]])
+        results.append(battle_model.fight())
+    return results
+
+def test_round_trip_and_replay(tmp_path):
+    """Test that logged battles read back field for field and replay to the same winners."""
+    results = fight_many(200)
+    log = ReplayLog(str(tmp_path))
+    for result in results:
+        log.append(result)
+    log.close()
+
+    records = read_segment(list_segments(str(tmp_path))[0])
+    assert len(records) == 200
+    assert records["winner_id"].tolist() == [result.winner_id for result in results]
+    assert records["draw"].tolist() == [result.draw for result in results]
+    np.testing.assert_array_equal(replay_winners(records), records["winner_id"])
+
+def test_rotation_and_reopen(tmp_path):
+    """Test that segments rotate at their size and a reopened log starts a segment of its own."""
+    results = fight_many(25)
+    log = ReplayLog(str(tmp_path), segment_records=10)
+    for result in results[:15]:
+        log.append(result)
+    log.close()
+
+    log = ReplayLog(str(tmp_path), segment_records=10)
+    for result in results[15:]:
+        log.append(result)
+
+    assert [len(records) for records in iter_segments(str(tmp_path))] == [10, 5, 10]
+    assert all(path.endswith(f"-{os.getpid()}.replay") for path in list_segments(str(tmp_path)))
+    assert np.concatenate(list(iter_segments(str(tmp_path))))["pokemon_1_id"].tolist() == \
+        [result.pokemon_1_id for result in results]
+    log.close()
+
+def test_partial_record_is_ignored(tmp_path):
+    """Test that a torn trailing record is ignored by readers and never written after."""
+    results = fight_many(3)
+    log = ReplayLog(str(tmp_path))
+    log.append(results[0])
+    log.close()
+    path = list_segments(str(tmp_path))[0]
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+
+    assert len(read_segment(path)) == 1
+    log = ReplayLog(str(tmp_path))
+    log.append(results[1])
+    log.close()
+    assert [records["winner_id"].tolist() for records in iter_segments(str(tmp_path))] == [
+        [results[0].winner_id], [results[1].winner_id]]
+
+def test_concurrent_logs_never_share_a_segment(tmp_path):
+    """Test that two logs on one directory each write whole records to segments of their own."""
+    results = fight_many(20)
+    first, second = ReplayLog(str(tmp_path)), ReplayLog(str(tmp_path))
+    for i, result in enumerate(results):
+        (first if i % 2 else second).append(result)
+
+    assert [len(records) for records in iter_segments(str(tmp_path))] == [10, 10]
+    assert sorted(np.concatenate(list(iter_segments(str(tmp_path))))["fought_at"].tolist()) == \
+        sorted(result.fought_at for result in results)
+    first.close()
+    second.close()
+
+def test_opening_writes_nothing(tmp_path):
+    """Test that a log nobody appends to creates no segment, so readers can open one safely."""
+    ReplayLog(str(tmp_path)).close()
+    assert list_segments(str(tmp_path)) == []
+
+def test_rejects_other_files(tmp_path):
+    """Test that a file without the replay header is refused."""
+    path = os.path.join(str(tmp_path), "battles-000001.replay")
+    with open(path, "wb") as f:
+        f.write(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        read_segment(path)
+
+def test_battles_are_logged_and_verified(app, auth_client, session, tmp_path):
+    """Test that API battles reach the log and the CLI replays them without mismatches."""
+    app.config["REPLAY_LOG_DIR"] = str(tmp_path)
+    configure_replay_log(app.config)
+    try:
+        Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+        Pokemons.create_pokemon("staryu", attack=45.0, defense=55.0)
+        for _ in range(5):
+            auth_client.post("/api/enter-ring", json={"name": "pikachu"})
+            auth_client.post("/api/enter-ring", json={"name": "staryu"})
+            assert auth_client.get("/api/battle").status_code == 200
+
+        result = app.test_cli_runner().invoke(args=["verify-replay-log"])
+        assert result.exit_code == 0
+        assert "Replayed 5 battles, 0 mismatched" in result.output
+    finally:
+        app.config["REPLAY_LOG_DIR"] = None
+        configure_replay_log(app.config)
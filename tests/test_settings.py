@@ -0,0 +1,23 @@
+from models.settings import flag, setting
+
+
+def test_setting_prefers_config(monkeypatch):
+    """Test that a config value wins over the environment and the default."""
+    monkeypatch.setenv("EXAMPLE_SIZE", "7")
+
+    assert setting({"EXAMPLE_SIZE": 3}, "EXAMPLE_SIZE", 1, int) == 3
+
+def test_setting_falls_back_to_environment_then_default(monkeypatch):
+    """Test that missing config keys are read from the environment, then the default."""
+    monkeypatch.setenv("EXAMPLE_SIZE", "7")
+    assert setting({}, "EXAMPLE_SIZE", 1, int) == 7
+
+    monkeypatch.delenv("EXAMPLE_SIZE")
+    assert setting(None, "EXAMPLE_SIZE", 1, int) == 1
+    assert setting(None, "EXAMPLE_PATH", None, str) is None
+
+def test_flag():
+    """Test that boolean settings accept config booleans and environment strings."""
+    assert flag(True) is True
+    assert flag("yes") is True
+    assert flag("false") is False
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from models.single_flight import SingleFlight
+
+
+@pytest.fixture
+def flight():
+    return SingleFlight()
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+##########################################################
+# Coalescing
+##########################################################
+
+def test_do_runs_once_for_concurrent_callers(flight):
+    """Test that concurrent callers for one key share a single execution."""
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"name": "pikachu"}
+
+    results, errors = run_concurrently(10, lambda: flight.do("pikachu", slow))
+
+    assert len(calls) == 1
+    assert errors == [None] * 10
+    assert all(result == {"name": "pikachu"} for result in results)
+    assert flight.leaders == 1
+    assert flight.coalesced == 9
+    assert flight.in_flight() == 0
+
+def test_do_propagates_errors_to_waiters(flight):
+    """Test that every waiter sees the leader's exception."""
+    def failing():
+        time.sleep(0.2)
+        raise RuntimeError("upstream down")
+
+    results, errors = run_concurrently(5, lambda: flight.do("pikachu", failing))
+
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert flight.in_flight() == 0
+
+def test_do_runs_again_after_completion(flight):
+    """Test that a finished call is not cached."""
+    assert flight.do("pikachu", lambda: 1) == 1
+    assert flight.do("pikachu", lambda: 2) == 2
+    assert flight.leaders == 2
+
+def test_do_different_keys_do_not_block(flight):
+    """Test that calls for different keys run independently."""
+    results, _ = run_concurrently(2, lambda: flight.do(threading.get_ident(), lambda: "done"))
+    assert results == ["done", "done"]
+    assert flight.coalesced == 0
+
+##########################################################
+# Fetch endpoint
+##########################################################
+
+def test_fetch_pokemon_stampede(app, pokeapi_stub):
+    """Test that a burst of misses for one name hits PokéAPI and inserts once."""
+    pokeapi_stub.response_delay = 0.2
+
+    def request():
+        with app.test_client() as client:
+            return client.get("/api/fetch-pokemon/Pikachu").status_code
+
+    results, errors = run_concurrently(8, request)
+
+    assert errors == [None] * 8
+    assert results == [201] * 8
+    assert pokeapi_stub.hits["/api/v2/pokemon/pikachu"] == 1
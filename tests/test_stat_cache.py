@@ -0,0 +1,135 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+
+from db import db
+from models.pokemon_model import Pokemons
+from models.stat_cache import PokemonStats, StatCache, get_stat_cache
+
+
+@pytest.fixture
+def stat_cache():
+    return StatCache(maxsize=2, ttl=60)
+
+
+@pytest.fixture
+def pikachu(session):
+    Pokemons.create_pokemon("pikachu", 40.0, 25.0)
+    return Pokemons.query.filter_by(name="pikachu").first()
+
+##########################################################
+# Cache behaviour
+##########################################################
+
+def test_put_and_get(stat_cache):
+    """Test that a record is reachable by both ID and name."""
+    stats = PokemonStats(1, "pikachu", 40.0, 25.0)
+    stat_cache.put(stats)
+
+    assert stat_cache.get_by_id(1) == stats
+    assert stat_cache.get_by_name("pikachu") == stats
+    assert stat_cache.get_by_name("staryu") is None
+    assert stat_cache.stats()["hits"] == 2
+    assert stat_cache.stats()["misses"] == 1
+
+def test_lru_eviction(stat_cache):
+    """Test that the least recently used record is evicted past maxsize."""
+    stat_cache.put(PokemonStats(1, "a", 1.0, 1.0))
+    stat_cache.put(PokemonStats(2, "b", 1.0, 1.0))
+    stat_cache.get_by_id(1)
+    stat_cache.put(PokemonStats(3, "c", 1.0, 1.0))
+
+    assert stat_cache.get_by_name("b") is None
+    assert stat_cache.get_by_name("a") is not None
+    assert stat_cache.stats()["size"] == 2
+
+def test_ttl_expiry(stat_cache, mocker):
+    """Test that records expire after the TTL."""
+    mock_time = mocker.patch("models.stat_cache.time.monotonic", return_value=100.0)
+    stat_cache.put(PokemonStats(1, "pikachu", 40.0, 25.0))
+
+    mock_time.return_value = 161.0
+    assert stat_cache.get_by_id(1) is None
+    assert stat_cache.stats()["size"] == 0
+
+def test_invalidate_by_name(stat_cache):
+    """Test that invalidating a name drops the record for both keys."""
+    stat_cache.put(PokemonStats(1, "pikachu", 40.0, 25.0))
+    stat_cache.invalidate(name="pikachu")
+
+    assert stat_cache.get_by_id(1) is None
+
+##########################################################
+# Pokemons integration
+##########################################################
+
+def test_hot_lookup_skips_database(pikachu, mocker):
+    """Test that cached lookups never reach the database."""
+    spy = mocker.spy(Pokemons, "get_pokemon_by_name")
+
+    for _ in range(3):
+        stats = Pokemons.get_stats_by_name("pikachu")
+
+    assert stats == PokemonStats(pikachu.id, "pikachu", 40.0, 25.0)
+    assert Pokemons.get_stats_by_id(pikachu.id) == stats
+    spy.assert_not_called()
+
+def test_update_stats_refreshes_cache(pikachu):
+    """Test that update_stats replaces the cached record."""
+    pikachu.update_stats("attack", 5.0)
+    assert Pokemons.get_stats_by_name("pikachu").attack == 45.0
+
+def test_delete_invalidates_cache(pikachu):
+    """Test that deleted pokemons are no longer served from the cache."""
+    Pokemons.delete(pikachu.id)
+
+    with pytest.raises(ValueError, match="does not exist"):
+        Pokemons.get_stats_by_name("pikachu")
+
+def test_stats_lookup_errors(pikachu, mocker, caplog):
+    """Test that uncached lookups report missing pokemons and log database errors."""
+    with pytest.raises(ValueError, match="Pokemon with ID 999 not found"):
+        Pokemons.get_stats_by_id(999)
+
+    get_stat_cache().clear()
+    mocker.patch.object(db.session, "query", side_effect=SQLAlchemyError("boom"))
+    with pytest.raises(SQLAlchemyError):
+        Pokemons.get_stats_by_name("pikachu")
+    assert "Database error while retrieving pokemon stats" in caplog.text
+
+def test_bulk_upsert_invalidates_cache(pikachu):
+    """Test that upserted rows are re-read instead of served stale."""
+    Pokemons.bulk_upsert([{"name": "pikachu", "attack": 55, "defense": 40}])
+    pikachu_stats = Pokemons.get_stats_by_name("pikachu")
+    assert (pikachu_stats.attack, pikachu_stats.defense) == (55, 40)
+
+def test_warm_stat_cache(pikachu):
+    """Test loading the whole table into the cache."""
+    get_stat_cache().clear()
+
+    assert Pokemons.warm_stat_cache() == 1
+    assert get_stat_cache().get_by_name("pikachu").id == pikachu.id
+
+def test_stats_by_names_uses_one_query(pikachu):
+    """Test that several uncached names are read in a single query."""
+    Pokemons.create_pokemon("staryu", 45.0, 30.0)
+    Pokemons.create_pokemon("bulbasaur", 49.0, 49.0)
+    get_stat_cache().clear()
+    Pokemons.get_stats_by_name("pikachu")
+
+    statements = []
+    def count(connection, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        stats = Pokemons.get_stats_by_names(["pikachu", "staryu", "bulbasaur"])
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    assert {name: record.name for name, record in stats.items()} == \
+        {"pikachu": "pikachu", "staryu": "staryu", "bulbasaur": "bulbasaur"}
+    assert len(statements) == 1
+
+    with pytest.raises(ValueError, match="'mew' does not exist"):
+        Pokemons.get_stats_by_names(["pikachu", "mew"])
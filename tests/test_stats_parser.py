@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from models.api_utils import stream_pokemon_stats
+from models.stats_parser import extract_stats
+from tests.pokeapi_stub import make_pokemon_payload
+
+
+@pytest.fixture
+def payload():
+    document = make_pokemon_payload(25, "pikachu", 55, 40, moves=50)
+    document["past_stats"] = [{"generation": {"name": "gen-i"}, "stats": [{"base_stat": 1, "stat": {"name": "attack"}}]}]
+    document["abilities"] = [{"note": 'tricky "stats": [ {brace} \\ text'}]
+    document["sprites"] = {"other": {"official-artwork": {"front_default": "https://example.test/ピカチュウ.png"}}}
+    return json.dumps(document, ensure_ascii=False).encode("utf-8")
+
+
+def chunked(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+##########################################################
+# Parsing
+##########################################################
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024, 1 << 20])
+def test_extract_stats(payload, chunk_size):
+    """Test that the stats are found regardless of where chunks split the body."""
+    stats = extract_stats(chunked(payload, chunk_size))
+    assert stats == {"hp": 35, "attack": 55, "defense": 40, "speed": 90}
+
+def test_extract_stats_ignores_nested_and_quoted_keys(payload):
+    """Test that nested 'stats' arrays and 'stats' inside strings are skipped."""
+    assert extract_stats(chunked(payload, 256))["attack"] == 55
+
+def test_extract_stats_stops_early(payload):
+    """Test that chunks after the stats array are left unread."""
+    chunks = chunked(payload, 64)
+    extract_stats(chunks)
+    assert len(b"".join(chunks)) > 0
+
+def test_extract_stats_missing():
+    """Test that a body without stats returns None."""
+    assert extract_stats(chunked(b'{"name": "pikachu", "past_stats": []}', 8)) is None
+
+##########################################################
+# Streaming fetch
+##########################################################
+
+def test_stream_pokemon_stats(pokeapi_stub):
+    """Test streaming stats over the pooled client without losing the connection."""
+    pokeapi_stub.moves = 200
+    for _ in range(3):
+        assert stream_pokemon_stats("pikachu")["defense"] == 40
+
+    assert pokeapi_stub.connections == 1
+
+def test_stream_pokemon_stats_not_found(pokeapi_stub):
+    """Test that an unknown pokemon returns None."""
+    assert stream_pokemon_stats("missingno") is None
@@ -0,0 +1,96 @@
+import pytest
+
+from models.pokemon_model import Pokemons
+from models.stat_cache import PokemonStats
+from models.stats_snapshot import StatsSnapshot, configure_snapshot, write_snapshot
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "stats.snap")
+    write_snapshot(path, [
+        PokemonStats(25, "pikachu", 55.0, 40.0),
+        PokemonStats(120, "staryu", 45.0, 55.0),
+        PokemonStats(1, "bulbasaur", 49.0, 49.0),
+    ])
+    return path
+
+
+@pytest.fixture
+def loaded_snapshot(app, snapshot_path):
+    app.config["STATS_SNAPSHOT_PATH"] = snapshot_path
+    snapshot = configure_snapshot(app.config)
+    yield snapshot
+    configure_snapshot({"STATS_SNAPSHOT_PATH": ""})
+
+##########################################################
+# File format
+##########################################################
+
+def test_lookup(snapshot_path):
+    """Test binary search over the written records."""
+    snapshot = StatsSnapshot(snapshot_path)
+
+    assert len(snapshot) == 3
+    assert snapshot.lookup("staryu") == PokemonStats(120, "staryu", 45.0, 55.0)
+    assert snapshot.lookup("bulbasaur").id == 1
+    assert snapshot.lookup("pikachu").attack == 55.0
+    assert snapshot.lookup("aaa") is None
+    assert snapshot.lookup("zzz") is None
+    assert snapshot.lookup("x" * 40) is None
+
+def test_long_names_are_skipped(tmp_path):
+    """Test that names that don't fit a record are left out."""
+    path = str(tmp_path / "stats.snap")
+    count = write_snapshot(path, [PokemonStats(1, "x" * 40, 1.0, 1.0), PokemonStats(2, "ok", 1.0, 1.0)])
+
+    assert count == 1
+    assert StatsSnapshot(path).lookup("ok").id == 2
+
+def test_rejects_other_files(tmp_path):
+    """Test that a file without the snapshot header is refused."""
+    path = tmp_path / "bogus.snap"
+    path.write_bytes(b"not a snapshot at all, just some bytes")
+
+    with pytest.raises(ValueError, match="not a stats snapshot"):
+        StatsSnapshot(str(path))
+
+##########################################################
+# Lookup layer
+##########################################################
+
+def test_reconfigure_closes_previous(snapshot_path):
+    """Test that replacing the shared snapshot unmaps the old one."""
+    first = configure_snapshot({"STATS_SNAPSHOT_PATH": snapshot_path})
+    second = configure_snapshot({"STATS_SNAPSHOT_PATH": snapshot_path})
+    try:
+        assert first._mmap.closed
+        assert not second._mmap.closed
+    finally:
+        configure_snapshot({"STATS_SNAPSHOT_PATH": ""})
+    assert second._mmap.closed
+
+def test_pokemon_init_uses_snapshot(loaded_snapshot, pokeapi_stub):
+    """Test that Pokemons(...) without stats reads the snapshot instead of PokéAPI."""
+    pokemon = Pokemons(name="staryu")
+
+    assert (pokemon.attack, pokemon.defense) == (45.0, 55.0)
+    assert pokeapi_stub.hits["/api/v2/pokemon/staryu"] == 0
+
+def test_fetch_pokemon_route_uses_snapshot(client, loaded_snapshot, pokeapi_stub):
+    """Test that a miss is served from the snapshot without going upstream."""
+    response = client.get("/api/fetch-pokemon/pikachu")
+
+    assert response.status_code == 201
+    assert response.get_json()["source"] == "stats snapshot and saved to DB"
+    assert pokeapi_stub.hits["/api/v2/pokemon/pikachu"] == 0
+
+def test_export_snapshot_command(app, session, tmp_path):
+    """Test exporting the pokemons table to a snapshot."""
+    Pokemons.create_pokemon("pikachu", 40.0, 25.0)
+    path = str(tmp_path / "export.snap")
+
+    result = app.test_cli_runner().invoke(args=["export-snapshot", path])
+
+    assert result.exit_code == 0, result.output
+    assert StatsSnapshot(path).lookup("pikachu").attack == 40.0
@@ -0,0 +1,86 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from models.pokemon_battle_model import Combatant
+from models.pokemon_model import Pokemons
+from models.sse import format_sse
+from models.stat_cache import PokemonStats
+from models.tournament import run_tournament
+
+
+def field(count):
+    return [Combatant.from_stats(PokemonStats(id=i, name=f"p{i}", attack=float(i % 17), defense=float(i % 5)))
+            for i in range(1, count + 1)]
+
+def parse_events(body):
+    """Split an SSE body into (event, data) pairs."""
+    events = []
+    for message in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.split("\n"))
+        events.append((fields.get("event"), json.loads(fields["data"])))
+    return events
+
+def test_bracket_halves_each_round():
+    """Test that winners meet in bracket order until one is left."""
+    rounds = list(run_tournament(field(16), seed=1))
+
+    assert [len(r.matches) for r in rounds] == [8, 4, 2, 1]
+    for previous, current in zip(rounds, rounds[1:]):
+        winners = [m.winner for m in previous.matches]
+        assert [(m.pokemon_1, m.pokemon_2) for m in current.matches] == list(zip(winners[0::2], winners[1::2]))
+
+def test_chunking_and_executor_do_not_change_results():
+    """Test that a seeded bracket plays out the same inline and on an executor."""
+    inline = [m.winner.id for r in run_tournament(field(256), seed=7, chunk_size=16) for m in r.matches]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parallel = [m.winner.id for r in run_tournament(field(256), seed=7, chunk_size=16, executor=executor,
+                                                        parallel_threshold=0)
+                    for m in r.matches]
+    assert parallel == inline
+
+def test_small_rounds_stay_in_process():
+    """Test that rounds below the parallel threshold never reach the executor."""
+    class RecordingExecutor(ThreadPoolExecutor):
+        submitted = 0
+
+        def submit(self, fn, *args, **kwargs):
+            RecordingExecutor.submitted += 1
+            return super().submit(fn, *args, **kwargs)
+
+    with RecordingExecutor(max_workers=2) as executor:
+        rounds = list(run_tournament(field(256), seed=7, chunk_size=16, executor=executor, parallel_threshold=64))
+
+    # Only the 128- and 64-match rounds are large enough: 8 + 4 chunks
+    assert RecordingExecutor.submitted == 12
+    assert len(rounds) == 8
+
+def test_rejects_incomplete_brackets():
+    """Test that entrant counts other than powers of two are rejected up front."""
+    for count in (0, 1, 3, 12):
+        with pytest.raises(ValueError):
+            run_tournament(field(count))
+
+def test_format_sse():
+    """Test the Server-Sent Events encoding."""
+    assert format_sse({"a": 1}, event="round", event_id="2") == 'id: 2\nevent: round\ndata: {"a":1}\n\n'
+    assert format_sse([1]) == "data: [1]\n\n"
+
+def test_tournament_route_streams_rounds(auth_client, session):
+    """Test that the tournament endpoint streams one event per round and then the champion."""
+    names = ["pikachu", "staryu", "bulbasaur", "charmander"]
+    for i, name in enumerate(names):
+        Pokemons.create_pokemon(name, 40.0 + i, 40.0)
+
+    response = auth_client.get(f"/api/tournament?pokemons={','.join(names)}&seed=5")
+    assert response.mimetype == "text/event-stream"
+    events = parse_events(response.get_data(as_text=True))
+
+    assert [event for event, _ in events] == ["round", "round", "champion"]
+    assert [m["pokemon_1"] for m in events[0][1]["matches"]] == ["pikachu", "bulbasaur"]
+    assert events[2][1] == {"winner": events[1][1]["matches"][0]["winner"], "rounds": 2}
+
+    assert auth_client.post("/api/tournament", json={"pokemons": names[:3]}).status_code == 400
+    assert auth_client.post("/api/tournament", json={"pokemons": names[:2], "seed": False}).status_code == 400
+    assert auth_client.post("/api/tournament", json={"pokemons": ["pikachu", "mew"]}).status_code == 404
@@ -0,0 +1,78 @@
+import numpy as np
+
+from models.battle_engine import get_pokemon_skills, win_probabilities
+from models.pokemon_model import Pokemons
+from models.stat_cache import PokemonStats
+from models.win_matrix import WinMatrix, get_win_matrix
+
+
+def full_matrix(records):
+    """The matrix computed from scratch, ordered by ID."""
+    records = sorted(records, key=lambda record: record.id)
+    skills = get_pokemon_skills([r.attack for r in records], [r.defense for r in records])
+    return win_probabilities(skills[:, None], skills[None, :])
+
+def test_incremental_updates_match_rebuild():
+    """Test that upserts and removals leave the same matrix as a full rebuild."""
+    records = {i: PokemonStats(id=i, name=f"p{i}", attack=float(i), defense=float(2 * i % 7)) for i in range(1, 21)}
+    matrix = WinMatrix(lambda: list(records.values()))
+    matrix.snapshot()
+
+    for i in range(21, 40):
+        records[i] = PokemonStats(id=i, name=f"p{i}", attack=float(i % 5), defense=3.0)
+        matrix.upsert(records[i])
+    records[3] = records[3]._replace(attack=50.0)
+    matrix.upsert(records[3])
+    for i in (1, 39, 10):
+        del records[i]
+        matrix.remove(i)
+
+    ids, names, probabilities = matrix.snapshot()
+
+    assert ids == sorted(records)
+    assert names == [records[i].name for i in ids]
+    np.testing.assert_allclose(probabilities, full_matrix(records.values()))
+    assert matrix.stats()["rebuilds"] == 1
+
+def test_updates_before_build_are_ignored():
+    """Test that changes before the first read don't build the matrix."""
+    matrix = WinMatrix(lambda: [])
+    matrix.upsert(PokemonStats(id=1, name="pikachu", attack=55.0, defense=40.0))
+
+    assert matrix.stats()["built"] is False
+    assert matrix.snapshot()[0] == []
+
+def test_model_changes_update_matrix(session):
+    """Test that create_pokemon, update_stats and delete keep the shared matrix current."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    get_win_matrix().snapshot()
+
+    Pokemons.create_pokemon("staryu", attack=45.0, defense=55.0)
+    Pokemons.get_pokemon_by_name("pikachu").update_stats("attack", 10.0)
+    ids, names, probabilities = get_win_matrix().snapshot()
+    assert names == ["pikachu", "staryu"]
+    np.testing.assert_allclose(probabilities, full_matrix(Pokemons.all_stats()))
+
+    Pokemons.delete(ids[0])
+    assert get_win_matrix().snapshot()[1] == ["staryu"]
+    assert get_win_matrix().stats()["rebuilds"] == 1
+
+def test_win_matrix_route(client, session):
+    """Test the win-matrix endpoint and its conditional GETs."""
+    Pokemons.create_pokemon("pikachu", attack=55.0, defense=40.0)
+    Pokemons.create_pokemon("staryu", attack=45.0, defense=55.0)
+
+    response = client.get("/api/battle/win-matrix")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["pokemons"] == ["pikachu", "staryu"]
+    assert data["matrix"][0][0] == 0.5
+    assert data["matrix"][0][1] == round(1 / (1 + np.exp(-5)), 6)
+
+    etag = response.headers["ETag"]
+    assert client.get("/api/battle/win-matrix", headers={"If-None-Match": etag}).status_code == 304
+
+    Pokemons.create_pokemon("bulbasaur", attack=49.0, defense=49.0)
+    response = client.get("/api/battle/win-matrix", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.get_json()["matrix"]) == 3